@@ -1,4 +1,42 @@
 from abc import ABC, abstractmethod
+from arithmetic.helpers import DELIM
+
+class StepStream:
+    """
+    Lazily produced steps of one example. Iterating yields the step strings
+    once; final_answer() returns the answer of the Z step after it has been
+    reached, so a writer can serialize 'final_answer' after 'steps'.
+    """
+
+    def __init__(self, steps):
+        self._steps = iter(steps)
+        self._answer = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        s = next(self._steps)
+        if s.startswith("Z" + DELIM):
+            self._answer = s.split(DELIM, 1)[1]
+        return s
+
+    def final_answer(self) -> str:
+        if self._answer is None:
+            raise ValueError("the trace has not reached its Z step")
+        return self._answer
+
+def is_streaming(example) -> bool:
+    """Whether example comes from generate_stream() with steps still to be produced."""
+    return isinstance(example.get("steps"), StepStream)
+
+def materialize(example) -> dict:
+    """The generate() form of a generate_stream() example: steps as a list, final_answer a str."""
+    if not is_streaming(example):
+        return example
+    example = dict(example, steps=list(example["steps"]))
+    example["final_answer"] = example["final_answer"]()
+    return example
 
 class ProblemGenerator(ABC):
     """Abstract base class for math problem generators."""
@@ -18,3 +56,18 @@ class ProblemGenerator(ABC):
                        The 'Z' step tuple should be included here as the last element.
         """
         pass
+
+    def generate_stream(self) -> dict:
+        """
+        Like generate(), but generators with long traces may return 'steps' as
+        a StepStream and 'final_answer' as its final_answer method, so the
+        trace is produced while it is written (see pipeline/sinks.py).
+        """
+        return self.generate()
+
+    def generate_batch(self, n) -> list:
+        """
+        n examples as generate() would produce them one by one. Generators
+        with a vectorized path override this to build the batch at once.
+        """
+        return [self.generate() for _ in range(n)]
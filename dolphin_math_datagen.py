@@ -8,6 +8,8 @@ import random
 import argparse
 import sys
 import os
+import importlib
+import multiprocessing
 
 # Dynamically add the parent directory to sys.path to allow absolute imports
 # when running the script directly.
@@ -17,6 +19,7 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 # Import Generator Classes (from generators subdirectory)
+from arithmetic.base_generator import is_streaming
 from arithmetic.generators.long_division_generator import LongDivisionGenerator
 from arithmetic.generators.decimal_mult_generator import DecimalMultGenerator
 from arithmetic.generators.decimal_add_sub_generator import DecimalAddSubGenerator
@@ -31,6 +34,13 @@ from arithmetic.generators.pythag_hyp_generator import PythagHypGenerator
 from arithmetic.generators.abacus_addition_generator import AbacusAdditionGenerator
 from arithmetic.generators.proportional_relationship_generator import ProportionalRelationshipGenerator
 from arithmetic.generators.percent_problem_generator import PercentProblemGenerator
+from arithmetic.pipeline.verify import BackgroundVerifier, format_report, verify_example, merge_stats, verify_files
+from arithmetic.pipeline.split import SplitWriter, parse_splits
+from arithmetic.pipeline.sinks import SINKS, open_sink, open_output
+from arithmetic.pipeline.shm_transport import run_shm_pipeline
+from arithmetic.pipeline.aio import aiter_examples, aiter_batches  # Async API, re-exported for callers of this module
+from arithmetic.pipeline.pretokenize import load_tokenizer
+from arithmetic.pipeline.shards import ShardSink, ShardWriter, shard_path, shard_quotas, write_manifest, parse_size
 
 # Import Helpers if needed (jid is used in generate methods, step/DELIM are used internally)
 # from arithmetic.helpers import jid, step, DELIM # Not strictly needed here anymore
@@ -46,6 +56,9 @@ from arithmetic.generators.percent_problem_generator import PercentProblemGenera
 #             : I(nvert fraction: orig_frac_str, inverted_frac_str)
 #             : PDEC(Place Decimal in product - old method)
 #             : F(raction simplification)
+#             : MIX(ed number to improper fraction: mixed_str, improper_frac_str)
+#             : EUC(lid step: a, b, quotient, remainder), G(CD: a, b, gcd)
+#             : PF(Prime factorization: n, factors_str like 2^3*5)
 # Dec Add/Sub : DEC_ALIGN(num1_aligned, num2_aligned)
 #             : DEC_ADD_COL(col_name, details_str, result_str)
 #             : DEC_SUB_COL(col_name, details_str, result_str)
@@ -58,10 +71,11 @@ from arithmetic.generators.percent_problem_generator import PercentProblemGenera
 # Dec Div     : DEC_SHIFT(orig_expr, shifted_expr, shift_places)
 #             : DIV_SETUP(integer_dividend, integer_divisor)
 #             : PLACE_DP_Q(quotient_digits_str, dp_position_from_left_in_shifted_dividend)
+#             : REPEAT(recurring_remainder, repeating_digits)
 #             : (Reuses B, D, M, S from Arithmetic)
 # Percent     : PERCENT_TO_DEC, SETUP_PERCENT_EQ, REARRANGE_EQ, PERCENT_CALC_PART, DEC_TO_PERCENT
 #             : (Uses division steps internally for find_percent/find_whole)
-# Algebra     : G(CD - not used?), DISC(riminant calc), ROOT(square root)
+# Algebra     : DISC(riminant calc), ROOT(square root)
 #             : Q1/Q2(Quadratic formula roots)
 #             : DIST(ribute term: factor, expr_in_parens, result_expr)
 #             : REWRITE(expression/equation after step: new_form_string)
@@ -87,10 +101,13 @@ ALL_GENERATORS = [
     DecimalAddSubGenerator('+'), # Add
     DecimalAddSubGenerator('-'), # Subtract
     DecimalDivGenerator(),
+    DecimalDivGenerator(repeating=True), # Non-terminating quotients, e.g. 0.1(6)
     FractionOpGenerator('+'),    # Add
     FractionOpGenerator('-'),    # Subtract
     FractionOpGenerator('*'),    # Multiply
     FractionOpGenerator('/'),    # Divide
+    FractionOpGenerator('+-', terms=(3, 5), mixed=True, max_den=24), # Chains with mixed numbers
+    FractionOpGenerator('+-', terms=3, max_den=24, detail='factor'), # Prime factorizations behind L and F
     # Algebra
     LinearSimpleGenerator(),
     QuadraticGenerator(),
@@ -102,56 +119,201 @@ ALL_GENERATORS = [
     PythagHypGenerator(),
     # Tools/Methods
     AbacusAdditionGenerator(),
+    AbacusAdditionGenerator(operands=4), # Soroban drill: one column pass per addend
     # Percentages
     PercentProblemGenerator(),
 ]
 
+# Pipeline commands, run as `python dolphin_math_datagen.py <command> [args]`
+COMMANDS = {
+    "verify": "arithmetic.pipeline.verify",
+    "index": "arithmetic.pipeline.jsonl_index",
+    "shuffle": "arithmetic.pipeline.shuffle",
+    "split": "arithmetic.pipeline.split",
+    "pretokenize": "arithmetic.pipeline.pretokenize",
+    "pack": "arithmetic.pipeline.packing",
+    "columnar": "arithmetic.pipeline.columnar",
+    "bench-transport": "arithmetic.pipeline.shm_transport",
+    "lease": "arithmetic.pipeline.leases",
+    "serve": "arithmetic.pipeline.server",
+    "loadtest": "arithmetic.pipeline.loadtest",
+}
+
 def write_jsonl(fp, obj):
     """Writes a JSON object to a file handle, one object per line."""
     fp.write(json.dumps(obj, ensure_ascii=False) + "\n")
 
-def build_dataset(n=10_000, path="math_visible_dataset_refactored.jsonl", seed=42):
-    """Generates the dataset by calling the generate() method of chosen generators."""
-    random.seed(seed)
+def _write_examples(sink, n, on_example=None, stream_steps=False):
+    """
+    Generation loop shared by build_dataset() and shard workers: writes up to n
+    validated examples to sink. Returns (count, attempts).
+    With stream_steps, examples come from generate_stream() and long traces are
+    serialized by the sink while they are produced; their final step is checked
+    as it is written (a failing trace is dropped by the sink).
+    """
     count = 0
     attempts = 0
     # Allow slightly more attempts in case some generators fail validation often
     max_attempts = int(n * 1.2) + 50
 
-    print(f"Attempting to generate {n} examples...")
-    # Explicitly set encoding='utf-8' for writing
-    with open(path, "w", encoding="utf-8") as fp:
-        while count < n and attempts < max_attempts:
-            attempts += 1
-            try:
-                # Choose a generator instance randomly
-                gen_instance = random.choice(ALL_GENERATORS)
+    while count < n and attempts < max_attempts:
+        attempts += 1
+        try:
+            # Choose a generator instance randomly
+            gen_instance = random.choice(ALL_GENERATORS)
+            if stream_steps:
+                example = gen_instance.generate_stream()
+            else:
                 example = gen_instance.generate() # Call the generate method
-                if example:
-                    # Basic validation before writing
-                    assert 'problem_id' in example
-                    assert 'operation' in example
-                    assert 'problem' in example
-                    assert 'steps' in example and isinstance(example['steps'], list) and len(example['steps']) > 0
-                    assert 'final_answer' in example
-                    assert example['steps'][-1].startswith("Z|") # Check final step format
-
-                    write_jsonl(fp, example)
-                    count += 1
-                    if count % 1000 == 0 and count > 0:
-                        print(f"... successfully generated {count}/{n} examples")
-            except Exception as e:
-                # Provide more context on which generator failed
-                gen_name = gen_instance.__class__.__name__ if 'gen_instance' in locals() else "Unknown"
-                print(f"ERROR: Generator {gen_name} failed during generation or validation: {e}. Skipping attempt {attempts}.")
-                # Optional: Add more detailed error logging or handling here
+            if example and is_streaming(example):
+                # Steps are checked as they are written: final_answer() fails without a Z step
+                sink.write(example)
+                count += 1
+            elif example:
+                # Basic validation before writing
+                assert 'problem_id' in example
+                assert 'operation' in example
+                assert 'problem' in example
+                assert 'steps' in example and isinstance(example['steps'], list) and len(example['steps']) > 0
+                assert 'final_answer' in example
+                assert example['steps'][-1].startswith("Z|") # Check final step format
+
+                sink.write(example)
+                if on_example:
+                    on_example(example)
+                count += 1
+            if example and count % 1000 == 0:
+                print(f"... successfully generated {count}/{n} examples")
+        except Exception as e:
+            # Provide more context on which generator failed
+            gen_name = gen_instance.__class__.__name__ if 'gen_instance' in locals() else "Unknown"
+            print(f"ERROR: Generator {gen_name} failed during generation or validation: {e}. Skipping attempt {attempts}.")
+            # Optional: Add more detailed error logging or handling here
+    return count, attempts
+
+def shard_seed(seed, index):
+    """Seed of one shard when shards are generated independently by parallel workers."""
+    return seed * 1_000_003 + index
+
+def _build_shard(task):
+    """Worker: generates one shard with its own seed. Returns (manifest entry, attempts, verify stats)."""
+    index, n, path, seed, format, sink_options, verify = task
+    random.seed(shard_seed(seed, index))
+    stats = {}
+    with ShardSink(shard_path(path, index), format, **sink_options) as sink:
+        _, attempts = _write_examples(sink, n, (lambda e: verify_example(e, stats)) if verify else None)
+    return dict(sink.entry(), seed=shard_seed(seed, index)), attempts, stats
+
+def _generate_part(task, sink):
+    """Shared-memory producer: one worker's share of a single-file parallel build."""
+    index, n, seed = task
+    random.seed(shard_seed(seed, index))
+    _write_examples(sink, n)
+
+def _build_shards_parallel(n, path, seed, num_shards, workers, format, sink_options, verify):
+    tasks = [(i, quota, path, seed, format, sink_options, verify)
+             for i, quota in enumerate(shard_quotas(n, num_shards))]
+    shards, attempts, stats = [], 0, {}
+    with multiprocessing.Pool(min(workers or os.cpu_count() or 1, num_shards)) as pool:
+        for entry, shard_attempts, shard_stats in pool.imap(_build_shard, tasks):
+            shards.append(entry)
+            attempts += shard_attempts
+            merge_stats(stats, shard_stats)
+    return shards, attempts, stats
+
+def build_dataset(n=10_000, path="math_visible_dataset_refactored.jsonl", seed=42, verify=False, split=None,
+                  format="jsonl", tokenizer=None, shard_size=None, num_shards=None, workers=None, pipelined=False,
+                  stream_steps=False):
+    """
+    Generates the dataset by calling the generate() method of chosen generators.
+    With verify=True, every written example is also re-checked in background
+    worker processes and a per-operation mismatch report is printed at the end.
+    With split={name: fraction}, examples are routed to one file per split
+    (data.jsonl -> data.train.jsonl, ...) by a stable hash of (operation, problem).
+    format selects the output sink (see pipeline/sinks.py); 'bin' writes
+    pre-tokenized token ids using tokenizer (default: the op-code vocabulary).
+    With shard_size (bytes) or num_shards, output rotates over data-00000.jsonl,
+    data-00001.jsonl, ... and data.manifest.json is written at the end.
+    num_shards > 1 generates the shards in parallel worker processes, each
+    with its own seed derived from seed (workers=1 writes them sequentially).
+    Without sharding, workers > 1 generates JSONL in that many processes that
+    encode straight into shared memory, from which a single file is written.
+    pipelined=True hands JSONL writes (and gzip compression for .gz paths)
+    to a writer thread behind a bounded queue, overlapping them with generation.
+    stream_steps=True writes long traces while they are generated, so memory
+    per example stays bounded (sequential JSONL output, without verify).
+    """
+    if split and (shard_size or num_shards):
+        raise ValueError("split cannot be combined with sharding; shard each split separately")
+    if stream_steps and (format != "jsonl" or verify or (workers and workers > 1)):
+        raise ValueError("stream_steps needs sequential jsonl output without verify")
+    sink_options = {"tokenizer": tokenizer} if tokenizer is not None else {}
+    if pipelined:
+        sink_options["pipelined"] = True
+    print(f"Attempting to generate {n} examples...")
+
+    if num_shards and num_shards > 1 and workers != 1:
+        shards, attempts, stats = _build_shards_parallel(n, path, seed, num_shards, workers, format,
+                                                         sink_options, verify)
+        out = write_manifest(path, shards, seed, format=format, parallel=True)
+        count = sum(shard["count"] for shard in shards)
+        print(f"✔  Successfully wrote {count} lines to {len(shards)} shards → {out} (after {attempts} attempts)")
+        if count < n:
+            print(f"WARN: Target of {n} examples not reached ({count}/{n}).")
+        if verify:
+            print(format_report(stats))
+        return
+
+    if workers and workers > 1 and not (split or shard_size or num_shards):
+        if format != "jsonl":
+            raise ValueError("parallel single-file generation only supports the jsonl format")
+        tasks = [(i, quota, seed) for i, quota in enumerate(shard_quotas(n, workers))]
+        with open_output(path) as out_fp:
+            stats = run_shm_pipeline(tasks, _generate_part, out_fp)
+        print(f"✔  Successfully wrote {stats['examples']} lines → {path} ({workers} workers, "
+              f"{stats['batches']} shared-memory batches)")
+        if stats["examples"] < n:
+            print(f"WARN: Target of {n} examples not reached ({stats['examples']}/{n}).")
+        if verify:
+            print(format_report(verify_files([path])))
+        return
+
+    random.seed(seed)
+    verifier = BackgroundVerifier() if verify else None
+    if split:
+        writer = SplitWriter(path, split, format=format, **sink_options)
+    elif shard_size or num_shards:
+        writer = ShardWriter(path, shard_size, num_shards, total=n, format=format, **sink_options)
+    else:
+        writer = open_sink(path, format, **sink_options)
 
+    with writer as sink:
+        count, attempts = _write_examples(sink, n, verifier.add if verifier else None, stream_steps)
+
+    if isinstance(writer, ShardWriter):
+        path = write_manifest(path, writer.shards, seed, format=format, parallel=False)
+    elif not split:
+        path = sink.paths[0]  # Some formats write to a derived path (e.g. data.bin, data.dmcol)
     print(f"✔  Successfully wrote {count} lines → {path} (after {attempts} attempts)")
+    if split:
+        for name, split_path in writer.paths.items():
+            print(f"   {name}: {writer.counts[name]} lines → {split_path}")
     if count < n:
         print(f"WARN: Target of {n} examples not reached ({count}/{n}). Consider increasing max_attempts or checking generator logic.")
+    if hasattr(sink, "stats"):
+        stats = sink.stats()
+        print(f"   writer queue: mean {stats['mean_occupancy']:.1f}/{stats['queue_size']} chunks, "
+              f"{stats['stalls']} stalls ({stats['stall_seconds']:.2f}s blocked), "
+              f"{stats['write_seconds']:.2f}s writing")
+    if verifier:
+        print(format_report(verifier.close()))
 
 # ---------- Main Execution Block ----------
 if __name__ == "__main__":
+    # Pipeline commands (e.g. `verify data.jsonl`) have their own arguments
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(importlib.import_module(COMMANDS[sys.argv[1]]).main(sys.argv[2:]))
+
     parser = argparse.ArgumentParser(description="Generate Dolphin Math Dataset")
     parser.add_argument(
         "-n", "--num_examples",
@@ -171,6 +333,59 @@ if __name__ == "__main__":
         default=42,
         help="Random seed for reproducibility."
     )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Re-check every generated example in background worker processes and report mismatch rates per operation."
+    )
+    parser.add_argument(
+        "--split",
+        type=parse_splits,
+        default=None,
+        help="Write hash-stable splits instead of one file, e.g. train=0.98,validation=0.01,test=0.01"
+    )
+    parser.add_argument(
+        "--format",
+        choices=list(SINKS),
+        default="jsonl",
+        help="Output format: jsonl (default), bin (pre-tokenized token ids + offsets index) "
+             "or parquet (columnar; built-in .dmcol format without pyarrow)."
+    )
+    parser.add_argument(
+        "--tokenizer",
+        type=str,
+        default=None,
+        help="Tokenizer for --format bin: 'opcode' (default), 'hf:<name>' or 'module:attr'."
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=parse_size,
+        default=None,
+        help="Rotate output files once a shard reaches this size, e.g. 256M or 1G (writes a manifest)."
+    )
+    parser.add_argument(
+        "--num-shards",
+        type=int,
+        default=None,
+        help="Write this many shards of equal example counts, generated by parallel workers (writes a manifest)."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes: with --num-shards, shards generated at once (default: all cores; 1 = sequential); "
+             "otherwise, JSONL generated in parallel through shared memory into one file."
+    )
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="Write JSONL from a dedicated writer thread behind a bounded queue (use a .gz output path to compress)."
+    )
+    parser.add_argument(
+        "--stream-steps",
+        action="store_true",
+        help="Serialize long traces while they are generated instead of building each steps list in memory."
+    )
     # Removed --generate_dataset flag, sample is now default if no args given
     parser.add_argument(
         "--sample",
@@ -190,7 +405,10 @@ if __name__ == "__main__":
     if len(sys.argv) > 1 and not args.sample:
         # Generate dataset if arguments like -n, -o, -s are provided
         print(f"Generating dataset with n={args.num_examples}, output={args.output}, seed={args.seed}...")
-        build_dataset(n=args.num_examples, path=args.output, seed=args.seed)
+        build_dataset(n=args.num_examples, path=args.output, seed=args.seed, verify=args.verify, split=args.split,
+                      format=args.format, tokenizer=load_tokenizer(args.tokenizer) if args.tokenizer else None,
+                      shard_size=args.shard_size, num_shards=args.num_shards, workers=args.workers,
+                      pipelined=args.pipelined, stream_steps=args.stream_steps)
         print("Dataset generation finished.")
     else:
         # Default action (no args) or explicit --sample: print samples
@@ -1,57 +1,173 @@
 import random
-from arithmetic.base_generator import ProblemGenerator
-from arithmetic.helpers import step, jid
+from arithmetic.base_generator import ProblemGenerator, StepStream, materialize
+from arithmetic.helpers import step, jid, DELIM, digits_range, random_digits
+from arithmetic.generators.property_samplers import carry_operands
 
-class AbacusAdditionGenerator(ProblemGenerator):
-    """Generates addition problems solved using abacus-like steps."""
+try:
+    import numpy as np
+except ImportError:  # Optional: batches fall back to the scalar engine
+    np = None
 
-    def generate(self) -> dict:
-        operation = "abacus_addition"
-        num1 = random.randint(10, 9999)
-        num2 = random.randint(10, 9999)
-        result = num1 + num2
-        final_answer_str = str(result)
-        problem = f"{num1} + {num2}" # Neutral problem statement
-
-        steps = []
-        steps.append(step("AB_SET", num1)) # Set the first number
-
-        s1, s2 = str(num1), str(num2)
-        max_len = max(len(s1), len(s2))
-        s1, s2 = s1.zfill(max_len), s2.zfill(max_len)
-        # current_state = list(map(int, list(s1))) # Not actually needed for steps
+# AB_ADD_DGT tails "|d1+d2+c|sum" by d1 * 20 + d2 * 2 + c (a carry into a column is 0 or 1)
+_ADD_TAILS = [f"{DELIM}{d1}+{d2}+{c}{DELIM}{d1 + d2 + c}"
+              for d1 in range(10) for d2 in range(10) for c in range(2)]
+_CARRIES = [d1 + d2 + c >= 10 for d1 in range(10) for d2 in range(10) for c in range(2)]
+
+def _add_prefix(col):
+    return step("AB_ADD_DGT", f"col_{col}")
+
+def _carry_step(col):
+    return step("AB_CARRY", f"col_{col}", 1, f"col_{col + 1}")
+
+def _rods_value(rods) -> str:
+    """Little-endian rod digits -> decimal string."""
+    return bytes(48 + d for d in reversed(rods)).lstrip(b"0").decode() or "0"
+
+def abacus_steps(addends):
+    """
+    Yields the soroban trace of summing addends (ints or digit strings): AB_SET
+    for the first, then per further addend AB_INFO and one AB_ADD_DGT (plus
+    AB_CARRY) per column from the right, AB_CARRY_FINAL, and Z. Rod i holds
+    digit i of the running total (heaven bead d // 5, earth beads d % 5) in a
+    bytearray updated in place, so k addends of n digits cost O(k * n).
+    """
+    first, *rest = [str(a) for a in addends]
+    yield step("AB_SET", first)
+    rods = bytearray(ord(d) - 48 for d in reversed(first))
+    for addend in rest:
+        yield step("AB_INFO", f"Adding {addend} column by column")
+        width = max(len(rods), len(addend))
+        rods.extend(bytes(width - len(rods)))
+        n = len(addend)
         carry = 0
+        for col in range(width):
+            d2 = ord(addend[n - 1 - col]) - 48 if col < n else 0
+            d1 = rods[col]
+            col_sum = d1 + d2 + carry
+            yield _add_prefix(col) + _ADD_TAILS[d1 * 20 + d2 * 2 + carry]
+            rods[col] = col_sum % 10
+            carry = col_sum // 10
+            if carry:
+                yield _carry_step(col)
+        if carry:
+            yield step("AB_CARRY_FINAL", carry)
+            rods.append(carry)
+    yield step("Z", _rods_value(rods))
 
-        steps.append(step("AB_INFO", f"Adding {num2} column by column"))
+def abacus_batch_steps(problems) -> list:
+    """
+    Traces of abacus_steps() for many problems (lists of addend digit strings)
+    at once. With NumPy, the column sums and carries of all problems with the
+    same addend count are computed together, one column per array operation;
+    only the step strings are built per problem. Without NumPy, falls back to
+    abacus_steps().
+    """
+    problems = [[str(a) for a in addends] for addends in problems]
+    if np is None:
+        return [list(abacus_steps(addends)) for addends in problems]
+    traces = [None] * len(problems)
+    groups = {}
+    for index, addends in enumerate(problems):
+        groups.setdefault(len(addends), []).append(index)
+    for k, indices in groups.items():
+        for index, trace in zip(indices, _batch_group([problems[i] for i in indices], k)):
+            traces[index] = trace
+    return traces
 
-        for i in range(max_len - 1, -1, -1):
-            # d1 = current_state[i] # Not needed
-            d1_actual = int(s1[i]) # Get digit from original string
-            d2 = int(s2[i])
-            col_sum = d1_actual + d2 + carry
-            # new_digit = col_sum % 10 # Not needed for steps
-            new_carry = col_sum // 10
+def _batch_group(problems, k):
+    """abacus_batch_steps() for problems that all have k addends."""
+    n = len(problems)
+    lengths = np.array([[len(a) for a in addends] for addends in problems], dtype=np.int64)
+    width = int(lengths.max()) + len(str(k)) + 1  # Room for every carry, plus an always-zero rod
+    text = "".join(a.rjust(width, "0") for addends in problems for a in addends)
+    digits = np.frombuffer(text.encode(), dtype=np.uint8).reshape(n, k, width)[:, :, ::-1].astype(np.int16) - 48
+    rods = digits[:, 0].copy()
+    used = lengths[:, 0]  # Rods in use per problem
+    passes = []
+    for j in range(1, k):
+        cols = np.maximum(used, lengths[:, j])
+        codes = np.empty((n, width), dtype=np.int16)
+        carry = np.zeros(n, dtype=np.int16)
+        for col in range(width):
+            d1, d2 = rods[:, col], digits[:, j, col]
+            codes[:, col] = d1 * 20 + d2 * 2 + carry
+            col_sum = d1 + d2 + carry
+            rods[:, col] = col_sum % 10
+            carry = col_sum // 10
+        final = rods[np.arange(n), cols]  # Carry out of the last column in use
+        passes.append((cols.tolist(), codes, final.tolist()))
+        used = cols + (final > 0)
+    prefixes = [_add_prefix(col) for col in range(width)]
+    carries = [_carry_step(col) for col in range(width)]
+    used = used.tolist()
+    traces = []
+    for p, addends in enumerate(problems):
+        trace = [step("AB_SET", addends[0])]
+        for j, (cols, codes, final) in enumerate(passes, 1):
+            trace.append(step("AB_INFO", f"Adding {addends[j]} column by column"))
+            for col, code in enumerate(codes[p, :cols[p]].tolist()):
+                trace.append(prefixes[col] + _ADD_TAILS[code])
+                if _CARRIES[code]:
+                    trace.append(carries[col])
+            if final[p]:
+                trace.append(step("AB_CARRY_FINAL", final[p]))
+        trace.append(step("Z", _rods_value(rods[p, :used[p]].tolist())))
+        traces.append(trace)
+    return traces
 
-            # Combine d1, d2, carry into one string to fit the 5-arg limit for step()
-            add_details = f"{d1_actual}+{d2}+{carry}"
-            steps.append(step("AB_ADD_DGT", f"col_{max_len-1-i}", add_details, col_sum)) # Show column addition: col_name, details, sum
+class AbacusAdditionGenerator(ProblemGenerator):
+    """
+    Generates addition problems solved using abacus-like steps.
+
+    By default two numbers from 10 to 9999 are added. Pass operands for k
+    addends and digits (n or (lo, hi) digits per addend) for longer ones,
+    e.g. AbacusAdditionGenerator(operands=5, digits=(6, 12)).
 
-            if new_carry > 0:
-                steps.append(step("AB_CARRY", f"col_{max_len-1-i}", new_carry, f"col_{max_len-i}")) # Indicate carry
-                carry = new_carry
-            else:
-                carry = 0
+    carries builds two equally long addends whose addition carries in
+    exactly that many columns (the final carry included). More addends are
+    not supported: their top digits alone force carries once k > 9.
+    """
 
-        # Handle final carry if any
-        if carry > 0:
-            steps.append(step("AB_CARRY_FINAL", carry))
+    def __init__(self, operands=2, digits=None, carries=None):
+        if operands < 2:
+            raise ValueError("abacus addition needs at least two operands")
+        self.operands_count = operands
+        self.digits = digits and digits_range(digits)
+        self.carries = carries
+        if carries is not None:
+            if operands != 2:
+                raise ValueError("carry profiles need exactly two operands")
+            lo, hi = self.digits or (2, 4)  # randint(10, 9999) has 2-4 digits
+            if carries > hi:
+                raise ValueError(f"{carries} carries do not fit in {hi}-digit addends")
+            self.profile_digits = (max(lo, carries, 1), hi)
 
-        steps.append(step("Z", final_answer_str)) # Final answer step
+    def operands(self) -> list:
+        """The addends, as digit strings when digits or carries is set."""
+        if self.carries is not None:
+            return list(carry_operands(random.randint(*self.profile_digits), self.carries))
+        if self.digits is None:
+            return [random.randint(10, 9999) for _ in range(self.operands_count)]
+        return [random_digits(self.digits) for _ in range(self.operands_count)]
 
+    def _example(self, addends, steps, final_answer):
         return dict(
             problem_id=jid(),
-            operation=operation,
-            problem=problem,
+            operation="abacus_addition",
+            problem=" + ".join(map(str, addends)), # Neutral problem statement
             steps=steps,
-            final_answer=final_answer_str
+            final_answer=final_answer
         )
+
+    def generate(self) -> dict:
+        return materialize(self.generate_stream())
+
+    def generate_stream(self) -> dict:
+        addends = self.operands()
+        steps = StepStream(abacus_steps(addends))
+        return self._example(addends, steps, steps.final_answer)
+
+    def generate_batch(self, n) -> list:
+        problems = [self.operands() for _ in range(n)]
+        return [self._example(addends, steps, steps[-1].split(DELIM, 1)[1])
+                for addends, steps in zip(problems, abacus_batch_steps(problems))]
@@ -1,7 +1,13 @@
 import random
 from decimal import Decimal, InvalidOperation
 from arithmetic.base_generator import ProblemGenerator
-from arithmetic.helpers import step, jid
+from arithmetic.helpers import step, jid, DELIM
+from arithmetic.generators.property_samplers import carry_operands, borrow_operands
+
+try:
+    import numpy as np
+except ImportError:  # Optional: batches fall back to generate()
+    np = None
 
 # New Op-Codes:
 # DEC_ALIGN: Align numbers by decimal point (num1_aligned, num2_aligned)
@@ -10,18 +16,65 @@ from arithmetic.helpers import step, jid
 # DEC_BORROW: Show borrow propagation (from_col_idx, to_col_idx) - Optional detail
 # DEC_CARRY: Show carry propagation (from_col_idx, to_col_idx) - Optional detail
 
+def column_name(place, frac_digits):
+    """Column label of digit place (0 = rightmost): frac_0.. then int_1.. (int_0.. without decimals)."""
+    if place < frac_digits:
+        return f"frac_{place}"
+    return f"int_{place - frac_digits + (1 if frac_digits > 0 else 0)}"
+
+def exact_answer(a_str, b_str, op_symbol) -> str:
+    """a_str op b_str in plain notation, e.g. '12.3', '0.05', '10'."""
+    a_dec, b_dec = Decimal(a_str), Decimal(b_str)
+    result_dec = a_dec + b_dec if op_symbol == '+' else a_dec - b_dec
+    final_answer_str = f"{result_dec.normalize():f}" # Plain notation (str() can give '1E+1')
+    if final_answer_str.startswith('.'): final_answer_str = '0' + final_answer_str
+    elif final_answer_str.startswith('-.'): final_answer_str = '-0' + final_answer_str[1:]
+    return final_answer_str
+
+# Step tails "|details|->result (carry/borrow_out)" by d1 * 20 + d2 * 2 + carry/borrow in
+_ADD_TAILS = [DELIM + f"{d1}+{d2}+{c}" + DELIM + f"->{(d1 + d2 + c) % 10} (carry {(d1 + d2 + c) // 10})"
+              for d1 in range(10) for d2 in range(10) for c in range(2)]
+_SUB_TAILS = [DELIM + f"{d1}-{d2} (borrow_in {b})" + DELIM
+              + f"->{(d1 - b - d2) % 10} (borrow_out {int(d1 - b < d2)})"
+              for d1 in range(10) for d2 in range(10) for b in range(2)]
+
 class DecimalAddSubGenerator(ProblemGenerator):
     """
     Generates decimal addition or subtraction problems with detailed,
     column-by-column steps including carrying/borrowing.
+
+    Operands can be built to a property profile instead of drawn uniformly:
+    carries (addition) is the exact number of columns that carry out;
+    borrows and borrow_chain (subtraction) the number of borrowing columns
+    and the longest run of them, borrowing across zeros, e.g.
+    DecimalAddSubGenerator('-', borrow_chain=2) gives problems like 7.03 - 2.08.
     """
 
-    def __init__(self, op_symbol: str):
+    # Operand shapes of the profile samplers: (integer digits, decimal places)
+    SHAPES = [(i, f) for i in (1, 2) for f in (1, 2)]
+
+    def __init__(self, op_symbol: str, carries=None, borrows=None, borrow_chain=None):
         if op_symbol not in ['+', '-']:
             raise ValueError("op_symbol must be '+' or '-'")
         self.op_symbol = op_symbol
         self.op_name = "decimal_add" if op_symbol == '+' else "decimal_sub"
         # self.op_code = "A" if op_symbol == '+' else "S" # No longer used for single step
+        if op_symbol == '+' and (borrows is not None or borrow_chain is not None):
+            raise ValueError("borrow profiles apply to subtraction")
+        if op_symbol == '-' and carries is not None:
+            raise ValueError("carry profiles apply to addition")
+        if any(count is not None and count < 0 for count in (carries, borrows)):
+            raise ValueError("carries and borrows must be non-negative")
+        # Checked here: an impossible profile would fail every generate() call instead
+        if borrow_chain is not None and (borrow_chain < 1 or (borrows is not None and borrows < borrow_chain)):
+            raise ValueError(f"a borrow chain of {borrow_chain} needs at least 1 and as many borrows, got {borrows}")
+        self.carries, self.borrows, self.borrow_chain = carries, borrows, borrow_chain
+        self.profiled = carries is not None or borrows is not None or borrow_chain is not None
+        if self.profiled:
+            columns = self._columns_needed()
+            self.shapes = [shape for shape in self.SHAPES if sum(shape) >= columns]
+            if not self.shapes:
+                raise ValueError(f"profile needs {columns} columns, at most {sum(self.SHAPES[-1])} available")
 
     def _align_decimals(self, s1, s2):
         """Aligns two decimal strings for column operations."""
@@ -48,7 +101,28 @@ class DecimalAddSubGenerator(ProblemGenerator):
 
         return s1, s2, max_frac, max_int + 1 + max_frac # Total length including decimal
 
-    def generate(self) -> dict:
+    def _columns_needed(self):
+        if self.carries is not None:
+            return max(1, self.carries)
+        borrows = self.borrows if self.borrows is not None else self.borrow_chain
+        if self.borrow_chain is None:
+            return borrows + 1
+        return borrows + -(-borrows // max(1, self.borrow_chain))
+
+    def _profiled_operands(self):
+        """Operands with the same shape built to the profile; no trailing zeros, like str(float)."""
+        int_digits, frac_digits = random.choice(self.shapes)
+        n, lead = int_digits + frac_digits, int(int_digits > 1)
+        if self.op_symbol == '+':
+            a, b = carry_operands(n, self.carries, lead=lead, tail=1)
+        else:
+            a, b = borrow_operands(n, self.borrows, self.borrow_chain, lead=lead, tail=1)
+        return a[:int_digits] + "." + a[int_digits:], b[:int_digits] + "." + b[int_digits:]
+
+    def operands(self):
+        """(a_str, b_str); a >= b for subtraction."""
+        if self.profiled:
+            return self._profiled_operands()
         # Generate numbers, ensuring subtraction might require borrowing
         a = round(random.uniform(0.1, 99.9), random.randint(1, 2))
         b = round(random.uniform(0.1, 99.9), random.randint(1, 2))
@@ -58,18 +132,15 @@ class DecimalAddSubGenerator(ProblemGenerator):
         if self.op_symbol == '-' and a < b:
             a, b = b, a
         elif self.op_symbol == '-' and a == b:
-             b -= 0.1 # Ensure difference
+             b = round(b - 0.1, 2) # Ensure difference (round away float noise)
+        return str(a), str(b)
 
-        a_str, b_str = str(a), str(b)
+    def generate(self) -> dict:
+        a_str, b_str = self.operands()
         problem = f"{a_str} {self.op_symbol} {b_str}"
 
         # Calculate exact result using Decimal
-        a_dec, b_dec = Decimal(a_str), Decimal(b_str)
-        result_dec = a_dec + b_dec if self.op_symbol == '+' else a_dec - b_dec
-        final_answer_str = str(result_dec.normalize())
-        if final_answer_str.startswith('.'): final_answer_str = '0' + final_answer_str
-        elif final_answer_str.startswith('-.'): final_answer_str = '-0' + final_answer_str[1:]
-
+        final_answer_str = exact_answer(a_str, b_str, self.op_symbol)
 
         steps = []
         s1_aligned, s2_aligned, frac_digits, total_len = self._align_decimals(a_str, b_str)
@@ -86,11 +157,7 @@ class DecimalAddSubGenerator(ProblemGenerator):
             for i in range(num_digits - 1, -1, -1):
                 # Calculate column index relative to decimal point
                 # Rightmost fractional digit is index 0, first integer digit is index frac_digits
-                col_place_idx = (num_digits - 1 - i)
-                is_fractional = col_place_idx < frac_digits
-                display_idx = col_place_idx if is_fractional else col_place_idx - frac_digits + (1 if frac_digits > 0 else 0) # Adjust for integer part
-                col_name = f"{'frac' if is_fractional else 'int'}_{display_idx}"
-
+                col_name = column_name(num_digits - 1 - i, frac_digits)
 
                 d1 = digits1[i]
                 d2 = digits2[i]
@@ -112,14 +179,12 @@ class DecimalAddSubGenerator(ProblemGenerator):
             # Use right-to-left index (0 = rightmost)
             for i in range(num_digits - 1, -1, -1):
                 # Calculate column index relative to decimal point
-                col_place_idx = (num_digits - 1 - i)
-                is_fractional = col_place_idx < frac_digits
-                display_idx = col_place_idx if is_fractional else col_place_idx - frac_digits + (1 if frac_digits > 0 else 0)
-                col_name = f"{'frac' if is_fractional else 'int'}_{display_idx}"
+                col_name = column_name(num_digits - 1 - i, frac_digits)
 
                 d1 = digits1[i]
                 d2 = digits2[i]
 
+                borrow_in = borrow
                 d1_eff = d1 - borrow # Apply borrow from previous column
                 borrow = 0 # Reset borrow for this column
 
@@ -137,7 +202,6 @@ class DecimalAddSubGenerator(ProblemGenerator):
                 col_diff = d1_eff - d2
                 result_digits[i] = col_diff
                 # Combine details to fit into step() arguments
-                borrow_in = 1 if d1_eff != d1 else 0
                 sub_details = f"{d1}-{d2} (borrow_in {borrow_in})" # Show original d1
                 sub_result = f"->{col_diff} (borrow_out {borrow})"
                 steps.append(step("DEC_SUB_COL", col_name, sub_details, sub_result))
@@ -162,3 +226,61 @@ class DecimalAddSubGenerator(ProblemGenerator):
             steps=steps,
             final_answer=final_answer_str
         )
+
+    def generate_batch(self, n) -> list:
+        if np is None:
+            return super().generate_batch(n)
+        pairs = [self.operands() for _ in range(n)]
+        return [dict(
+            problem_id=jid(),
+            operation=self.op_name,
+            problem=f"{a_str} {self.op_symbol} {b_str}",
+            steps=steps,
+            final_answer=steps[-1].split(DELIM, 1)[1]
+        ) for (a_str, b_str), steps in zip(pairs, self.batch_steps(pairs))]
+
+    def batch_steps(self, pairs) -> list:
+        """
+        The generate() traces of many (a_str, b_str) pairs at once (needs NumPy).
+        Aligned operands become rows of a digit matrix, least significant
+        column first. Carries (borrows) come from cumulative array operations:
+        a column with a digit sum other than 9 (unequal digits) decides its
+        own carry-out, and every other column passes on the one of the
+        nearest deciding column to its right. The step strings are rendered
+        from the resulting matrices in a final pass.
+        """
+        aligned = [self._align_decimals(a_str, b_str) for a_str, b_str in pairs]
+        rows = [(s1.replace('.', ''), s2.replace('.', '')) for s1, s2, _, _ in aligned]
+        width = max(len(r1) for r1, _ in rows)
+        text = "".join(r.rjust(width, '0') for row in rows for r in row).encode()
+        digits = (np.frombuffer(text, dtype=np.uint8).reshape(len(rows), 2, width)[:, :, ::-1] - 48).astype(np.int8)
+        d1, d2 = digits[:, 0], digits[:, 1]
+        if self.op_symbol == '+':
+            deciding = d1 + d2 != 9
+            out = d1 + d2 >= 10
+        else:
+            deciding = d1 != d2
+            out = d1 < d2
+        cols = np.arange(width)
+        last = np.maximum.accumulate(np.where(deciding, cols, -1), axis=1)
+        carry_out = np.take_along_axis(out, np.maximum(last, 0), axis=1) & (last >= 0)
+        carry_in = np.zeros_like(carry_out)
+        carry_in[:, 1:] = carry_out[:, :-1]
+        codes = (d1.astype(np.int16) * 20 + d2 * 2 + carry_in).tolist()
+        carry_out = carry_out.tolist()
+
+        op, tails = ("DEC_ADD_COL", _ADD_TAILS) if self.op_symbol == '+' else ("DEC_SUB_COL", _SUB_TAILS)
+        prefixes = {}
+        traces = []
+        for (a_str, b_str), (s1, s2, frac_digits, _), (r1, _), row, outs in zip(pairs, aligned, rows, codes, carry_out):
+            names = prefixes.get(frac_digits)
+            if names is None:
+                names = prefixes[frac_digits] = [step(op, column_name(p, frac_digits)) for p in range(width)]
+            num_digits = len(r1)
+            steps = [step("DEC_ALIGN", s1, s2)]
+            steps.extend([names[p] + tails[row[p]] for p in range(num_digits)])
+            if self.op_symbol == '+' and outs[num_digits - 1]:
+                steps.append(step("DEC_CARRY_FINAL", 1))
+            steps.append(step("Z", exact_answer(a_str, b_str, self.op_symbol)))
+            traces.append(steps)
+        return traces
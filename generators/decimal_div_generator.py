@@ -1,8 +1,9 @@
 import random
 import decimal # Required for localcontext
+from fractions import Fraction
 from decimal import Decimal, InvalidOperation
-from arithmetic.base_generator import ProblemGenerator
-from arithmetic.helpers import step, jid, DELIM
+from arithmetic.base_generator import ProblemGenerator, StepStream, materialize
+from arithmetic.helpers import step, jid
 
 # New Op-Codes:
 # DEC_SHIFT: Shift decimal points (orig_dividend, orig_divisor, new_dividend, new_divisor, shift_places)
@@ -12,16 +13,123 @@ from arithmetic.helpers import step, jid, DELIM
 # M: Multiply step (quotient_digit, divisor, product) - Reuse
 # S: Subtract step (current_num, product, remainder) - Reuse
 # R: Final Remainder (if any) - Reuse (Likely 0 for terminating decimals)
+# REPEAT: A remainder recurs, so the digits since it first appeared repeat (remainder, repeating_digits)
 # PLACE_DP_Q: Place decimal in quotient (quotient_str_no_dp, position_from_right, final_quotient_str)
 
+def shift_divisor(a_str, b_str):
+    """Moves both decimal points until the divisor is an integer: ('7.5', '0.25') -> ('750', '25', 2)."""
+    a_dp = len(a_str.split(".")[1]) if '.' in a_str else 0
+    b_dp = len(b_str.split(".")[1]) if '.' in b_str else 0
+    shift_places = b_dp
+
+    a_i_str = a_str.replace(".", "")
+    b_i_str = b_str.replace(".", "")
+
+    # Calculate new dividend string after shift
+    if a_dp >= shift_places:
+        int_len = len(a_i_str) - a_dp + shift_places # Digits before the decimal point after shifting
+        new_a_str = a_i_str[:int_len] + '.' + a_i_str[int_len:]
+    else: # Need to add trailing zeros
+        new_a_str = a_i_str + '0' * (shift_places - a_dp) + '.'
+    new_a_str = new_a_str.rstrip('.') # Remove trailing dot if it ended up there
+    return new_a_str, b_i_str, shift_places # Divisor becomes integer
+
+def repeating_decimal(value) -> str:
+    """
+    Exact decimal notation of a non-negative Fraction, with the repeating block
+    in parentheses: 5/2 -> '2.5', 1/6 -> '0.1(6)', 22/7 -> '3.(142857)'.
+    A remainder-to-position map finds the cycle in O(pre-period + period) digits.
+    """
+    whole, rem = divmod(value.numerator, value.denominator)
+    digits, seen = [], {}
+    while rem and rem not in seen:
+        seen[rem] = len(digits)
+        digit, rem = divmod(rem * 10, value.denominator)
+        digits.append(str(digit))
+    if not digits:
+        return str(whole)
+    if rem:
+        start = seen[rem]
+        return f"{whole}." + "".join(digits[:start]) + "(" + "".join(digits[start:]) + ")"
+    return f"{whole}." + "".join(digits)
+
+def decimal_division_steps(a_str, b_str, zero_steps=False):
+    """
+    Yields DEC_SHIFT, DIV_SETUP, the long division and PLACE_DP_Q for a_str / b_str.
+    Once the dividend's digits are used up, zeros are brought down until the
+    remainder is 0 or a remainder recurs; then REPEAT names the repeating
+    digits and the trace stops after exactly one period.
+    zero_steps=True also shows a D step for every 0 quotient digit.
+    """
+    new_a_str, new_b_str, shift_places = shift_divisor(a_str, b_str)
+    # Combine args: op, originals, shifted, shift_count
+    yield step("DEC_SHIFT", f"{a_str}/{b_str}", f"{new_a_str}/{new_b_str}", shift_places)
+
+    dividend_digits = new_a_str.replace('.', '')
+    divisor = int(new_b_str)
+    dividend_dp_pos = new_a_str.find('.')
+    if dividend_dp_pos == -1: dividend_dp_pos = len(new_a_str) # Position after last digit if no decimal
+    yield step("DIV_SETUP", dividend_digits, divisor)
+
+    rem = 0
+    quotient = []
+    seen = {}  # remainder -> quotient length, once only zeros are brought down
+    processed_digits = 0
+    while processed_digits < len(dividend_digits) or rem > 0:
+        if processed_digits < len(dividend_digits):
+            digit = dividend_digits[processed_digits]
+        else: # Bring down a '0' after the decimal point
+            start = seen.get(rem)
+            if start is not None:
+                yield step("REPEAT", rem, "".join(quotient[start:]))
+                break
+            seen[rem] = len(quotient)
+            digit = '0'
+        cur = rem * 10 + int(digit)
+        # Show bring down step only AFTER the first quotient digit
+        if quotient:
+            yield step("B", rem, digit, cur)
+        processed_digits += 1
+
+        if cur < divisor:
+            # Only add an explicit 0 to the quotient once it has started or the decimal point is passed
+            if quotient or processed_digits > dividend_dp_pos:
+                quotient.append("0")
+                if zero_steps:
+                    yield step("D", cur, divisor, 0)
+            rem = cur
+            continue
+
+        q_dig = cur // divisor
+        prod = q_dig * divisor
+        yield step("D", cur, divisor, q_dig)
+        yield step("M", q_dig, divisor, prod)
+        yield step("S", cur, prod, cur - prod)
+        quotient.append(str(q_dig))
+        rem = cur - prod
+
+    # Args: quotient_digits_string, num_digits_before_dp_in_shifted_dividend
+    yield step("PLACE_DP_Q", "".join(quotient) or "0", dividend_dp_pos)
+
 class DecimalDivGenerator(ProblemGenerator):
     """
     Generates decimal division problems with detailed,
     long-division steps after shifting decimals.
+
+    By default only pairs with a terminating quotient of at most 4 decimal
+    places are drawn. With repeating=True every pair is accepted on the first
+    draw and non-terminating quotients are written like '0.1(6)'; the divisor
+    then has one decimal place, so the period stays under 99 digits.
     """
 
-    def generate(self) -> dict:
-        operation = "decimal_div"
+    def __init__(self, repeating=False):
+        self.repeating = repeating
+
+    def operands(self):
+        if self.repeating:
+            a = round(random.uniform(0.1, 99.9), random.randint(1, 2))
+            b = round(random.uniform(0.1, 9.9), 1)
+            return str(a), str(b)
         # Ensure non-zero divisor and terminating division with limited places
         attempts = 0
         while attempts < 20: # Increase attempts for finding suitable pairs
@@ -42,132 +150,28 @@ class DecimalDivGenerator(ProblemGenerator):
                 if abs(normalized_result.as_tuple().exponent) > 4:
                     attempts += 1
                     continue
-                # Check if divisor becomes integer easily
-                b_dp = len(b_str.split(".")[1]) if '.' in b_str else 0
-                if b_dp == 0: # Divisor is already integer, might be too simple? Maybe allow.
-                     pass # Allow integer divisors for now
-                break # Found a suitable pair
+                return a_str, b_str # Found a suitable pair
             except InvalidOperation:
                 attempts += 1
                 continue
-        else:
-            # Fallback if no good pair found
-            a_str, b_str = "7.5", "1.5" # 7.5 / 1.5 = 5
-            a_dec, b_dec = Decimal(a_str), Decimal(b_str)
-            result_dec = a_dec / b_dec
-
-        final_answer_str = str(result_dec.normalize())
-        if final_answer_str.startswith('.'): final_answer_str = '0' + final_answer_str
-        elif final_answer_str.startswith('-.'): final_answer_str = '-0' + final_answer_str[1:]
-
-        problem = f"{a_str} / {b_str}" # Use / for consistency
-        steps = []
-
-        # 1. Shift Decimals
-        a_dp = len(a_str.split(".")[1]) if '.' in a_str else 0
-        b_dp = len(b_str.split(".")[1]) if '.' in b_str else 0
-        shift_places = b_dp
-
-        a_i_str = a_str.replace(".", "")
-        b_i_str = b_str.replace(".", "")
-
-        # Calculate new dividend string after shift
-        if a_dp >= shift_places:
-            new_a_str = a_i_str[:a_dp - shift_places + len(a_i_str) - a_dp] + '.' + a_i_str[a_dp - shift_places + len(a_i_str) - a_dp:]
-        else: # Need to add trailing zeros
-            new_a_str = a_i_str + '0' * (shift_places - a_dp) + '.'
-        new_a_str = new_a_str.rstrip('.') # Remove trailing dot if it ended up there
-        new_b_str = b_i_str # Divisor becomes integer
-
-        # Combine args: op, originals, shifted, shift_count
-        steps.append(step("DEC_SHIFT", f"{a_str}/{b_str}", f"{new_a_str}/{new_b_str}", shift_places))
-
-        # Prepare for long division (using new_a_str as the number to divide)
-        dividend_str_ld = new_a_str.replace('.', '') # Use the potentially padded number string
-        divisor_ld = int(new_b_str)
-        dividend_dp_pos = new_a_str.find('.')
-        if dividend_dp_pos == -1: dividend_dp_pos = len(new_a_str) # Position after last digit if no decimal
-
-        steps.append(step("DIV_SETUP", dividend_str_ld, divisor_ld))
-
-        # 2. Perform Long Division (adapted from LongDivisionGenerator)
-        rem = 0
-        q_str = ""
-        dividend_digits = list(dividend_str_ld)
-        processed_digits = 0
-        current_num_str = "" # Keep track of the number being built/remainder
-
-        while processed_digits < len(dividend_digits) or rem > 0:
-             rem_before_bringdown = rem # Store remainder from previous step
-
-             # Determine current number being divided & digit brought down
-             if processed_digits < len(dividend_digits):
-                 digit = dividend_digits[processed_digits]
-                 current_num_str += digit
-                 cur = int(current_num_str)
-                 # Show bring down step only AFTER the first division step has produced a quotient digit
-                 if q_str:
-                     steps.append(step("B", rem_before_bringdown, digit, cur))
-             elif rem > 0: # Need to bring down '0' after decimal point
-                 digit = '0'
-                 current_num_str += digit # Append virtual zero
-                 cur = int(current_num_str)
-                 # Show bring down step only AFTER the first division step has produced a quotient digit
-                 if q_str:
-                     steps.append(step("B", rem_before_bringdown, digit, cur)) # Show bring down '0'
-             else: # Should terminate cleanly based on generator logic
-                 break
-
-             processed_digits += 1
-
-             if cur < divisor_ld:
-                 # Only add explicit 0 to quotient if we've already started it OR passed the decimal point position
-                 if q_str or processed_digits > dividend_dp_pos:
-                      q_str += "0"
-                      # Optionally add D step: steps.append(step("D", cur, divisor_ld, 0))
-                 rem = cur # Remainder is the current number itself
-                 current_num_str = str(rem) if rem > 0 else "" # Reset for next digit
-                 # Check if we need more precision (add more zeros?) - limited by generator logic
-                 if processed_digits >= len(dividend_digits) + 4: # Limit extra zeros added
-                      break # Avoid infinite loop for non-terminating (shouldn't happen)
-                 continue # Bring down next digit
-
-             q_dig = cur // divisor_ld
-             prod = q_dig * divisor_ld
-             new_rem = cur - prod
-
-             steps.append(step("D", cur, divisor_ld, q_dig))
-             steps.append(step("M", q_dig, divisor_ld, prod))
-             steps.append(step("S", cur, prod, new_rem))
-
-             q_str += str(q_dig)
-             rem = new_rem
-             current_num_str = str(rem) if rem > 0 else "" # Reset for next digit
-
-             # Termination condition check (if remainder is 0 and no more original digits)
-             if rem == 0 and processed_digits >= len(dividend_digits):
-                 break
-             # Limit precision
-             if len(q_str.replace('.','')) > len(dividend_str_ld) + 5: # Heuristic limit
-                 break
-
-
-        # 3. Place Decimal Point in Quotient
-        # Position is based on original decimal point position in the *shifted* dividend (new_a_str)
-        quotient_dp_pos = dividend_dp_pos # Num digits before decimal in shifted dividend
-
-        # Add step showing where decimal point goes based on calculation
-        # Args: quotient_digits_string, num_digits_before_dp_in_shifted_dividend
-        if not q_str: q_str = "0" # Handle cases where quotient is 0
-        steps.append(step("PLACE_DP_Q", q_str, quotient_dp_pos))
-
-        # 4. Final Answer Step (use precisely calculated one from Decimal)
-        steps.append(step("Z", final_answer_str))
+        # Fallback if no good pair found
+        return "7.5", "1.5" # 7.5 / 1.5 = 5
 
+    def generate(self) -> dict:
+        return materialize(self.generate_stream())
+
+    def generate_stream(self) -> dict:
+        a_str, b_str = self.operands()
+        final_answer_str = repeating_decimal(Fraction(a_str) / Fraction(b_str))
+        steps = StepStream(self._steps(a_str, b_str, final_answer_str))
         return dict(
             problem_id=jid(),
-            operation=operation,
-            problem=problem,
+            operation="decimal_div",
+            problem=f"{a_str} / {b_str}", # Use / for consistency
             steps=steps,
-            final_answer=final_answer_str
+            final_answer=steps.final_answer
         )
+
+    def _steps(self, a_str, b_str, final_answer_str):
+        yield from decimal_division_steps(a_str, b_str)
+        yield step("Z", final_answer_str)
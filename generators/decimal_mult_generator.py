@@ -1,7 +1,11 @@
 import random
-from decimal import Decimal, InvalidOperation
-from arithmetic.base_generator import ProblemGenerator
-from arithmetic.helpers import step, jid
+from arithmetic.base_generator import ProblemGenerator, StepStream, materialize
+from arithmetic.helpers import step, jid, DELIM, digits_range, random_digits
+
+try:
+    import numpy as np
+except ImportError:  # Optional: batches fall back to generate()
+    np = None
 
 # New Op-Codes:
 # MUL_SETUP: Show integer multiplication setup (int1_str, int2_str)
@@ -10,73 +14,164 @@ from arithmetic.helpers import step, jid
 # COUNT_DP: Count total decimal places in original factors (dp1, dp2, total_dp)
 # PLACE_DP: Place decimal point in the final integer sum (sum_int_str, total_dp, final_result_str)
 
+def place_decimal_point(int_str, dp) -> str:
+    """'1500', 2 -> '15'; '5', 2 -> '0.05': plain notation without trailing fractional zeros."""
+    int_str = int_str.zfill(dp + 1)
+    whole, frac = int_str[:len(int_str) - dp], int_str[len(int_str) - dp:].rstrip("0")
+    return whole + ("." + frac if frac else "")
+
+def long_multiplication_steps(top, bottom):
+    """
+    Yields MUL_SETUP, one MUL_PARTIAL per digit of bottom (rightmost first) and
+    ADD_PARTIALS for two non-negative integer digit strings. Each distinct
+    digit's partial product is computed once (at most 10 per top operand) and
+    shifted by appending zeros, so the work is linear in the size of the trace.
+    """
+    yield step("MUL_SETUP", top, bottom)
+    top_int = int(top)
+    cache = {}
+    terms = []
+    for shift, digit in enumerate(reversed(bottom)):
+        partial = cache.get(digit)
+        if partial is None:
+            partial = cache[digit] = str(top_int * int(digit))
+        zeros = "0" * shift
+        yield step("MUL_PARTIAL", digit, top, partial + zeros)
+        terms.append(partial + zeros if partial != "0" else "0")
+    yield step("ADD_PARTIALS", "+".join(terms), str(top_int * int(bottom)))
+
+def decimal_mult_steps(a_str, b_str):
+    """Yields the full decimal multiplication trace of a_str * b_str, ending with Z."""
+    a_dp = len(a_str.split(".")[1]) if "." in a_str else 0
+    b_dp = len(b_str.split(".")[1]) if "." in b_str else 0
+    total_dp = a_dp + b_dp
+    sum_str = None
+    for s in long_multiplication_steps(a_str.replace(".", ""), b_str.replace(".", "")):
+        yield s
+        if s.startswith("ADD_PARTIALS" + DELIM):
+            sum_str = s.rsplit(DELIM, 1)[1]
+    final_answer_str = place_decimal_point(sum_str, total_dp)
+    yield step("COUNT_DP", a_dp, b_dp, total_dp)
+    yield step("PLACE_DP", sum_str, total_dp, final_answer_str)
+    yield step("Z", final_answer_str)
+
+BATCH_CELLS = 1 << 22  # Partial-product digits held at once by decimal_mult_batch_steps()
+
+def _normalize(columns):
+    """Propagates carries through little-endian digit columns (last axis) of non-negative ints, in place."""
+    carry = 0
+    for col in range(columns.shape[-1]):
+        total = columns[..., col] + carry
+        columns[..., col] = total % 10
+        carry = total // 10
+    return columns
+
+def _digit_strings(columns) -> list:
+    """Decimal strings of the little-endian digit rows in the last axis (without leading zeros)."""
+    width = columns.shape[-1]
+    rows = columns.reshape(-1, width)[:, ::-1].astype(np.uint8) + 48
+    text = rows.tobytes()
+    return [text[i:i + width].lstrip(b"0").decode() or "0" for i in range(0, len(text), width)]
+
+def decimal_mult_batch_steps(pairs) -> list:
+    """
+    The decimal_mult_steps() traces of many (a_str, b_str) pairs at once
+    (needs NumPy). Factors become rows of digit matrices; the partial
+    products are the outer products of each top row with each bottom digit,
+    carried into digit columns, and the product sums their shifted columns.
+    Step strings are rendered from these matrices in a final pass.
+    """
+    tops = [a_str.replace(".", "") for a_str, _ in pairs]
+    bottoms = [b_str.replace(".", "") for _, b_str in pairs]
+    n, wt, wb = len(pairs), max(map(len, tops)), max(map(len, bottoms))
+    rows = max(1, BATCH_CELLS // (wb * (wt + 1)))
+    if n > rows:  # Bound the partial-product tensor for long factors
+        return [trace for i in range(0, n, rows) for trace in decimal_mult_batch_steps(pairs[i:i + rows])]
+    def matrix(strings, width):
+        text = "".join(x.rjust(width, "0") for x in strings).encode()
+        return (np.frombuffer(text, dtype=np.uint8).reshape(n, width)[:, ::-1] - 48).astype(np.int64)
+    top, bottom = matrix(tops, wt), matrix(bottoms, wb)
+    outer = top[:, None, :] * bottom[:, :, None]  # (problem, bottom digit, top digit)
+    partials = np.zeros((n, wb, wt + 1), dtype=np.int64)
+    partials[:, :, :wt] = outer
+    partial_strs = _digit_strings(_normalize(partials))
+    product = np.zeros((n, wt + wb), dtype=np.int64)
+    for shift in range(wb):
+        product[:, shift:shift + wt] += outer[:, shift]
+    product_strs = _digit_strings(_normalize(product))
+
+    traces = []
+    for p, ((a_str, b_str), top_str, bottom_str) in enumerate(zip(pairs, tops, bottoms)):
+        steps = [step("MUL_SETUP", top_str, bottom_str)]
+        terms = []
+        for shift, digit in enumerate(reversed(bottom_str)):
+            partial = partial_strs[p * wb + shift]
+            zeros = "0" * shift
+            steps.append(step("MUL_PARTIAL", digit, top_str, partial + zeros))
+            terms.append(partial + zeros if partial != "0" else "0")
+        sum_str = product_strs[p]
+        steps.append(step("ADD_PARTIALS", "+".join(terms), sum_str))
+        a_dp = len(a_str.split(".")[1]) if "." in a_str else 0
+        b_dp = len(b_str.split(".")[1]) if "." in b_str else 0
+        final_answer_str = place_decimal_point(sum_str, a_dp + b_dp)
+        steps.append(step("COUNT_DP", a_dp, b_dp, a_dp + b_dp))
+        steps.append(step("PLACE_DP", sum_str, a_dp + b_dp, final_answer_str))
+        steps.append(step("Z", final_answer_str))
+        traces.append(steps)
+    return traces
+
+def random_decimal(digits, decimals) -> str:
+    """A decimal string with a digit count from digits and decimal places from decimals ((lo, hi), lo may be 0)."""
+    int_str = random_digits(digits)
+    dp = random.randint(*decimals)
+    if not dp:
+        return int_str
+    int_str = int_str.zfill(dp + 1)
+    return int_str[:-dp] + "." + int_str[-dp:]
+
 class DecimalMultGenerator(ProblemGenerator):
     """
     Generates decimal multiplication problems with detailed,
     long-multiplication steps.
+
+    By default both factors are up to 99.9 with 1-2 decimal places. Pass
+    digits (n or (lo, hi) digits per factor) and decimals ((lo, hi) places)
+    for larger problems, e.g. DecimalMultGenerator(digits=(50, 300), decimals=(0, 10)).
     """
 
+    def __init__(self, digits=None, decimals=(1, 2)):
+        self.digits = digits and digits_range(digits)
+        self.decimals = decimals
+
+    def operands(self):
+        if self.digits is None:
+            a = round(random.uniform(0.1, 99.9), random.randint(1, 2))
+            b = round(random.uniform(0.1, 99.9), random.randint(1, 2))
+            return str(a), str(b)
+        return random_decimal(self.digits, self.decimals), random_decimal(self.digits, self.decimals)
+
     def generate(self) -> dict:
-        a = round(random.uniform(0.1, 99.9), random.randint(1, 2))
-        b = round(random.uniform(0.1, 99.9), random.randint(1, 2))
-        a_str, b_str = str(a), str(b)
-        operation = "decimal_mul"
-        problem = f"{a_str} * {b_str}"
-
-        # Calculate exact result using Decimal for final answer
-        res_decimal = Decimal(a_str) * Decimal(b_str)
-        final_answer_str = str(res_decimal.normalize())
-        if final_answer_str.startswith('.'): final_answer_str = '0' + final_answer_str
-        elif final_answer_str.startswith('-.'): final_answer_str = '-0' + final_answer_str[1:]
-
-        # --- Generate Steps ---
-        steps = []
-
-        # 1. Setup Integer Multiplication
-        a_dp = len(a_str.split(".")[1]) if '.' in a_str else 0
-        b_dp = len(b_str.split(".")[1]) if '.' in b_str else 0
-        total_dp = a_dp + b_dp
-
-        a_i_str = a_str.replace(".", "")
-        b_i_str = b_str.replace(".", "")
-        a_i = int(a_i_str)
-        b_i = int(b_i_str)
-        steps.append(step("MUL_SETUP", a_i_str, b_i_str))
-
-        # 2. Calculate Partial Products
-        partial_products = []
-        shift = 0
-        for digit_char in reversed(b_i_str):
-            digit = int(digit_char)
-            partial_prod_val = a_i * digit
-            partial_prod_str = str(partial_prod_val)
-            # Store the shifted value for summation later
-            shifted_partial_prod_val = partial_prod_val * (10**shift)
-            partial_products.append(shifted_partial_prod_val)
-            # Add step showing the partial product calculation
-            steps.append(step("MUL_PARTIAL", digit, a_i_str, partial_prod_str + ('0'*shift)))
-            shift += 1
-
-        # 3. Add Partial Products
-        sum_val = sum(partial_products)
-        sum_str = str(sum_val)
-        # Combine partial products into one string for the step argument
-        pp_sum_str = "+".join(str(pp) for pp in partial_products)
-        steps.append(step("ADD_PARTIALS", pp_sum_str, sum_str)) # op, partial_products_sum_str, result_sum_str
-
-        # 4. Count Decimal Places
-        steps.append(step("COUNT_DP", a_dp, b_dp, total_dp))
-
-        # 5. Place Decimal Point
-        steps.append(step("PLACE_DP", sum_str, total_dp, final_answer_str))
-
-        # 6. Final Answer Step
-        steps.append(step("Z", final_answer_str))
+        return materialize(self.generate_stream())
 
+    def generate_stream(self) -> dict:
+        a_str, b_str = self.operands()
+        steps = StepStream(decimal_mult_steps(a_str, b_str))
         return dict(
             problem_id=jid(),
-            operation=operation,
-            problem=problem,
+            operation="decimal_mul",
+            problem=f"{a_str} * {b_str}",
             steps=steps,
-            final_answer=final_answer_str
+            final_answer=steps.final_answer
         )
+
+    def generate_batch(self, n) -> list:
+        if np is None:
+            return super().generate_batch(n)
+        pairs = [self.operands() for _ in range(n)]
+        return [dict(
+            problem_id=jid(),
+            operation="decimal_mul",
+            problem=f"{a_str} * {b_str}",
+            steps=steps,
+            final_answer=steps[-1].split(DELIM, 1)[1]
+        ) for (a_str, b_str), steps in zip(pairs, decimal_mult_batch_steps(pairs))]
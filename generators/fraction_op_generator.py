@@ -1,75 +1,242 @@
 import random
 import math
-from fractions import Fraction
 from arithmetic.base_generator import ProblemGenerator
 from arithmetic.helpers import step, jid, DELIM
+from arithmetic.generators.sieve import shared_sieve, factor_str, euclid_steps, factor_gcd_steps
+
+try:
+    import numpy as np
+except ImportError:  # Optional: batches fall back to generate()
+    np = None
+
+def _frac_str(num, den) -> str:
+    """str(Fraction(num, den)) for an already reduced fraction with den > 0."""
+    return f"{num}/{den}" if den != 1 else str(num)
+
+def _reduced_str(num, den) -> str:
+    g = math.gcd(num, den)
+    return _frac_str(num // g, den // g)
+
+def factorize(n) -> tuple:
+    """((p, e), ...) of n >= 1, from the shared smallest-prime-factor sieve."""
+    return shared_sieve(n).factorize(n)
+
+def _gcd_steps(a, b, detail, sieve):
+    """The sub-trace deriving gcd(a, b): prime factorizations when both are in the sieve, else Euclid."""
+    if detail == "factor" and a in sieve and b in sieve:
+        return factor_gcd_steps(step, sieve, a, b)
+    return euclid_steps(step, a, b)
+
+def _term_str(term) -> str:
+    """'2 3/4' for a mixed number (whole, num, den), else str(Fraction(num, den))."""
+    whole, num, den = term
+    return f"{whole} {num}/{den}" if whole else _reduced_str(num, den)
+
+def _improper(term):
+    """(num, den, MIX step or None): the operand to work with, converted if it is a mixed number."""
+    whole, num, den = term
+    if not whole:
+        return num, den, None
+    improper = whole * den + num
+    return improper, den, step("MIX", _term_str(term), f"{improper}/{den}")
+
+def _result_steps(out_num, out_den, detail=None, sieve=None):
+    """F (when the unreduced result renders differently from its lowest terms) and Z; with detail, F follows its GCD sub-trace."""
+    g = math.gcd(out_num, out_den)
+    final_answer_str = _frac_str(out_num // g, out_den // g)
+    if final_answer_str != f"{out_num}/{out_den}":
+        if detail: yield from _gcd_steps(abs(out_num), out_den, detail, sieve)
+        yield step("F", f"{out_num}/{out_den}", final_answer_str)
+    yield step("Z", final_answer_str)
+
+def fraction_chain_steps(terms, ops, detail=None):
+    """
+    Yields the trace of terms[0] ops[0] terms[1] ops[1] ... for + and -:
+    per term an L for the new common denominator, C conversions, then A/S
+    on the numerators; finally F and Z. Terms are (whole, num, den) ints,
+    whole 0 for plain fractions. The running denominator is the LCD of
+    all denominators so far, kept with its prime exponents: a new
+    denominator only multiplies in the primes whose exponent it raises
+    (from the shared sieve), so no LCD is recomputed and all arithmetic
+    stays on ints.
+
+    detail adds sub-traces: 'euclid' derives the GCD behind each L and F
+    with EUC steps and G, 'factor' shows PF prime factorizations instead
+    (the running denominator's comes from its exponents for free). Numbers
+    beyond the sieve fall back to Euclid.
+    """
+    max_den = max(den for _, _, den in terms)
+    sieve = shared_sieve(max_den * max_den)  # Two-term results stay in range
+    acc_num, acc_den, mix = _improper(terms[0])
+    if mix: yield mix
+    acc_str = None  # The first operand is shown in lowest terms
+    exps = dict(sieve.factorize(acc_den))
+    for term, op in zip(terms[1:], ops):
+        num, den, mix = _improper(term)
+        if mix: yield mix
+        factors = sieve.factorize(den)
+        if detail and acc_den != den:
+            if detail == "factor":
+                yield step("PF", acc_den, factor_str(sorted(exps.items())))
+                yield step("PF", den, factor_str(factors))
+            else:
+                yield from euclid_steps(step, acc_den, den)
+        scale = 1
+        for p, e in factors:
+            have = exps.get(p, 0)
+            if e > have:
+                scale *= p ** (e - have)
+                exps[p] = e
+        lcd = acc_den * scale
+        if acc_den != den: yield step("L", acc_den, den, lcd)
+        if scale != 1:
+            yield step("C", acc_str or _reduced_str(acc_num, acc_den), lcd, f"{acc_num * scale}/{lcd}")
+            acc_num *= scale
+        if den != lcd:
+            term_str = _reduced_str(num, den)
+            num *= lcd // den
+            yield step("C", term_str, lcd, f"{num}/{lcd}")
+        out_num = acc_num + num if op == "+" else acc_num - num
+        yield step("A" if op == "+" else "S", acc_num, num, out_num)
+        acc_num, acc_den = out_num, lcd
+        acc_str = f"{acc_num}/{acc_den}"
+    yield from _result_steps(acc_num, acc_den, detail, sieve)
+
+def fraction_product_steps(term1, term2, op_symbol, detail=None):
+    """
+    Yields the trace of term1 * term2 or term1 / term2: M steps (after I
+    for /), then F and Z; detail as in fraction_chain_steps().
+    """
+    n1, d1, mix1 = _improper(term1)
+    n2, d2, mix2 = _improper(term2)
+    yield from filter(None, (mix1, mix2))
+    if op_symbol == "/":
+        g = math.gcd(n2, d2)
+        n2, d2 = d2 // g, n2 // g  # The divisor's reciprocal, in lowest terms
+        yield step("I", _frac_str(d2, n2), f"{n2}/{d2}") # Invert divisor
+    out_num, out_den = n1 * n2, d1 * d2
+    yield step("M", n1, n2, out_num) # Multiply numerators
+    yield step("M", d1, d2, out_den) # Multiply denominators
+    sieve = shared_sieve(max(out_num, out_den)) if detail == "factor" else None
+    yield from _result_steps(out_num, out_den, detail, sieve)
+
+def fraction_batch_steps(operands, op_symbol) -> list:
+    """
+    The generate() traces of many (n1, d1, n2, d2) problems with one
+    operation at once (needs NumPy). Reduced operands, LCDs, converted
+    numerators, products and reduced results are computed over whole
+    arrays with np.gcd / np.lcm; the step strings are rendered at the end.
+    """
+    n1, d1, n2, d2 = np.array(operands, dtype=np.int64).reshape(-1, 4).T
+    g1, g2 = np.gcd(n1, d1), np.gcd(n2, d2)
+    r1n, r1d, r2n, r2d = n1 // g1, d1 // g1, n2 // g2, d2 // g2
+    if op_symbol in "+-":
+        lcd = np.lcm(d1, d2)
+        n1c, n2c = n1 * (lcd // d1), n2 * (lcd // d2)
+        out_num, out_den = (n1c + n2c if op_symbol == "+" else n1c - n2c), lcd
+        columns = (n1, d1, n2, d2, r1n, r1d, r2n, r2d, lcd, n1c, n2c)
+    elif op_symbol == "*":
+        out_num, out_den = n1 * n2, d1 * d2
+        columns = (n1, d1, n2, d2, r1n, r1d, r2n, r2d)
+    else:
+        # The inverse of n2/d2 is the reduced d2/n2, i.e. r2d/r2n
+        out_num, out_den = n1 * r2d, d1 * r2n
+        columns = (n1, d1, n2, d2, r1n, r1d, r2n, r2d)
+    g = np.gcd(out_num, out_den)
+    res_num, res_den = out_num // g, out_den // g
+    columns = [c.tolist() for c in columns + (out_num, out_den, res_num, res_den)]
+
+    add_op = "A" if op_symbol == "+" else "S"
+    traces = []
+    for row in zip(*columns):
+        n1, d1, n2, d2, r1n, r1d, r2n, r2d = row[:8]
+        out_num, out_den, res_num, res_den = row[-4:]
+        f1, f2 = _frac_str(r1n, r1d), _frac_str(r2n, r2d)
+        steps = []
+        if op_symbol in "+-":
+            lcd, n1c, n2c = row[8:11]
+            if d1 != d2: steps.append(step("L", d1, d2, lcd))
+            if d1 != lcd: steps.append(step("C", f1, lcd, f"{n1c}/{lcd}"))
+            if d2 != lcd: steps.append(step("C", f2, lcd, f"{n2c}/{lcd}"))
+            steps.append(step(add_op, n1c, n2c, out_num))
+        elif op_symbol == "*":
+            steps += [step("M", n1, n2, out_num), step("M", d1, d2, out_den)]
+        else:
+            steps.append(step("I", f2, f"{r2d}/{r2n}"))
+            steps += [step("M", n1, r2d, out_num), step("M", d1, r2n, out_den)]
+        final_answer_str = _frac_str(res_num, res_den)
+        if (res_num, res_den) != (out_num, out_den) or out_den == 1:
+            steps.append(step("F", f"{out_num}/{out_den}", final_answer_str))
+        steps.append(step("Z", final_answer_str))
+        traces.append(steps)
+    return traces
 
 class FractionOpGenerator(ProblemGenerator):
-    """Generates fraction arithmetic problems (+, -, *, /)."""
+    """
+    Generates fraction arithmetic problems (+, -, *, /).
+
+    '+-' generates problems whose operators are each + or -. terms (n or
+    (lo, hi)) sets how many fractions a +, - or '+-' chain has, mixed
+    makes about half of the operands mixed numbers like '2 3/4', and
+    max_den is the largest denominator (and numerator), e.g.
+    FractionOpGenerator('+-', terms=(3, 6), mixed=True, max_den=24).
+
+    detail ('euclid' or 'factor') adds the GCD / LCD sub-traces described
+    in fraction_chain_steps() before every L and F step.
+    """
 
-    def __init__(self, op_symbol: str):
-        if op_symbol not in ['+', '-', '*', '/']:
-            raise ValueError("op_symbol must be '+', '-', '*', or '/'")
+    def __init__(self, op_symbol: str, terms=2, mixed=False, max_den=9, detail=None):
+        if op_symbol not in ['+', '-', '*', '/', '+-']:
+            raise ValueError("op_symbol must be '+', '-', '*', '/' or '+-'")
         self.op_symbol = op_symbol
-        op_map = {'+':'add','-':'sub','*':'mul','/':'div'}
+        op_map = {'+':'add','-':'sub','*':'mul','/':'div','+-':'add_sub'}
         self.op_name = f"fraction_{op_map[op_symbol]}" # Perform lookup outside f-string braces
+        self.terms = (terms, terms) if isinstance(terms, int) else tuple(terms)
+        if not 2 <= self.terms[0] <= self.terms[1]:
+            raise ValueError(f"invalid number of terms {terms!r}")
+        if op_symbol in ['*', '/'] and self.terms != (2, 2):
+            raise ValueError("chains of more than two fractions support '+', '-' and '+-'")
+        if max_den < 2:
+            raise ValueError("max_den must be at least 2")
+        if detail not in (None, 'euclid', 'factor'):
+            raise ValueError("detail must be None, 'euclid' or 'factor'")
+        self.mixed, self.max_den, self.detail = mixed, max_den, detail
 
-    def generate(self) -> dict:
-        n1, d1 = random.randint(1, 9), random.randint(2, 9)
-        n2, d2 = random.randint(1, 9), random.randint(2, 9)
-        # Ensure non-zero denominator for division's second operand (n2/d2 -> d2/n2)
-        if self.op_symbol == '/' and n2 == 0:
-             n2 = random.randint(1, 9) # Ensure n2 is non-zero for inversion
+    def operands(self):
+        """(n1, d1, n2, d2) of n1/d1 op n2/d2."""
+        n1, d1 = random.randint(1, self.max_den), random.randint(2, self.max_den)
+        n2, d2 = random.randint(1, self.max_den), random.randint(2, self.max_den)
+        return n1, d1, n2, d2
 
-        f1, f2 = Fraction(n1, d1), Fraction(n2, d2)
-        steps = []
-        res = None
-        problem = f"{f1} {self.op_symbol} {f2}"
-
-        if self.op_symbol in "+-":
-            try:
-                lcd = math.lcm(d1, d2)
-            except AttributeError: # Fallback for Python < 3.9
-                lcd = (d1 * d2) // math.gcd(d1, d2)
-
-            if d1 != d2: steps.append(step("L", d1, d2, lcd)) # Find LCD using denominators
-            n1c, n2c = n1 * (lcd // d1), n2 * (lcd // d2) # Calculate correct converted numerators
-            if d1 != lcd: steps.append(step("C", str(f1), lcd, f"{n1c}/{lcd}")) # Convert f1
-            if d2 != lcd: steps.append(step("C", str(f2), lcd, f"{n2c}/{lcd}")) # Convert f2
-            out_num = n1c + n2c if self.op_symbol == "+" else n1c - n2c
-            steps.append(step("A" if self.op_symbol == "+" else "S", n1c, n2c, out_num)) # Add/Sub numerators
-            res = Fraction(out_num, lcd)
-            out_den = lcd # Denominator before simplification
-
-        elif self.op_symbol == "*":
-            out_num, out_den = n1 * n2, d1 * d2
-            steps += [step("M", n1, n2, out_num), step("M", d1, d2, out_den)] # Multiply numerators/denominators
-            res = Fraction(out_num, out_den)
-            # lcd = out_den # Not really lcd, but denominator before simplification
-
-        else: # division '/'
-            if n2 == 0: # Should be caught by earlier check, but safeguard
-                return self.generate() # Retry if somehow n2 is 0
-            inv = Fraction(d2, n2)
-            # Show the fully inverted fraction string
-            inv_str = f"{inv.numerator}/{inv.denominator}"
-            steps.append(step("I", str(f2), inv_str)) # Invert divisor
-            out_num, out_den = n1 * inv.numerator, d1 * inv.denominator # Use inverted parts
-            # Show the correct multiplication steps
-            steps += [step("M", n1, inv.numerator, out_num), step("M", d1, inv.denominator, out_den)] # Multiply
-            res = Fraction(out_num, out_den)
-            # out_den is already the correct denominator before simplification
-
-        final_answer_str = str(res)
-        # Determine pre-simplification string based on operation (using out_den)
-        pre_simp_str = f"{out_num}/{out_den}"
-
-
-        # Add simplification step if needed
-        if final_answer_str != pre_simp_str and '/' in pre_simp_str:
-            steps.append(step("F", pre_simp_str, final_answer_str)) # Simplify fraction
-
-        steps.append(step("Z", final_answer_str)) # Final answer step
+    def _term(self):
+        if self.mixed and random.random() < 0.5:
+            den = random.randint(2, self.max_den)
+            num = random.randint(1, den - 1)
+            g = math.gcd(num, den)
+            return random.randint(1, 9), num // g, den // g
+        return 0, random.randint(1, self.max_den), random.randint(2, self.max_den)
+
+    def problem_terms(self):
+        """(terms, ops): terms as (whole, num, den), whole 0 for plain fractions."""
+        if self.terms == (2, 2) and not self.mixed:
+            n1, d1, n2, d2 = self.operands()
+            terms = [(0, n1, d1), (0, n2, d2)]
+        else:
+            terms = [self._term() for _ in range(random.randint(*self.terms))]
+        if self.op_symbol == '+-':
+            ops = [random.choice('+-') for _ in terms[1:]]
+        else:
+            ops = [self.op_symbol] * (len(terms) - 1)
+        return terms, ops
+
+    def generate(self) -> dict:
+        terms, ops = self.problem_terms()
+        problem = _term_str(terms[0]) + "".join(f" {op} {_term_str(term)}" for op, term in zip(ops, terms[1:]))
+        if self.op_symbol in ['*', '/']:
+            steps = list(fraction_product_steps(terms[0], terms[1], self.op_symbol, self.detail))
+        else:
+            steps = list(fraction_chain_steps(terms, ops, self.detail))
+        final_answer_str = steps[-1].split(DELIM, 1)[1]
 
         return dict(
             problem_id=jid(),
@@ -78,3 +245,15 @@ class FractionOpGenerator(ProblemGenerator):
             steps=steps,
             final_answer=final_answer_str
         )
+
+    def generate_batch(self, n) -> list:
+        if np is None or self.op_symbol == '+-' or self.terms != (2, 2) or self.mixed or self.detail:
+            return super().generate_batch(n)
+        operands = [self.operands() for _ in range(n)]
+        return [dict(
+            problem_id=jid(),
+            operation=self.op_name,
+            problem=f"{_reduced_str(n1, d1)} {self.op_symbol} {_reduced_str(n2, d2)}",
+            steps=steps,
+            final_answer=steps[-1].split(DELIM, 1)[1]
+        ) for (n1, d1, n2, d2), steps in zip(operands, fraction_batch_steps(operands, self.op_symbol))]
@@ -1,82 +1,99 @@
 import random
-from arithmetic.base_generator import ProblemGenerator
-from arithmetic.helpers import step, jid, DELIM
+from arithmetic.base_generator import ProblemGenerator, StepStream, materialize
+from arithmetic.helpers import step, jid, digits_range, random_digits
+from arithmetic.generators.property_samplers import division_dividend
 
-class LongDivisionGenerator(ProblemGenerator):
-    """Generates long division problems (e.g., 1234 / 56)."""
-
-    def generate(self) -> dict:
-        dividend = random.randint(10, 9999)
-        divisor = random.randint(2, 99)
-        steps = []
-        operation = "long_division"
-        problem = f"{dividend} / {divisor}" # Use / for consistency
-
-        if dividend < divisor:  # trivial remainder-only case
-            final_answer_str = f"0 R{dividend}"
-            steps.append(step("R", dividend))
-        else:
-            rem = 0
-            q_str = ""
-            dividend_str = str(dividend)
-            current_num_str = "" # Keep track of the number being built/remainder
+def long_division_steps(dividend, divisor):
+    """
+    Yields the long division trace of dividend (an int or a digit string) by
+    divisor: D/M/S per quotient digit, B per brought-down digit, R, then Z.
+    The running remainder is kept as an int below 10 * divisor, so each digit
+    costs O(len(divisor)) and the trace is linear in the dividend length.
+    """
+    rem = 0
+    quotient = bytearray()  # ASCII digits; starts at the first non-zero one
+    last_was_s = False
+    for digit in str(dividend):
+        cur = rem * 10 + int(digit)
+        # Bring-down steps start only after the first quotient digit
+        if quotient:
+            yield step("B", rem, digit, cur)
+        if cur < divisor:
+            # Leading digits simply accumulate; later ones put a 0 in the quotient
+            if quotient:
+                quotient.append(48)  # "0"
+            rem = cur
+            last_was_s = False
+            continue
 
-            for i, digit in enumerate(dividend_str):
-                rem_before_bringdown = rem # Store remainder from previous step
-                current_num_str += digit
-                cur = int(current_num_str)
+        q_dig = cur // divisor
+        prod = q_dig * divisor
+        rem = cur - prod
+        yield step("D", cur, divisor, q_dig)
+        yield step("M", q_dig, divisor, prod)
+        yield step("S", cur, prod, rem)
+        quotient.append(48 + q_dig)
+        last_was_s = True
 
-                # Show bring down step only AFTER the first division step has produced a quotient digit
-                if q_str: # If we have already started the quotient string
-                    # Args: Remainder Before, Digit Brought Down, New Number to Divide
-                    steps.append(step("B", rem_before_bringdown, digit, cur))
-                # Else: This is the initial part being formed (e.g., 1, then 18 for 1834/5)
+    if not quotient:  # dividend < divisor: trivial remainder-only case
+        yield step("R", rem)
+        yield step("Z", f"0 R{rem}")
+        return
+    # The last S already shows the remainder
+    if rem > 0 and not last_was_s:
+        yield step("R", rem)
+    yield step("Z", quotient.decode() + (f" R{rem}" if rem > 0 else ""))
 
-                if cur < divisor:
-                    # If it's the first group and less than divisor, handle initial 0 implicitly
-                    # Only add explicit 0 to quotient if we've already started it
-                    if q_str:
-                         q_str += "0"
-                         # Optionally add D step: steps.append(step("D", cur, divisor, 0))
-                    rem = cur # Remainder is the current number itself
-                    current_num_str = str(rem) if rem > 0 else "" # Reset for next digit
-                    continue # Skip division steps, get next digit
+class LongDivisionGenerator(ProblemGenerator):
+    """
+    Generates long division problems (e.g., 1234 / 56).
 
-                # cur >= divisor
-                q_dig = cur // divisor
-                prod = q_dig * divisor
-                new_rem = cur - prod
+    By default dividends are up to 9999 and divisors up to 99. Pass digit
+    counts (n or (lo, hi)) for larger problems, e.g.
+    LongDivisionGenerator(dividend_digits=(50, 500), divisor_digits=(1, 6)).
 
-                # Add standard long division steps
-                # The first D, M, S steps implicitly cover the initial part
-                steps.append(step("D", cur, divisor, q_dig))
-                steps.append(step("M", q_dig, divisor, prod))
-                steps.append(step("S", cur, prod, new_rem))
+    zero_digits (the number of 0s in the quotient) and exact (remainder zero
+    or not) build the dividend from a quotient with that profile instead;
+    its length then follows from the dividend_digits range only roughly.
+    """
 
-                q_str += str(q_dig)
-                rem = new_rem
-                current_num_str = str(rem) if rem > 0 else "" # Reset for next digit
+    def __init__(self, dividend_digits=None, divisor_digits=None, zero_digits=None, exact=None):
+        self.dividend_digits = dividend_digits and digits_range(dividend_digits)
+        self.divisor_digits = divisor_digits and digits_range(divisor_digits)
+        self.zero_digits, self.exact = zero_digits, exact
+        self.profiled = zero_digits is not None or exact is not None
+        if zero_digits is not None and zero_digits < 0:
+            raise ValueError("zero_digits must be non-negative")
 
-            # Final remainder check (No change needed here)
-            if rem > 0:
-                last_op_rem = None
-                if steps and steps[-1].startswith("S" + DELIM):
-                    try:
-                        last_op_rem = int(steps[-1].split(DELIM)[-1])
-                    except ValueError:
-                        pass
-                # Only add R step if remainder wasn't the result of the last S step
-                if last_op_rem != rem:
-                    steps.append(step("R", rem)) # Remainder
+    def _divisor(self):
+        if self.divisor_digits is None:
+            return random.randint(2, 99)
+        return max(2, int(random_digits(self.divisor_digits)))
 
-            final_answer_str = f"{int(q_str)}" + (f" R{rem}" if rem > 0 else "")
+    def operands(self):
+        """(dividend, divisor); the dividend is a digit string when dividend_digits or a profile is set."""
+        if self.profiled:
+            divisor = self._divisor()
+            # Quotient about as long as a dividend drawn from the range would give
+            length = random.randint(*(self.dividend_digits or (2, 4))) - len(str(divisor)) + 1
+            zeros = self.zero_digits or 0
+            return division_dividend(divisor, max(length, zeros + 1), zeros, self.exact), divisor
+        if self.dividend_digits is None:
+            dividend = random.randint(10, 9999)
+        else:
+            dividend = random_digits(self.dividend_digits)
+        return dividend, self._divisor()
 
-        steps.append(step("Z", final_answer_str)) # Final answer step
+    def generate(self) -> dict:
+        return materialize(self.generate_stream())
 
+    def generate_stream(self) -> dict:
+        dividend, divisor = self.operands()
+        steps = StepStream(long_division_steps(dividend, divisor))
         return dict(
             problem_id=jid(),
-            operation=operation,
-            problem=problem,
+            operation="long_division",
+            problem=f"{dividend} / {divisor}", # Use / for consistency
             steps=steps,
-            final_answer=final_answer_str
+            final_answer=steps.final_answer
         )
@@ -0,0 +1,135 @@
+import random
+from functools import lru_cache
+
+# -----------------------------------------------------------
+# Constructive operand samplers for property profiles.
+#
+# Instead of drawing operands uniformly and rejecting those without the
+# wanted property, these build them column by column from the right: the
+# columns that should carry (or borrow) are chosen first, then each
+# column's digits are drawn from the pairs that give exactly that outcome
+# for the incoming carry. Every draw hits the profile. Operands are digit
+# strings, most significant digit first; lead and tail are the smallest
+# allowed first and last digits (1 avoids leading / trailing zeros).
+# -----------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _add_pairs(lo1, lo2, cin, carry):
+    """(d1, d2) with digits >= lo1 / lo2 whose column sum plus cin carries iff carry."""
+    return tuple((d1, d2) for d1 in range(lo1, 10) for d2 in range(lo2, 10)
+                 if (d1 + d2 + cin >= 10) == carry)
+
+@lru_cache(maxsize=None)
+def _sub_pairs(lo1, lo2, bin_, borrow, top):
+    """(d1, d2) whose column difference after bin_ borrows iff borrow; the top column stays positive."""
+    return tuple((d1, d2) for d1 in range(lo1, 10) for d2 in range(lo2, 10)
+                 if (d1 - bin_ < d2) == borrow and not (top and d1 - bin_ <= d2))
+
+def _bounds(col, n, lead, tail):
+    """Smallest digit allowed in column col (0 = rightmost) of an n-digit operand."""
+    lo = lead if col == n - 1 else 0
+    return max(lo, tail) if col == 0 else lo
+
+def carry_operands(n, carries, lead=1, tail=0):
+    """Two n-digit strings whose column addition carries out of exactly carries columns."""
+    if not 0 <= carries <= n:
+        raise ValueError(f"{carries} carries do not fit in {n} columns")
+    carry_cols = set(random.sample(range(n), carries))
+    top, bottom = bytearray(n), bytearray(n)
+    cin = 0
+    for col in range(n):
+        lo = _bounds(col, n, lead, tail)
+        carry = col in carry_cols
+        d1, d2 = random.choice(_add_pairs(lo, lo, cin, carry))
+        top[n - 1 - col], bottom[n - 1 - col] = 48 + d1, 48 + d2
+        cin = int(carry)
+    return top.decode(), bottom.decode()
+
+def _borrow_runs(n, borrows, chain):
+    """Start columns and lengths of the borrow runs: borrows columns below the top one, longest run chain."""
+    slots = n - 1  # The top column never borrows out: the minuend is the larger number
+    if chain is None:
+        cols = sorted(random.sample(range(slots), borrows))
+        runs = []
+        for col in cols:
+            if runs and runs[-1][0] + runs[-1][1] == col:
+                runs[-1][1] += 1
+            else:
+                runs.append([col, 1])
+        return runs
+    # One run of length chain, the others 1..chain long, separated by at least one column
+    r_min = -(-borrows // chain)
+    r_max = min(borrows - chain + 1, slots - borrows + 1)
+    if chain < 1 or borrows < chain or r_min > r_max:
+        raise ValueError(f"{borrows} borrows with a longest chain of {chain} do not fit in {n} columns")
+    runs = random.randint(r_min, r_max)
+    lengths, rem = [chain], borrows - chain
+    for left in range(runs - 1, 0, -1):
+        length = random.randint(max(1, rem - chain * (left - 1)), min(chain, rem - (left - 1)))
+        lengths.append(length)
+        rem -= length
+    random.shuffle(lengths)
+    # Stars and bars: spread the spare columns over the runs + 1 gaps
+    spare = slots - borrows - (runs - 1)
+    cuts = sorted(random.sample(range(spare + runs), runs))
+    gaps = [b - a - 1 for a, b in zip([-1] + cuts, cuts)]
+    col, starts = 0, []
+    for i, (gap, length) in enumerate(zip(gaps, lengths)):
+        col += gap + (i > 0)
+        starts.append([col, length])
+        col += length
+    return starts
+
+def borrow_operands(n, borrows=None, chain=None, lead=1, tail=0):
+    """
+    Minuend and subtrahend (n-digit strings, minuend larger) whose column
+    subtraction borrows in exactly borrows columns. With chain, the longest
+    run of consecutive borrows is chain columns, and each run after its
+    first column borrows across zeros of the minuend (as in 1000 - 1).
+    """
+    if borrows is None:
+        borrows = chain or 0
+    if not 0 <= borrows <= n - 1:
+        raise ValueError(f"{borrows} borrows do not fit in {n} columns")
+    runs = _borrow_runs(n, borrows, chain)
+    borrow_cols, zero_cols = set(), set()
+    for start, length in runs:
+        borrow_cols.update(range(start, start + length))
+        if chain is not None:
+            zero_cols.update(range(start + 1, start + length))
+    minuend, subtrahend = bytearray(n), bytearray(n)
+    bin_ = 0
+    for col in range(n):
+        lo = _bounds(col, n, lead, tail)
+        if col in zero_cols:
+            d1, d2 = 0, random.randint(lo, 9)  # 0 - d2 - 1 always borrows again
+        else:
+            d1, d2 = random.choice(_sub_pairs(lo, lo, bin_, col in borrow_cols, col == n - 1))
+        minuend[n - 1 - col], subtrahend[n - 1 - col] = 48 + d1, 48 + d2
+        bin_ = int(col in borrow_cols)
+    return minuend.decode(), subtrahend.decode()
+
+def _times_small(digits, factor, add=0) -> str:
+    """digits * factor + add for a digit string and small ints, without str() of a big int."""
+    out = bytearray()
+    carry = add
+    for d in reversed(digits):
+        carry, digit = divmod((ord(d) - 48) * factor + carry, 10)
+        out.append(48 + digit)
+    out.reverse()
+    return (str(carry) if carry else "") + out.decode()
+
+def division_dividend(divisor, quotient_digits, zeros=0, exact=None) -> str:
+    """
+    A dividend whose long division by divisor has a quotient of quotient_digits
+    digits, exactly zeros of them 0 (never the leading one), and a zero
+    remainder when exact is True, a non-zero one when False (random when None).
+    """
+    if not 0 <= zeros <= quotient_digits - 1:
+        raise ValueError(f"{zeros} zero digits do not fit in a {quotient_digits}-digit quotient")
+    zero_cols = set(random.sample(range(1, quotient_digits), zeros))
+    quotient = "".join("0" if i in zero_cols else random.choice("123456789") for i in range(quotient_digits))
+    if exact is None:
+        exact = random.random() < 0.5
+    remainder = 0 if exact else random.randint(1, divisor - 1)
+    return _times_small(quotient, divisor, remainder)
@@ -0,0 +1,203 @@
+import os
+import sys
+import math
+import mmap
+import zlib
+import struct
+import random
+import getpass
+import tempfile
+from array import array
+
+# -----------------------------------------------------------
+# Smallest-prime-factor sieve shared by ratio generators.
+#
+# File layout (little-endian):
+#   magic | limit (uint64) | crc32 of the table (uint32) | spf[0..limit] (uint32 each)
+# spf[n] is the smallest prime factor of n, or 0 when n is prime (or
+# below 2). A sieve file is built once, written under a temporary name
+# and renamed into place, so concurrent builders never expose a partial
+# file. Every process memory-maps it read-only: worker processes share
+# one copy through the page cache instead of each building their own.
+# Files live in a private per-user directory; a file that fails its
+# checksum or a sampled spf check is rebuilt rather than trusted.
+# Factorizing n takes one lookup per prime factor, O(log n).
+# -----------------------------------------------------------
+
+MAGIC = b"DMSPF002"
+HEADER = struct.Struct("<8sQI")
+DEFAULT_LIMIT = 1 << 20
+_SAMPLES = 4096  # Entries checked against n % spf[n] == 0 when a file is opened
+
+def build_spf(limit) -> array:
+    """spf[0..limit] as described above, marked by slice assignment from the largest prime down."""
+    spf = array("I", bytes(4 * (limit + 1)))
+    root = math.isqrt(limit)
+    is_prime = bytearray([1]) * (root + 1)
+    is_prime[:2] = b"\0\0"
+    for p in range(2, math.isqrt(root) + 1):
+        if is_prime[p]:
+            is_prime[p * p::p] = bytes(len(range(p * p, root + 1, p)))
+    # Smaller primes overwrite larger ones, so each entry ends up with the smallest
+    for p in reversed([p for p in range(2, root + 1) if is_prime[p]]):
+        spf[p * p::p] = array("I", [p]) * len(range(p * p, limit + 1, p))
+    return spf
+
+def cache_dir() -> str:
+    """A temp directory only the current user can write, so no one else can plant a sieve file."""
+    uid = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+    path = os.path.join(tempfile.gettempdir(), f"dolphin_math-{uid}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if hasattr(os, "getuid"):
+        st = os.stat(path)
+        if st.st_uid != os.getuid() or st.st_mode & 0o022:
+            raise PermissionError(f"{path} is not private to the current user")
+    return path
+
+def sieve_path(limit, directory=None) -> str:
+    return os.path.join(directory or cache_dir(), f"dolphin_spf_{limit}.bin")
+
+def write_sieve(path, limit):
+    """Builds the sieve for 0..limit and atomically writes it to path."""
+    spf = build_spf(limit)
+    if sys.byteorder == "big":
+        spf.byteswap()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, limit, zlib.crc32(spf)))
+        spf.tofile(f)
+    os.replace(tmp, path)
+
+class SpfSieve:
+    """
+    A memory-mapped sieve file: spf() and factorize() for 1 <= n <= limit.
+    Raises ValueError for a file with a bad header, a checksum mismatch, or a
+    sampled entry that is not a proper factor (which could make factorize() loop).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, self.limit, crc = HEADER.unpack_from(self._mm)
+            if magic != MAGIC or len(self._mm) != HEADER.size + 4 * (self.limit + 1):
+                raise ValueError(f"{path} is not a sieve file")
+            with memoryview(self._mm) as whole, whole[HEADER.size:] as view:
+                if zlib.crc32(view) != crc:
+                    raise ValueError(f"{path} fails its checksum")
+                self._spf = view.cast("I") if sys.byteorder == "little" else array("I", view.tobytes())
+            self._check_sample()
+        except (ValueError, struct.error):
+            self.close()
+            raise
+
+    def _check_sample(self):
+        spf = self._spf
+        rng = random.Random(self.limit)
+        for n in [2, 3, 4, self.limit] + [rng.randint(2, self.limit) for _ in range(_SAMPLES)]:
+            p = spf[n]
+            if p and (p < 2 or p > n or n % p or spf[p]):
+                raise ValueError(f"{self.path} has a wrong smallest prime factor for {n}")
+
+    def __contains__(self, n):
+        return 1 <= n <= self.limit
+
+    def spf(self, n) -> int:
+        return self._spf[n] or n
+
+    def factorize(self, n) -> tuple:
+        """((p, e), ...) with p ascending; () for 1."""
+        factors = []
+        spf = self._spf
+        while n > 1:
+            p = spf[n] or n
+            if p < 2:
+                raise ValueError(f"{self.path} has a wrong smallest prime factor for {n}")
+            e = 0
+            while n % p == 0:
+                n //= p
+                e += 1
+            factors.append((p, e))
+        return tuple(factors)
+
+    def close(self):
+        if isinstance(getattr(self, "_spf", None), memoryview):
+            self._spf.release()
+        self._mm.close()
+
+_SHARED = {}  # (limit, directory) as requested -> sieve; several keys may share one file
+
+def shared_sieve(limit=DEFAULT_LIMIT, directory=None) -> SpfSieve:
+    """
+    The process-wide sieve covering at least 0..limit (rounded up to a power
+    of two so callers share files). The file is built on first use and
+    reused by every later process, e.g. all workers of a dataset build.
+    """
+    sieve = _SHARED.get((limit, directory))
+    if sieve is None:
+        size = 1 << max(16, (limit - 1).bit_length())
+        path = sieve_path(size, directory)
+        sieve = next((s for s in _SHARED.values() if s.path == path), None)
+        if sieve is None:
+            try:
+                sieve = SpfSieve(path)
+            except (OSError, ValueError):  # Missing, stale or damaged: rebuild
+                write_sieve(path, size)
+                sieve = SpfSieve(path)
+        _SHARED[limit, directory] = sieve
+    return sieve
+
+# Miller-Rabin with these bases is exact below MR_LIMIT (Sorenson and Webster, 2015)
+_MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+MR_LIMIT = 3_317_044_064_679_887_385_961_981
+
+def is_prime(n) -> bool:
+    """Exact primality of n < MR_LIMIT: a lookup in the shared sieve when n is in it, else deterministic Miller-Rabin."""
+    if n >= MR_LIMIT:
+        raise ValueError(f"{n} is too large for a deterministic primality test")
+    sieve = shared_sieve()
+    if n in sieve:
+        return n >= 2 and sieve.spf(n) == n
+    if n < 2:
+        return False
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _MR_BASES:
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def factor_str(factors) -> str:
+    """((2, 3), (5, 1)) -> '2^3*5'; () -> '1'."""
+    return "*".join(f"{p}^{e}" if e > 1 else str(p) for p, e in factors) or "1"
+
+# ---------- Sub-traces ----------
+
+def euclid_steps(step, a, b):
+    """Yields EUC (a = q*b + r) until the remainder is 0, then G(a, b, gcd). a, b >= 0, b > 0."""
+    a0, b0 = a, b
+    while b:
+        q, r = divmod(a, b)
+        yield step("EUC", a, b, q, r)
+        a, b = b, r
+    yield step("G", a0, b0, a)
+
+def factor_gcd_steps(step, sieve, a, b):
+    """Yields PF for a and b and G from their common prime powers; a, b in the sieve range."""
+    fa, fb = sieve.factorize(a), dict(sieve.factorize(b))
+    yield step("PF", a, factor_str(fa))
+    yield step("PF", b, factor_str(tuple(fb.items())))
+    g = 1
+    for p, e in fa:
+        g *= p ** min(e, fb.get(p, 0))
+    yield step("G", a, b, g)
@@ -57,7 +57,8 @@ class SimplifyExpressionGenerator(ProblemGenerator):
         steps.append(step("REWRITE", rewritten_expr))
 
         # Step 3: Combine x terms
-        comb_x_term = f"{final_coeff_x}x".replace("1x","x").replace("-1x","-x")
+        # Only a coefficient of exactly +/-1 is dropped (replace("1x", ...) also hit 11x, 21x)
+        comb_x_term = "x" if final_coeff_x == 1 else "-x" if final_coeff_x == -1 else f"{final_coeff_x}x"
         steps.append(step("COMB_X", f"{dist_term1}x", f"{d:+}x", comb_x_term))
 
         # Step 4: Combine constant terms
@@ -1,4 +1,5 @@
 import uuid
+import random
 
 DELIM = "|"  # Use standard vertical bar delimiter
 
@@ -12,3 +13,18 @@ def step(op, x="", y="", z="", o=""):
 def jid() -> str:
     """Generates a unique job ID."""
     return str(uuid.uuid4())
+
+def digits_range(digits):
+    """n or (lo, hi) digit counts -> (lo, hi)."""
+    if isinstance(digits, int):
+        digits = (digits, digits)
+    lo, hi = digits
+    if not 1 <= lo <= hi:
+        raise ValueError(f"invalid digit range {digits!r}")
+    return lo, hi
+
+def random_digits(digits) -> str:
+    """Decimal string of a random number whose digit count is drawn from digits (n or (lo, hi))."""
+    n = random.randint(*digits_range(digits))
+    # Built as text: str() of a huge int is quadratic and capped by sys.get_int_max_str_digits()
+    return str(random.randint(1, 9)) + "".join(random.choices("0123456789", k=n - 1))
@@ -0,0 +1,3 @@
+# This file makes the 'pipeline' directory a Python package.
+# It holds the dataset post-processing stages (verification, indexing, ...)
+# that run on top of build_dataset() output.
@@ -0,0 +1,135 @@
+import random
+from arithmetic.pipeline.server import discover_operations, _generators
+
+# -----------------------------------------------------------
+# Reward-adaptive difficulty sampling for RL.
+#
+# The trainer feeds back a reward in [0, 1] per solved problem. Each arm -
+# an operation, and an (operation, difficulty bucket) pair - keeps
+# exponentially decayed success/failure counts, updated in O(1). Sampling
+# is Thompson-style: draw a success rate from each arm's Beta posterior and
+# weight the arm by how close that draw is to the target rate (default
+# 0.5), where the learning signal is largest. Arms the model always or
+# never solves fade to a small exploration floor instead of disappearing.
+# -----------------------------------------------------------
+
+DEFAULT_TARGET = 0.5
+DEFAULT_DECAY = 0.99  # ~100 most recent events per arm dominate
+DEFAULT_FLOOR = 0.02
+
+
+def difficulty_bucket(example) -> int:
+    """Coarse difficulty: bucket of the trace length (1, 2-3, 4-7, 8-15, ... steps)."""
+    return len(example["steps"]).bit_length()
+
+
+class _Arm:
+    __slots__ = ("successes", "failures", "events")
+
+    def __init__(self):
+        self.successes = 0.0
+        self.failures = 0.0
+        self.events = 0
+
+
+class AdaptiveSampler:
+    """
+    Bandit over operations and difficulty buckets.
+
+    Usage:
+        sampler = AdaptiveSampler(operations)
+        ops = sampler.choose_operations(64)        # mixture for the next batch
+        sampler.update("pythag_hyp", 1.0, bucket=3)
+    """
+
+    def __init__(self, operations, target=DEFAULT_TARGET, decay=DEFAULT_DECAY, prior=1.0,
+                 floor=DEFAULT_FLOOR, seed=None):
+        if not 0 < target < 1:
+            raise ValueError("target must be between 0 and 1")
+        self.target = target
+        self.decay = decay
+        self.prior = prior
+        self.floor = floor
+        self._rng = random.Random(seed)
+        self._ops = {op: _Arm() for op in operations}
+        self._buckets = {op: {} for op in operations}
+
+    @property
+    def operations(self):
+        return list(self._ops)
+
+    def _record(self, arm, reward):
+        arm.successes = arm.successes * self.decay + reward
+        arm.failures = arm.failures * self.decay + (1.0 - reward)
+        arm.events += 1
+
+    def update(self, operation, reward, bucket=None):
+        """Feeds back one result (reward 0..1, e.g. solved or the trace grader's score). O(1)."""
+        reward = min(1.0, max(0.0, float(reward)))
+        if operation not in self._ops:
+            self._ops[operation] = _Arm()
+            self._buckets[operation] = {}
+        self._record(self._ops[operation], reward)
+        if bucket is not None:
+            arm = self._buckets[operation].get(bucket)
+            if arm is None:
+                arm = self._buckets[operation][bucket] = _Arm()
+            self._record(arm, reward)
+
+    def _score(self, arm):
+        p = self._rng.betavariate(self.prior + arm.successes, self.prior + arm.failures)
+        closeness = 1.0 - abs(p - self.target) / max(self.target, 1.0 - self.target)
+        return max(self.floor, closeness)
+
+    def weights(self, operations=None) -> dict:
+        """One Thompson draw of mixture weights over operations (default: all)."""
+        return {op: self._score(self._ops[op]) for op in (operations or self._ops)}
+
+    def choose_operations(self, k, operations=None) -> list:
+        """k operations drawn from one set of mixture weights."""
+        weights = self.weights(operations)
+        return self._rng.choices(list(weights), list(weights.values()), k=k)
+
+    def choose_bucket(self, operation):
+        """Difficulty bucket to aim for within operation, or None before any bucket feedback."""
+        buckets = self._buckets.get(operation)
+        if not buckets:
+            return None
+        return max(buckets, key=lambda b: self._score(buckets[b]))
+
+    def stats(self) -> dict:
+        """{operation: {'success_rate', 'events', 'buckets': {bucket: (success_rate, events)}}}"""
+        def rate(arm):
+            total = arm.successes + arm.failures
+            return round(arm.successes / total, 4) if total else None
+        return {op: {"success_rate": rate(arm), "events": arm.events,
+                     "buckets": {b: (rate(a), a.events) for b, a in sorted(self._buckets[op].items())}}
+                for op, arm in self._ops.items()}
+
+
+def adaptive_examples(sampler, op_generators=None, max_tries=8):
+    """
+    Endless stream of examples whose mixture follows sampler. For each example
+    an operation and a target difficulty bucket are chosen, and the operation's
+    generator is retried up to max_tries times to hit that bucket. Examples
+    carry a 'difficulty' field to send back with the reward.
+    """
+    op_generators = op_generators or discover_operations()
+    generators = _generators()
+    while True:
+        op = sampler.choose_operations(1, [o for o in sampler.operations if o in op_generators])[0]
+        bucket = sampler.choose_bucket(op)
+        example = None
+        for _ in range(max_tries):
+            try:
+                candidate = generators[random.choice(op_generators[op])].generate()
+            except Exception:
+                continue
+            if not candidate:
+                continue
+            example = candidate
+            if candidate["operation"] == op and (bucket is None or difficulty_bucket(candidate) == bucket):
+                break
+        if example is not None:
+            example["difficulty"] = difficulty_bucket(example)
+            yield example
@@ -0,0 +1,105 @@
+import random
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+
+# -----------------------------------------------------------
+# asyncio-native iteration over the generators.
+#
+#   async for example in aiter_examples(n=10_000, executor="process"):
+#       ...
+#
+# generate() runs in an executor, never in the event loop. Up to
+# `prefetch` batches are in flight at once; the iterator only awaits
+# their futures, so other coroutines keep running while problems are
+# generated. Leaving the loop early (break, exception or task
+# cancellation) cancels the outstanding batches and shuts down the
+# executor it created without blocking the event loop.
+# -----------------------------------------------------------
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_PREFETCH = 4
+
+
+def generate_examples(count, seed=None, generators=None) -> list:
+    """
+    Executor task: count examples drawn uniformly from generators
+    (default: ALL_GENERATORS), skipping failed attempts like build_dataset().
+    """
+    if generators is None:
+        from arithmetic.dolphin_math_datagen import ALL_GENERATORS  # Deferred: the CLI module imports pipeline modules
+        generators = ALL_GENERATORS
+    rng = random if seed is None else random.Random(seed)
+    if seed is not None:
+        random.seed(rng.getrandbits(64))  # Generators draw from the module-level RNG
+    batch = []
+    attempts, max_attempts = 0, int(count * 1.2) + 50
+    while len(batch) < count and attempts < max_attempts:
+        attempts += 1
+        try:
+            example = rng.choice(generators).generate()
+        except Exception:
+            continue
+        if example:
+            batch.append(example)
+    return batch
+
+
+def _make_executor(executor, prefetch):
+    """Returns (executor, owned): 'thread', 'process' or an existing Executor."""
+    if isinstance(executor, Executor):
+        return executor, False
+    if executor == "thread":
+        # One thread: the generators share the module-level RNG and are GIL-bound anyway
+        return ThreadPoolExecutor(1, thread_name_prefix="aiter-examples"), True
+    if executor == "process":
+        return ProcessPoolExecutor(prefetch), True
+    raise ValueError(f"executor must be 'thread', 'process' or an Executor, not {executor!r}")
+
+
+async def aiter_batches(n=None, batch_size=DEFAULT_BATCH_SIZE, prefetch=DEFAULT_PREFETCH, executor="thread",
+                        seed=None, generators=None):
+    """
+    Async iterator over lists of examples; n=None streams forever.
+    With a seed, batch i is generated from a seed derived from (seed, i), so
+    the stream is reproducible whatever executor or worker runs it.
+    """
+    if prefetch < 1:
+        raise ValueError("prefetch must be at least 1")
+    loop = asyncio.get_running_loop()
+    pool, owned = _make_executor(executor, prefetch)
+    pending = deque()
+    submitted = 0
+    batch_index = 0
+    try:
+        while True:
+            while len(pending) < prefetch and (n is None or submitted < n):
+                count = batch_size if n is None else min(batch_size, n - submitted)
+                batch_seed = None if seed is None else seed * 1_000_003 + batch_index
+                pending.append(loop.run_in_executor(pool, generate_examples, count, batch_seed, generators))
+                submitted += count
+                batch_index += 1
+            if not pending:
+                return
+            yield await pending.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
+        if owned:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_examples(n=None, batch_size=DEFAULT_BATCH_SIZE, prefetch=DEFAULT_PREFETCH, executor="thread",
+                         seed=None, generators=None):
+    """
+    Async iterator over single examples, generated batch_size at a time in
+    an executor ('thread', 'process' or an Executor you own) with up to
+    prefetch batches in flight. n=None streams forever.
+    """
+    batches = aiter_batches(n, batch_size, prefetch, executor, seed, generators)
+    try:
+        async for batch in batches:
+            for example in batch:
+                yield example
+    finally:
+        await batches.aclose()
@@ -0,0 +1,346 @@
+import os
+import json
+import struct
+import argparse
+from array import array
+from arithmetic.helpers import DELIM
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: fall back to the built-in columnar format
+    pa = pq = None
+
+# -----------------------------------------------------------
+# Columnar output (Parquet when pyarrow is installed).
+#
+# Logical columns: problem_id, operation, problem, final_answer, steps
+# (list of step strings) and step_ops (list of the steps' op-codes).
+# operation and step_ops are dictionary-encoded. Rows are buffered and
+# written one row group at a time.
+#
+# Without pyarrow, the same columns go to a simple built-in format
+# (<prefix>.dmcol, little-endian):
+#   magic | row group chunks ... | footer json | footer length (uint64) | magic
+# Each row group stores one chunk per physical column; the footer holds
+# the chunk byte ranges and the dictionaries, so a projection read only
+# touches the chunks of the requested columns. String chunks are uint64
+# offsets followed by the UTF-8 bytes (uint32 offsets in version 1 files),
+# so a row group's strings may exceed 4 GiB; Parquet uses large_string.
+# -----------------------------------------------------------
+
+MAGIC = b"DMCOL001"
+PARQUET_MAGIC = b"PAR1"
+_TAIL = struct.Struct("<Q8s")
+COLUMNS = ("problem_id", "operation", "problem", "final_answer", "steps", "step_ops")
+RL_COLUMNS = ("problem", "final_answer")
+DEFAULT_ROW_GROUP_SIZE = 10_000
+VERSION = 2
+_OFFSET_TYPES = {1: "I", 2: "Q"}  # Footer version -> string offset typecode
+
+# Logical column -> physical chunks in the built-in format
+_CHUNKS = {
+    "problem_id": ("problem_id",),
+    "operation": ("operation",),
+    "problem": ("problem",),
+    "final_answer": ("final_answer",),
+    "steps": ("step_counts", "step_ops", "step_args"),
+    "step_ops": ("step_counts", "step_ops"),
+}
+
+
+def _encode_strings(values) -> bytes:
+    blobs = [v.encode("utf-8") for v in values]
+    offsets = array("Q", [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    return offsets.tobytes() + b"".join(blobs)
+
+
+def _decode_strings(buf, n, typecode="Q") -> list:
+    offsets = array(typecode)
+    offsets.frombytes(buf[:offsets.itemsize * (n + 1)])
+    blob = buf[offsets.itemsize * (n + 1):]
+    return [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(n)]
+
+
+def _codes(typecode, buf) -> array:
+    values = array(typecode)
+    values.frombytes(buf)
+    return values
+
+
+class _Dictionary:
+    """Append-only value -> code mapping; codes stay stable across row groups."""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ColumnarSink:
+    """
+    Sink writing examples column-wise in row groups of row_group_size rows.
+    Writes Parquet to path when pyarrow is installed, otherwise the
+    built-in format to <prefix>.dmcol. Read back with ColumnarReader.
+    """
+
+    def __init__(self, path, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+        self.row_group_size = row_group_size
+        self.num_rows = 0
+        self._rows = []
+        if pq is not None:
+            self.path = path
+            self._fp = open(self.path, "wb")
+            self._writer = pq.ParquetWriter(self._fp, _arrow_schema())
+        else:
+            self.path = os.path.splitext(path)[0] + ".dmcol"
+            self._writer = None
+            self._fp = open(self.path, "wb")
+            self._fp.write(MAGIC)
+            self._dicts = {"operation": _Dictionary(), "step_ops": _Dictionary()}
+            self._row_groups = []
+        self.paths = [self.path]
+
+    def write(self, example):
+        self._rows.append(example)
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        if self._writer is not None:
+            self._writer.write_table(_arrow_table(self._rows))
+        else:
+            self._write_row_group(self._rows)
+        self.num_rows += len(self._rows)
+        self._rows = []
+
+    def _write_row_group(self, rows):
+        op_dict, step_dict = self._dicts["operation"], self._dicts["step_ops"]
+        counts, step_ops, step_args = array("I"), array("H"), []
+        for row in rows:
+            counts.append(len(row["steps"]))
+            for step_str in row["steps"]:
+                op, sep, rest = step_str.partition(DELIM)
+                step_ops.append(step_dict.code(op))
+                step_args.append(sep + rest)
+        chunks = {
+            "problem_id": _encode_strings(row["problem_id"] for row in rows),
+            "operation": array("H", (op_dict.code(row["operation"]) for row in rows)).tobytes(),
+            "problem": _encode_strings(row["problem"] for row in rows),
+            "final_answer": _encode_strings(str(row["final_answer"]) for row in rows),
+            "step_counts": counts.tobytes(),
+            "step_ops": step_ops.tobytes(),
+            "step_args": _encode_strings(step_args),
+        }
+        ranges = {}
+        for name, data in chunks.items():
+            ranges[name] = [self._fp.tell(), len(data)]
+            self._fp.write(data)
+        self._row_groups.append({"num_rows": len(rows), "num_steps": len(step_ops), "chunks": ranges})
+
+    def tell(self):
+        """Bytes written so far (grows one row group at a time)."""
+        return self._fp.tell()
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._fp.close()
+            return
+        footer = json.dumps({
+            "version": VERSION,
+            "columns": list(COLUMNS),
+            "num_rows": self.num_rows,
+            "dictionaries": {name: d.values for name, d in self._dicts.items()},
+            "row_groups": self._row_groups,
+        }).encode("utf-8")
+        self._fp.write(footer)
+        self._fp.write(_TAIL.pack(len(footer), MAGIC))
+        self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _arrow_schema():
+    op_type = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("problem_id", pa.large_string()),
+        ("operation", op_type),
+        ("problem", pa.large_string()),
+        ("final_answer", pa.large_string()),
+        ("steps", pa.list_(pa.large_string())),
+        ("step_ops", pa.list_(op_type)),
+    ])
+
+
+def _arrow_table(rows):
+    offsets, steps, step_ops = [0], [], []
+    for row in rows:
+        steps.extend(row["steps"])
+        step_ops.extend(s.partition(DELIM)[0] for s in row["steps"])
+        offsets.append(len(steps))
+    offsets = pa.array(offsets, type=pa.int32())
+    return pa.Table.from_arrays([
+        pa.array([row["problem_id"] for row in rows], type=pa.large_string()),
+        pa.array([row["operation"] for row in rows], type=pa.string()).dictionary_encode(),
+        pa.array([row["problem"] for row in rows], type=pa.large_string()),
+        pa.array([str(row["final_answer"]) for row in rows], type=pa.large_string()),
+        pa.ListArray.from_arrays(offsets, pa.array(steps, type=pa.large_string())),
+        pa.ListArray.from_arrays(offsets, pa.array(step_ops, type=pa.string()).dictionary_encode()),
+    ], schema=_arrow_schema())
+
+
+def _resolve(path):
+    """The file actually written for path: path itself, or its .dmcol fallback."""
+    if not os.path.exists(path):
+        fallback = os.path.splitext(path)[0] + ".dmcol"
+        if os.path.exists(fallback):
+            return fallback
+    return path
+
+
+class ColumnarReader:
+    """
+    Reads ColumnarSink output (Parquet or the built-in format) column-wise.
+
+    Usage:
+        with ColumnarReader("data.parquet") as data:
+            data.read(RL_COLUMNS)                 # {'problem': [...], 'final_answer': [...]}
+            for row in data.iter_rows(("problem", "steps")):
+                ...
+    Only the chunks of the requested columns are read.
+    """
+
+    def __init__(self, path):
+        self.path = _resolve(path)
+        self._fp = open(self.path, "rb")
+        magic = self._fp.read(len(MAGIC))
+        if magic.startswith(PARQUET_MAGIC):
+            if pq is None:
+                self._fp.close()
+                raise ImportError("reading Parquet files requires the 'pyarrow' package")
+            self._parquet = pq.ParquetFile(self._fp)
+            self.num_rows = self._parquet.metadata.num_rows
+            self.num_row_groups = self._parquet.num_row_groups
+            return
+        if magic != MAGIC:
+            self._fp.close()
+            raise ValueError(f"{self.path} is not a columnar dataset file")
+        self._parquet = None
+        self._fp.seek(-_TAIL.size, os.SEEK_END)
+        footer_len, _ = _TAIL.unpack(self._fp.read(_TAIL.size))
+        self._fp.seek(-_TAIL.size - footer_len, os.SEEK_END)
+        self._footer = json.loads(self._fp.read(footer_len))
+        if self._footer.get("version") not in _OFFSET_TYPES:
+            self._fp.close()
+            raise ValueError(f"{self.path} has unsupported version {self._footer.get('version')}")
+        self._offsets = _OFFSET_TYPES[self._footer["version"]]
+        self.num_rows = self._footer["num_rows"]
+        self.num_row_groups = len(self._footer["row_groups"])
+
+    def _chunk(self, group, name):
+        offset, length = group["chunks"][name]
+        self._fp.seek(offset)
+        return self._fp.read(length)
+
+    def read_row_group(self, i, columns=None) -> dict:
+        """{column: list of values} for row group i."""
+        columns = list(columns or COLUMNS)
+        unknown = set(columns) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+        if self._parquet is not None:
+            return self._parquet.read_row_group(i, columns=columns).to_pydict()
+        group = self._footer["row_groups"][i]
+        dicts = self._footer["dictionaries"]
+        raw = {}
+        for column in columns:
+            for name in _CHUNKS[column]:
+                if name not in raw:
+                    raw[name] = self._chunk(group, name)
+        out = {}
+        for column in columns:
+            if column == "operation":
+                values = dicts["operation"]
+                out[column] = [values[c] for c in _codes("H", raw["operation"])]
+            elif column in ("steps", "step_ops"):
+                out[column] = self._decode_steps(group, raw, dicts["step_ops"], column == "steps", self._offsets)
+            else:
+                out[column] = _decode_strings(raw[column], group["num_rows"], self._offsets)
+        return out
+
+    @staticmethod
+    def _decode_steps(group, raw, op_values, full, typecode):
+        ops = [op_values[c] for c in _codes("H", raw["step_ops"])]
+        if full:
+            args = _decode_strings(raw["step_args"], group["num_steps"], typecode)
+            ops = [op + arg for op, arg in zip(ops, args)]
+        rows, pos = [], 0
+        for n in _codes("I", raw["step_counts"]):
+            rows.append(ops[pos:pos + n])
+            pos += n
+        return rows
+
+    def read(self, columns=None) -> dict:
+        """All rows of the requested columns, e.g. read(RL_COLUMNS)."""
+        columns = list(columns or COLUMNS)
+        out = {column: [] for column in columns}
+        for i in range(self.num_row_groups):
+            for column, values in self.read_row_group(i, columns).items():
+                out[column].extend(values)
+        return out
+
+    def iter_rows(self, columns=None):
+        """Yields one dict per row, decoding a row group at a time."""
+        columns = list(columns or COLUMNS)
+        for i in range(self.num_row_groups):
+            group = self.read_row_group(i, columns)
+            for values in zip(*(group[c] for c in columns)):
+                yield dict(zip(columns, values))
+
+    def close(self):
+        self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def convert_files(inputs, output, row_group_size=DEFAULT_ROW_GROUP_SIZE) -> str:
+    """Converts JSONL files into one columnar file. Returns the path written."""
+    with ColumnarSink(output, row_group_size) as sink:
+        for path in inputs:
+            with open(path, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        sink.write(json.loads(line))
+    return sink.path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert JSONL files into columnar (Parquet) files")
+    parser.add_argument("inputs", nargs="+", help="JSONL files produced by build_dataset")
+    parser.add_argument("-o", "--output", required=True,
+                        help="Output .parquet path (written as PREFIX.dmcol when pyarrow is not installed)")
+    parser.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE, help="Rows per row group.")
+    args = parser.parse_args(argv)
+
+    print(f"✔  Converted {len(args.inputs)} file(s) → {convert_files(args.inputs, args.output, args.row_group_size)}")
+    return 0
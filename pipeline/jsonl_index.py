@@ -0,0 +1,187 @@
+import os
+import re
+import json
+import mmap
+import struct
+import hashlib
+import argparse
+from array import array
+from arithmetic.pipeline.jsonl_io import open_mmap, iter_lines
+
+# -----------------------------------------------------------
+# Binary offset index ("sidecar") for build_dataset() JSONL files.
+#
+# Layout of <file>.idx (little-endian, all sections 8-byte aligned):
+#   header    : magic, n_lines, data_size, n_buckets, ops_json_len
+#   offsets   : n_lines x uint64       byte offset of each line
+#   buckets   : n_buckets x 2 uint64   (problem_id hash, ordinal + 1), open addressing
+#   ordinals  : n_lines x uint64       line ordinals grouped by operation
+#   ops json  : {operation: [start, count]} into the ordinals section
+#
+# Lookups by ordinal or problem_id are one seek + one readline on the data file.
+# -----------------------------------------------------------
+
+MAGIC = b"DMIDX001"
+_HEADER = struct.Struct("<8sQQQQ")
+_BUCKET = struct.Struct("<QQ")
+_PROBLEM_ID = re.compile(rb'"problem_id": "([^"]*)"')
+_OPERATION = re.compile(rb'"operation": "([^"]*)"')
+
+
+def _hash64(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def index_path_for(path):
+    return path + ".idx"
+
+
+def _extract(line):
+    """Pulls problem_id and operation out of a JSONL line without a full parse when possible."""
+    pid, op = _PROBLEM_ID.search(line), _OPERATION.search(line)
+    if pid and op:
+        return pid.group(1), op.group(1).decode("utf-8")
+    example = json.loads(line)
+    return example["problem_id"].encode("utf-8"), example["operation"]
+
+
+def build_index(path, index_path=None) -> str:
+    """Builds the sidecar index for a JSONL file in one mmap pass. Returns the index path."""
+    index_path = index_path or index_path_for(path)
+    offsets = array("Q")
+    hashes = array("Q")
+    by_op = {}
+    mm = open_mmap(path)
+    if mm is not None:
+        with mm:
+            for ordinal, (offset, line) in enumerate(iter_lines(mm)):
+                pid, op = _extract(line)
+                offsets.append(offset)
+                hashes.append(_hash64(pid))
+                by_op.setdefault(op, array("Q")).append(ordinal)
+
+    # Open-addressing table at <= 50% load
+    n_buckets = 1
+    while n_buckets < 2 * len(offsets):
+        n_buckets *= 2
+    mask = n_buckets - 1
+    buckets = array("Q", bytes(16 * n_buckets))
+    for ordinal, h in enumerate(hashes):
+        slot = h & mask
+        while buckets[2 * slot + 1]:
+            slot = (slot + 1) & mask
+        buckets[2 * slot] = h
+        buckets[2 * slot + 1] = ordinal + 1
+
+    ordinals = array("Q")
+    ops = {}
+    for op in sorted(by_op):
+        ops[op] = [len(ordinals), len(by_op[op])]
+        ordinals.extend(by_op[op])
+    ops_json = json.dumps(ops).encode("utf-8")
+
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(offsets), os.path.getsize(path), n_buckets, len(ops_json)))
+        offsets.tofile(f)
+        buckets.tofile(f)
+        ordinals.tofile(f)
+        f.write(ops_json)
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+class IndexedJsonl:
+    """
+    Random access into a JSONL file through its sidecar index.
+
+    Usage:
+        with IndexedJsonl("data.jsonl") as data:
+            data[5]                       # example by ordinal
+            data.find(problem_id)         # example by ID (or None)
+            data.ordinals("pythag_hyp")   # ordinals of one operation
+    """
+
+    def __init__(self, path, index_path=None, build=True):
+        index_path = index_path or index_path_for(path)
+        if build and not os.path.exists(index_path):
+            build_index(path, index_path)
+        with open(index_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n_lines, data_size, n_buckets, ops_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or data_size != os.path.getsize(path):
+            self._mm.close()
+            if magic != MAGIC:
+                raise ValueError(f"{index_path} is not a dataset index")
+            raise ValueError(f"{index_path} is stale: {path} changed size since indexing")
+        view = memoryview(self._mm)
+        pos = _HEADER.size
+        self._offsets = view[pos:pos + 8 * n_lines].cast("Q")
+        pos += 8 * n_lines
+        self._buckets_pos, self._mask = pos, n_buckets - 1
+        pos += 16 * n_buckets
+        self._ordinals = view[pos:pos + 8 * n_lines].cast("Q")
+        pos += 8 * n_lines
+        self._ops = json.loads(bytes(view[pos:pos + ops_len]))
+        self._fp = open(path, "rb")
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def read_line(self, ordinal) -> bytes:
+        """Raw bytes of line `ordinal` (without the newline)."""
+        self._fp.seek(self._offsets[ordinal])
+        return self._fp.readline().rstrip(b"\n")
+
+    def __getitem__(self, ordinal) -> dict:
+        if ordinal < 0:
+            ordinal += len(self)
+        return json.loads(self.read_line(ordinal))
+
+    def ordinal_of(self, problem_id):
+        """Ordinal of the example with this problem_id, or None."""
+        key = problem_id.encode("utf-8")
+        h = _hash64(key)
+        slot = h & self._mask
+        while True:
+            stored_hash, stored = _BUCKET.unpack_from(self._mm, self._buckets_pos + 16 * slot)
+            if not stored:
+                return None
+            if stored_hash == h and _extract(self.read_line(stored - 1))[0] == key:
+                return stored - 1
+            slot = (slot + 1) & self._mask
+
+    def find(self, problem_id):
+        """Example with this problem_id, or None."""
+        ordinal = self.ordinal_of(problem_id)
+        return None if ordinal is None else self[ordinal]
+
+    def operations(self) -> dict:
+        """{operation: count}"""
+        return {op: count for op, (_, count) in self._ops.items()}
+
+    def ordinals(self, operation):
+        """Ordinals of all examples of one operation (a zero-copy memoryview)."""
+        start, count = self._ops.get(operation, (0, 0))
+        return self._ordinals[start:start + count]
+
+    def close(self):
+        self._offsets.release()
+        self._ordinals.release()
+        self._mm.close()
+        self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build random-access index sidecars for JSONL files")
+    parser.add_argument("paths", nargs="+", help="JSONL files produced by build_dataset")
+    args = parser.parse_args(argv)
+    for path in args.paths:
+        print(f"✔  Indexed {path} → {build_index(path)}")
+    return 0
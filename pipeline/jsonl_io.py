@@ -0,0 +1,39 @@
+import os
+import mmap
+
+# -----------------------------------------------------------
+# Shared helpers for reading build_dataset() JSONL output through mmap.
+# A file is cut into byte ranges; each line belongs to the range that
+# contains its first byte, so ranges can be processed independently.
+# -----------------------------------------------------------
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024  # 64 MiB per worker task
+
+
+def chunk_ranges(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Splits a file into (path, start, end) byte ranges of roughly chunk_size."""
+    size = os.path.getsize(path)
+    return [(path, start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+
+
+def open_mmap(path):
+    """Memory-maps a file read-only. Returns None for empty files (mmap rejects them)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def iter_lines(mm, start=0, end=None):
+    """Yields (offset, line_bytes) for every line whose first byte is in [start, end)."""
+    size = len(mm)
+    end = size if end is None else end
+    # A range that starts mid-line skips ahead; the previous range owns that line
+    pos = start if start == 0 else (mm.find(b"\n", start - 1) + 1 or size)
+    while pos < end:
+        nl = mm.find(b"\n", pos)
+        if nl == -1:
+            nl = size
+        if nl > pos:  # Skip blank lines
+            yield pos, mm[pos:nl]
+        pos = nl + 1
@@ -0,0 +1,349 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import socket
+import argparse
+from arithmetic.pipeline.shards import ShardSink, write_manifest
+
+# -----------------------------------------------------------
+# Coordinator-free multi-node generation on a shared filesystem.
+#
+# A job directory splits the seeded example space [0, n) into fixed index
+# ranges. Any number of workers, on any machines that see the directory,
+# claim ranges through lease files, generate them and commit a shard file
+# plus a completion marker:
+#
+#   job.json                      n, seed, range_size, num_ranges
+#   leases/range-000042.lease     owner + heartbeat (mtime); expires after ttl
+#   shards/range-000042.<owner>.jsonl  generated examples of one range
+#   done/range-000042.json        count, operations, bytes, sha256
+#
+# Every file that others read is created atomically: written to a private
+# temporary name, then os.link()ed (create-exclusive) or os.replace()d
+# into place. Each range is generated from its own seed, so a range redone
+# after its lease expired yields the same problems; if two workers ever
+# finish the same range, the first completion marker wins and the other
+# shard is discarded. Restarted or extra workers simply pick up unclaimed
+# or expired ranges; `merge` checks that every range is done and its
+# shard intact, then writes the manifest.
+# -----------------------------------------------------------
+
+DEFAULT_RANGE_SIZE = 1_000_000
+DEFAULT_TTL = 600.0
+_RENEW_CHECK_EVERY = 256
+
+
+class LeaseLost(BaseException):
+    """
+    Raised when another worker took over a range whose lease this worker let
+    expire. A BaseException, like GeneratorExit: generation loops skip examples
+    that fail with an Exception and must not swallow this, or the worker
+    would keep writing a range it no longer owns.
+    """
+
+
+def _range_name(index):
+    return f"range-{index:06d}"
+
+
+def _job_paths(job_dir):
+    return {name: os.path.join(job_dir, name) for name in ("leases", "shards", "done")}
+
+
+def _link_exclusive(path, data: bytes, owner) -> bool:
+    """Atomically creates path with data. Returns False if path already exists."""
+    tmp = f"{path}.{owner}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    try:
+        os.link(tmp, path)
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.remove(tmp)
+
+
+def _lease_record(path):
+    """(owner, mtime) of a lease file, owner None if unreadable; None if there is no lease."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            mtime = os.fstat(f.fileno()).st_mtime
+            try:
+                return json.load(f)["owner"], mtime
+            except (ValueError, KeyError, TypeError):
+                return None, mtime
+    except FileNotFoundError:
+        return None
+
+
+def _shard_digest(path):
+    """(SHA-256, line count) of a shard file in one pass."""
+    digest, lines = hashlib.sha256(), 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+            lines += block.count(b"\n")
+    return digest.hexdigest(), lines
+
+
+def load_job(job_dir) -> dict:
+    with open(os.path.join(job_dir, "job.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def init_job(job_dir, n, seed=42, range_size=DEFAULT_RANGE_SIZE) -> dict:
+    """Creates a job directory (or returns the existing job if it matches)."""
+    num_ranges = -(-n // range_size)
+    job = dict(n=n, seed=seed, range_size=range_size, num_ranges=num_ranges)
+    for path in _job_paths(job_dir).values():
+        os.makedirs(path, exist_ok=True)
+    data = json.dumps(job, indent=2).encode("utf-8")
+    if not _link_exclusive(os.path.join(job_dir, "job.json"), data, f"init-{os.getpid()}"):
+        existing = load_job(job_dir)
+        if existing != job:
+            raise ValueError(f"{job_dir} already holds a different job: {existing}")
+    return job
+
+
+def range_bounds(job, index):
+    start = index * job["range_size"]
+    return start, min(start + job["range_size"], job["n"])
+
+
+class Lease:
+    """A claimed range. renew() refreshes the heartbeat and detects a takeover."""
+
+    def __init__(self, path, owner, ttl):
+        self.path = path
+        self.owner = owner
+        self.ttl = ttl
+        self._renewed = time.time()
+
+    @classmethod
+    def acquire(cls, path, owner, ttl):
+        """Claims path, reclaiming it first if its holder stopped renewing. Returns a Lease or None."""
+        record = json.dumps({"owner": owner, "host": socket.gethostname(), "pid": os.getpid()}).encode("utf-8")
+        if _link_exclusive(path, record, owner):
+            return cls(path, owner, ttl)
+        stale = _lease_record(path)  # None: released meanwhile
+        if stale is not None:
+            if time.time() - stale[1] <= ttl:
+                return None
+            # Move the lease aside. Another reclaimer may already have replaced the
+            # stale lease with its own fresh one, and rename would move that just as
+            # well, so check that the moved file is the one examined and put it back if not.
+            tombstone = f"{path}.expired.{owner}"
+            try:
+                os.rename(path, tombstone)
+            except FileNotFoundError:
+                pass
+            else:
+                moved = _lease_record(tombstone)
+                is_stale = moved is not None and moved[0] == stale[0] and time.time() - moved[1] > ttl
+                if not is_stale:
+                    try:
+                        os.link(tombstone, path)
+                    except FileExistsError:
+                        pass  # Taken meanwhile; its holder's next renew() sees the takeover
+                os.remove(tombstone)
+                if not is_stale:
+                    return None
+        return cls(path, owner, ttl) if _link_exclusive(path, record, owner) else None
+
+    def holder(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)["owner"]
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def renew(self, force=False):
+        if not force and time.time() - self._renewed < self.ttl / 3:
+            return
+        if self.holder() != self.owner:
+            raise LeaseLost(self.path)
+        os.utime(self.path)
+        self._renewed = time.time()
+
+    def release(self):
+        if self.holder() == self.owner:
+            os.remove(self.path)
+
+
+class _RenewingSink:
+    """Wraps a shard sink and keeps the range's lease alive while it is being written."""
+
+    def __init__(self, sink, lease):
+        self._sink = sink
+        self._lease = lease
+        self._writes = 0
+
+    def write(self, example):
+        # Checked before writing, so nothing more goes into a range taken over
+        if self._writes and self._writes % _RENEW_CHECK_EVERY == 0:
+            self._lease.renew()
+        self._sink.write(example)
+        self._writes += 1
+
+
+def _default_producer(task, sink):
+    from arithmetic.dolphin_math_datagen import _generate_part
+    _generate_part(task, sink)
+
+
+def run_worker(job_dir, owner=None, ttl=DEFAULT_TTL, max_ranges=None, producer=None) -> list:
+    """
+    Claims and generates ranges until none are left (or max_ranges are done).
+    producer(task, sink) writes the examples of task = (range index, count, seed);
+    by default the dataset generators are used. Returns the completed range indices.
+    """
+    job = load_job(job_dir)
+    paths = _job_paths(job_dir)
+    owner = owner or f"{socket.gethostname()}-{os.getpid()}"
+    producer = producer or _default_producer
+    completed = []
+    # Start at an owner-specific offset so concurrent workers rarely contend for the same range
+    offset = zlib.crc32(owner.encode("utf-8")) % job["num_ranges"]
+    for i in range(job["num_ranges"]):
+        if max_ranges is not None and len(completed) >= max_ranges:
+            break
+        index = (offset + i) % job["num_ranges"]
+        name = _range_name(index)
+        marker = os.path.join(paths["done"], name + ".json")
+        if os.path.exists(marker):
+            continue
+        lease = Lease.acquire(os.path.join(paths["leases"], name + ".lease"), owner, ttl)
+        if lease is None:
+            continue
+        try:
+            if os.path.exists(marker):  # Finished by someone else between our check and the claim
+                continue
+            if _generate_range(job, index, paths, lease, producer):
+                completed.append(index)
+        except LeaseLost:
+            continue
+        finally:
+            lease.release()
+    return completed
+
+
+def _generate_range(job, index, paths, lease, producer) -> bool:
+    """Writes one range to a shard file private to this owner; the completion marker picks the winner."""
+    name = _range_name(index)
+    start, end = range_bounds(job, index)
+    shard_name = f"{name}.{lease.owner}.jsonl"
+    shard = os.path.join(paths["shards"], shard_name)
+    committed = False
+    try:
+        with ShardSink(shard) as sink:
+            producer((index, end - start, job["seed"]), _RenewingSink(sink, lease))
+        lease.renew(force=True)
+        entry = sink.entry()
+        entry["files"][0]["path"] = os.path.join("shards", shard_name)
+        entry.update(range=index, start=start, end=end, owner=lease.owner)
+        marker = os.path.join(paths["done"], name + ".json")
+        committed = _link_exclusive(marker, json.dumps(entry, indent=2).encode("utf-8"), lease.owner)
+        return committed
+    finally:
+        if not committed and os.path.exists(shard):
+            os.remove(shard)
+
+
+def job_status(job_dir) -> dict:
+    """{'done': [...], 'leased': [...], 'pending': [...]} range indices."""
+    job = load_job(job_dir)
+    paths = _job_paths(job_dir)
+    status = {"done": [], "leased": [], "pending": []}
+    for index in range(job["num_ranges"]):
+        name = _range_name(index)
+        if os.path.exists(os.path.join(paths["done"], name + ".json")):
+            status["done"].append(index)
+        elif os.path.exists(os.path.join(paths["leases"], name + ".lease")):
+            status["leased"].append(index)
+        else:
+            status["pending"].append(index)
+    return status
+
+
+def merge_job(job_dir, output=None) -> str:
+    """
+    Verifies that every range is done, holds one example per index of the range,
+    and that its shard matches its marker (size, SHA-256 and line count), then writes <job_dir>/data.manifest.json. With output, the shards
+    are also concatenated into one JSONL file. Raises ValueError if coverage is
+    incomplete or a shard is damaged. Returns the manifest path.
+    """
+    job = load_job(job_dir)
+    paths = _job_paths(job_dir)
+    shards, missing, damaged = [], [], []
+    for index in range(job["num_ranges"]):
+        marker = os.path.join(paths["done"], _range_name(index) + ".json")
+        if not os.path.exists(marker):
+            missing.append(index)
+            continue
+        with open(marker, encoding="utf-8") as f:
+            entry = json.load(f)
+        shard = os.path.join(job_dir, entry["files"][0]["path"])
+        expected = entry["files"][0]
+        start, end = range_bounds(job, index)
+        if (entry["start"], entry["end"]) != (start, end) or entry["count"] != end - start \
+                or not os.path.exists(shard) or os.path.getsize(shard) != expected["bytes"] \
+                or _shard_digest(shard) != (expected["sha256"], entry["count"]):
+            damaged.append(index)
+        shards.append(entry)
+    if missing or damaged:
+        raise ValueError(f"incomplete job: {len(missing)} range(s) missing {missing[:10]}, "
+                         f"{len(damaged)} damaged {damaged[:10]}")
+    if output:
+        with open(output, "wb") as out:
+            for entry in shards:
+                with open(os.path.join(job_dir, entry["files"][0]["path"]), "rb") as f:
+                    while True:
+                        block = f.read(1 << 20)
+                        if not block:
+                            break
+                        out.write(block)
+    return write_manifest(os.path.join(job_dir, "data.jsonl"), shards, job["seed"],
+                          n=job["n"], range_size=job["range_size"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coordinator-free multi-node generation with index-range leases")
+    sub = parser.add_subparsers(dest="action", required=True)
+    p = sub.add_parser("init", help="Create a job directory on the shared filesystem")
+    p.add_argument("job_dir")
+    p.add_argument("-n", "--num-examples", type=int, required=True)
+    p.add_argument("-s", "--seed", type=int, default=42)
+    p.add_argument("--range-size", type=int, default=DEFAULT_RANGE_SIZE, help="Examples per leased range.")
+    p = sub.add_parser("work", help="Claim and generate ranges until none are left")
+    p.add_argument("job_dir")
+    p.add_argument("--ttl", type=float, default=DEFAULT_TTL,
+                   help="Seconds without a heartbeat after which a lease may be reclaimed.")
+    p.add_argument("--max-ranges", type=int, default=None, help="Stop after this many ranges.")
+    p.add_argument("--owner", default=None, help="Worker name (default: host-pid).")
+    p = sub.add_parser("status", help="Count done, leased and pending ranges")
+    p.add_argument("job_dir")
+    p = sub.add_parser("merge", help="Verify coverage and write the manifest")
+    p.add_argument("job_dir")
+    p.add_argument("-o", "--output", default=None, help="Also concatenate all shards into this JSONL file.")
+    args = parser.parse_args(argv)
+
+    if args.action == "init":
+        job = init_job(args.job_dir, args.num_examples, args.seed, args.range_size)
+        print(f"✔  {job['num_ranges']} ranges of {job['range_size']} examples → {args.job_dir}")
+    elif args.action == "work":
+        done = run_worker(args.job_dir, args.owner, args.ttl, args.max_ranges)
+        print(f"✔  Generated {len(done)} range(s)")
+    elif args.action == "status":
+        status = job_status(args.job_dir)
+        print(", ".join(f"{len(v)} {k}" for k, v in status.items()))
+        return 0 if not status["leased"] and not status["pending"] else 1
+    else:
+        try:
+            print(f"✔  Full coverage → {merge_job(args.job_dir, args.output)}")
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            return 1
+    return 0
@@ -0,0 +1,94 @@
+import time
+import json
+import asyncio
+import argparse
+from urllib.parse import urlsplit
+
+# -----------------------------------------------------------
+# Load test for the problem server (pipeline/server.py).
+# N keep-alive connections request batches back to back for a fixed
+# duration; reports batches/sec, examples/sec and latency percentiles.
+# -----------------------------------------------------------
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def _open(url):
+    """url: http://host:port/... or unix:/path/to.sock:/batch?... ; returns (reader, writer, request target)."""
+    if url.startswith("unix:"):
+        path, _, target = url[len("unix:"):].partition(":")
+        reader, writer = await asyncio.open_unix_connection(path)
+        return reader, writer, target or "/batch"
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    return reader, writer, (parts.path or "/batch") + (f"?{parts.query}" if parts.query else "")
+
+
+async def _read_response(reader):
+    status = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        if key.strip().lower() == "content-length":
+            length = int(value)
+    body = await reader.readexactly(length)
+    return int(status.split()[1]), body
+
+
+async def _client(url, deadline, latencies, counts):
+    reader, writer, target = await _open(url)
+    request = f"GET {target} HTTP/1.1\r\nHost: loadtest\r\n\r\n".encode("latin-1")
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status, body = await _read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                counts["errors"] += 1
+            else:
+                counts["examples"] += len(json.loads(body)["examples"])
+    finally:
+        writer.close()
+
+
+async def load_test(url, concurrency=8, duration=10.0) -> dict:
+    """Runs the load test and returns its statistics (latencies in milliseconds)."""
+    latencies, counts = [], {"errors": 0, "examples": 0}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_client(url, deadline, latencies, counts) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return dict(
+        batches=len(latencies),
+        errors=counts["errors"],
+        batches_per_sec=len(latencies) / elapsed,
+        examples_per_sec=counts["examples"] / elapsed,
+        p50_ms=1000 * _percentile(latencies, 0.50),
+        p99_ms=1000 * _percentile(latencies, 0.99),
+        max_ms=1000 * (latencies[-1] if latencies else 0.0),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the problem server")
+    parser.add_argument("url", nargs="?", default="http://127.0.0.1:8765/batch?size=32",
+                        help="Batch URL, or unix:/path/to.sock:/batch?size=32")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="Concurrent keep-alive connections.")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="Seconds to run.")
+    args = parser.parse_args(argv)
+
+    stats = asyncio.run(load_test(args.url, args.concurrency, args.duration))
+    print(f"{stats['batches']} batches ({stats['errors']} errors): {stats['batches_per_sec']:.1f} batches/s, "
+          f"{stats['examples_per_sec']:.0f} examples/s, p50 {stats['p50_ms']:.2f} ms, "
+          f"p99 {stats['p99_ms']:.2f} ms, max {stats['max_ms']:.2f} ms")
+    return 1 if stats["errors"] else 0
@@ -0,0 +1,279 @@
+import os
+import json
+import mmap
+import hashlib
+import argparse
+import importlib
+from array import array
+from arithmetic.helpers import DELIM
+
+# -----------------------------------------------------------
+# Pre-tokenized binary output.
+#
+# <prefix>.bin        token ids of all examples back to back (uint16 or uint32)
+# <prefix>.offsets    uint64 token offsets, num_sequences + 1 entries
+# <prefix>.meta.json  dtype, vocab size and hash, counts and tokenizer name
+#
+# Data loaders memory-map the .bin/.offsets pair and slice sequences
+# without any parsing at train time.
+# -----------------------------------------------------------
+
+SPECIAL_TOKENS = ("<pad>", "<bos>", "<eos>", "<sep>", "<nl>")
+PAD, BOS, EOS, SEP, NL = range(len(SPECIAL_TOKENS))
+
+# Op-code tokens in id order. Ids are positions in this tuple and are baked
+# into every .bin file, so it is append-only: new op-codes go at the end,
+# even when the interpreter lists them elsewhere.
+OPCODE_VOCAB = (
+    "D", "M", "S", "A", "B", "R", "C", "L", "I", "F", "PDEC",
+    "DEC_ALIGN", "DEC_ADD_COL", "DEC_SUB_COL", "DEC_CARRY_FINAL",
+    "MUL_SETUP", "MUL_PARTIAL", "ADD_PARTIALS", "COUNT_DP", "PLACE_DP",
+    "DEC_SHIFT", "DIV_SETUP", "PLACE_DP_Q",
+    "PERCENT_TO_DEC", "SETUP_PERCENT_EQ", "REARRANGE_EQ", "PERCENT_CALC_PART", "DEC_TO_PERCENT",
+    "G", "DISC", "ROOT", "Q1", "Q2", "DIST", "REWRITE", "COMB_X", "COMB_CONST",
+    "SUBST", "MOVE_TERM", "DIV_COEFF", "E", "PROP_SETUP",
+    "AB_SET", "AB_INFO", "AB_ADD_DGT", "AB_CARRY", "AB_CARRY_FINAL", "Z",
+    "REPEAT", "MIX", "EUC", "PF",
+)
+
+
+def hash_vocab(tokens) -> str:
+    """Short fingerprint of an ordered token list, stored in .meta.json."""
+    return hashlib.sha256("\n".join(tokens).encode("utf-8")).hexdigest()[:16]
+
+
+def check_vocab(meta, tokenizer=None, path=None):
+    """
+    Raises ValueError unless meta (a .meta.json dict) was written with the
+    vocabulary of tokenizer, or of the built-in one for 'opcode' data.
+    Tokenizers without a vocab_hash are not checked.
+    """
+    if tokenizer is None:
+        if meta.get("tokenizer") != OpCodeTokenizer.name:
+            return
+        tokenizer = OpCodeTokenizer
+    expected = getattr(tokenizer, "vocab_hash", None)
+    if expected is not None and meta.get("vocab_hash") != expected:
+        raise ValueError(f"{path or 'dataset'} was tokenized with a different vocabulary "
+                         f"(hash {meta.get('vocab_hash')}, expected {expected}); re-run pretokenize")
+
+
+def example_text(example) -> str:
+    """Plain-text rendering used with pluggable tokenizers: problem, then one step per line."""
+    return example["problem"] + "\n" + "\n".join(example["steps"])
+
+
+class OpCodeTokenizer:
+    """
+    Compact built-in vocabulary derived from the op-code legend:
+    special tokens, one token per op-code, and 256 byte tokens for
+    everything else (digits, the '|' delimiter, symbols, text).
+
+    An op-code is only tokenized as such at the start of a step.
+    """
+    name = "opcode"
+    vocab_hash = hash_vocab(SPECIAL_TOKENS + OPCODE_VOCAB)
+
+    def __init__(self):
+        self.op_ids = {op: len(SPECIAL_TOKENS) + i for i, op in enumerate(OPCODE_VOCAB)}
+        self.byte_offset = len(SPECIAL_TOKENS) + len(OPCODE_VOCAB)
+        self.vocab_size = self.byte_offset + 256
+        self._id_to_op = {i: op for op, i in self.op_ids.items()}
+
+    def encode(self, text) -> list:
+        """Byte-level encoding of free text."""
+        offset = self.byte_offset
+        return [offset + b for b in text.encode("utf-8")]
+
+    def encode_step(self, step_str) -> list:
+        op, sep, rest = step_str.partition(DELIM)
+        op_id = self.op_ids.get(op)
+        if op_id is None:
+            return self.encode(step_str)
+        return [op_id] + self.encode(sep + rest)
+
+    def encode_example(self, example) -> list:
+        """<bos> problem <sep> step <nl> step <nl> ... <eos>"""
+        ids = [BOS]
+        ids += self.encode(example["problem"])
+        ids.append(SEP)
+        for step_str in example["steps"]:
+            ids += self.encode_step(step_str)
+            ids.append(NL)
+        ids.append(EOS)
+        return ids
+
+    def decode(self, ids) -> str:
+        out = bytearray()
+        for i in ids:
+            if i >= self.byte_offset:
+                out.append(i - self.byte_offset)
+            elif i in self._id_to_op:
+                out += self._id_to_op[i].encode("utf-8")
+            elif i in (SEP, NL):
+                out += b"\n"
+        return out.decode("utf-8", errors="replace")
+
+
+def load_tokenizer(spec=None):
+    """
+    Resolves a tokenizer spec:
+        None / 'opcode'   built-in OpCodeTokenizer
+        'hf:<name>'       Hugging Face AutoTokenizer (needs `transformers`)
+        'module:attr'     any object (or zero-arg factory) with encode(text) -> list[int]
+    """
+    if spec is None or spec == "opcode":
+        return OpCodeTokenizer()
+    if spec.startswith("hf:"):
+        try:
+            from transformers import AutoTokenizer
+        except ImportError:
+            raise ImportError("'hf:' tokenizers require the 'transformers' package") from None
+        return AutoTokenizer.from_pretrained(spec[3:])
+    module, _, attr = spec.partition(":")
+    obj = getattr(importlib.import_module(module), attr)
+    return obj() if isinstance(obj, type) or not hasattr(obj, "encode") else obj
+
+
+def encode_example(example, tokenizer) -> list:
+    if hasattr(tokenizer, "encode_example"):
+        return tokenizer.encode_example(example)
+    return list(tokenizer.encode(example_text(example)))
+
+
+def _vocab_size(tokenizer):
+    size = getattr(tokenizer, "vocab_size", None)
+    return size if isinstance(size, int) else None
+
+
+class TokenBinWriter:
+    """Sink that appends token-id arrays to <prefix>.bin and their offsets to <prefix>.offsets."""
+
+    def __init__(self, path, tokenizer=None):
+        self.prefix = os.path.splitext(path)[0]
+        self.tokenizer = tokenizer if tokenizer is not None else OpCodeTokenizer()
+        vocab_size = _vocab_size(self.tokenizer)
+        self.dtype = "uint16" if vocab_size is not None and vocab_size <= 1 << 16 else "uint32"
+        self._typecode = "H" if self.dtype == "uint16" else "I"
+        self.paths = [self.prefix + ".bin", self.prefix + ".offsets", self.prefix + ".meta.json"]
+        self._bin = open(self.paths[0], "wb")
+        self._offsets = open(self.paths[1], "wb")
+        self.num_sequences = 0
+        self.num_tokens = 0
+        self.extra_meta = {}
+        array("Q", [0]).tofile(self._offsets)
+
+    def write(self, example):
+        self.write_ids(encode_example(example, self.tokenizer))
+
+    def write_ids(self, ids):
+        """Appends one already-tokenized sequence."""
+        ids = array(self._typecode, ids)
+        ids.tofile(self._bin)
+        self.num_sequences += 1
+        self.num_tokens += len(ids)
+        array("Q", [self.num_tokens]).tofile(self._offsets)
+
+    def tell(self):
+        """Bytes of token ids written so far."""
+        return self._bin.tell()
+
+    def close(self):
+        self._bin.close()
+        self._offsets.close()
+        meta = dict(
+            format="dolphin-math-tokens",
+            version=1,
+            dtype=self.dtype,
+            vocab_size=_vocab_size(self.tokenizer),
+            vocab_hash=getattr(self.tokenizer, "vocab_hash", None),
+            tokenizer=getattr(self.tokenizer, "name", None) or getattr(self.tokenizer, "name_or_path", None)
+                      or type(self.tokenizer).__name__,
+            num_sequences=self.num_sequences,
+            num_tokens=self.num_tokens,
+            **self.extra_meta,
+        )
+        with open(self.paths[2], "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TokenDataset:
+    """
+    Memory-mapped reader for TokenBinWriter output.
+    dataset[i] is a zero-copy memoryview of the token ids of sequence i
+    (numpy.frombuffer() turns it into an array without copying).
+    Raises ValueError if the data was tokenized with another vocabulary
+    (see check_vocab()).
+    """
+
+    def __init__(self, path, tokenizer=None):
+        prefix = os.path.splitext(path)[0] if path.endswith((".bin", ".jsonl")) else path
+        with open(prefix + ".meta.json", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        check_vocab(self.meta, tokenizer, prefix + ".bin")
+        typecode = "H" if self.meta["dtype"] == "uint16" else "I"
+        self._maps = []
+        self.tokens = self._map(prefix + ".bin", typecode)
+        self.offsets = self._map(prefix + ".offsets", "Q")
+
+    def _map(self, path, typecode):
+        if os.path.getsize(path) == 0:
+            return memoryview(array(typecode))
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mm)
+        return memoryview(mm).cast(typecode)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        return self.tokens[self.offsets[i]:self.offsets[i + 1]]
+
+    def lengths(self) -> list:
+        offsets = self.offsets
+        return [offsets[i + 1] - offsets[i] for i in range(len(self))]
+
+    def close(self):
+        self.tokens.release()
+        self.offsets.release()
+        for mm in self._maps:
+            mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def pretokenize_files(inputs, output, tokenizer=None) -> int:
+    """Tokenizes existing JSONL files into one .bin/.offsets pair. Returns the sequence count."""
+    with TokenBinWriter(output, tokenizer) as writer:
+        for path in inputs:
+            with open(path, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        writer.write(json.loads(line))
+    return writer.num_sequences
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-tokenize JSONL files into memory-mappable .bin files")
+    parser.add_argument("inputs", nargs="+", help="JSONL files produced by build_dataset")
+    parser.add_argument("-o", "--output", required=True, help="Output prefix (writes PREFIX.bin, PREFIX.offsets, PREFIX.meta.json)")
+    parser.add_argument("--tokenizer", default=None,
+                        help="'opcode' (default), 'hf:<name>' or 'module:attr'.")
+    args = parser.parse_args(argv)
+
+    count = pretokenize_files(args.inputs, args.output, load_tokenizer(args.tokenizer))
+    print(f"✔  Tokenized {count} examples → {os.path.splitext(args.output)[0]}.bin")
+    return 0
@@ -0,0 +1,412 @@
+import os
+import json
+import random
+import asyncio
+import argparse
+from itertools import islice
+from collections import Counter, OrderedDict, deque
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ProcessPoolExecutor
+
+# -----------------------------------------------------------
+# Streaming problem server for online RL.
+#
+#   GET /batch?size=32&ops=fraction_add,decimal_mul&weights=fraction_add:3&payload=answer
+#   GET /health
+#   POST /feedback   [{"problem_id": ..., "reward": 1}, ...]   (adaptive servers)
+#
+# A process pool keeps one prefetch buffer per operation topped up, so a
+# request only pops ready examples and its latency does not depend on
+# generation cost. Requests choose operations (ops=), a mixture over them
+# (weights=, default uniform) and the payload: 'full' examples with steps
+# or 'answer' (problem_id, operation, problem, final_answer) only.
+# With an AdaptiveSampler, adaptive=1 draws the mixture from the rewards
+# the trainer posts to /feedback (see pipeline/adaptive.py): operations by
+# their weights, then per example the buffered problem nearest the front
+# that falls in the difficulty bucket the sampler aims for.
+# Served over HTTP/1.1 (keep-alive) on TCP or a Unix socket.
+# -----------------------------------------------------------
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_SIZE = 32
+MAX_BATCH_SIZE = 4096
+ANSWER_FIELDS = ("problem_id", "operation", "problem", "final_answer")
+PAYLOADS = ("full", "answer")
+MAX_TRACKED = 1 << 17  # Served problem_ids remembered for feedback
+BUCKET_SCAN = 64  # Buffered examples searched for the target difficulty bucket
+
+
+def _generators():
+    from arithmetic.dolphin_math_datagen import ALL_GENERATORS  # Deferred: the CLI module imports this one
+    return ALL_GENERATORS
+
+
+def generate_batch(gen_index, count, seed):
+    """Pool worker: up to count examples from ALL_GENERATORS[gen_index] (failed attempts are skipped)."""
+    random.seed(seed)
+    gen = _generators()[gen_index]
+    try:
+        return [example for example in gen.generate_batch(count) if example]
+    except Exception:
+        pass  # One bad problem fails the whole vectorized batch; retry one by one
+    batch = []
+    for _ in range(count):
+        try:
+            example = gen.generate()
+        except Exception:
+            continue
+        if example:
+            batch.append(example)
+    return batch
+
+
+def discover_operations(samples=40, seed=0) -> dict:
+    """{operation: [indices into ALL_GENERATORS that produce it]}, found by sampling each generator."""
+    ops = {}
+    for index in range(len(_generators())):
+        for example in generate_batch(index, samples, seed + index):
+            indices = ops.setdefault(example["operation"], [])
+            if index not in indices:
+                indices.append(index)
+    return ops
+
+
+def parse_weights(spec) -> dict:
+    """'fraction_add:3,decimal_mul:1' -> {'fraction_add': 3.0, 'decimal_mul': 1.0}"""
+    weights = {}
+    for part in filter(None, spec.split(",")):
+        op, _, weight = part.partition(":")
+        weights[op.strip()] = float(weight) if weight else 1.0
+    return weights
+
+
+class ProblemServer:
+    """
+    Per-operation prefetch buffers fed by a process pool, and the HTTP front end.
+
+    Usage:
+        server = ProblemServer(workers=4)
+        await server.start()
+        batch = await server.take(32, ops=["fraction_add"])
+        await server.serve_tcp(port=8765)   # or serve_unix(path)
+        server.feedback([{"problem_id": batch[0]["problem_id"], "reward": 1}])   # adaptive=True
+        await server.close()
+    """
+
+    def __init__(self, workers=None, buffer_size=256, refill_batch=32, seed=None, adaptive=None,
+                 op_generators=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.buffer_size = buffer_size
+        self.refill_batch = refill_batch
+        self._rng = random.Random(seed)
+        self._seed = self._rng.getrandbits(32)
+        self._pool = None
+        self._buffers = {}
+        self._op_generators = op_generators or {}  # Discovered in start() unless given
+        self._inflight = Counter()
+        self._changed = None
+        self._wakeup = None
+        self._refill_task = None
+        self._servers = []
+        self.served = Counter()
+        self.adaptive = adaptive  # An AdaptiveSampler, or True to create one in start()
+        self._arms = OrderedDict()
+
+    @property
+    def operations(self):
+        return sorted(self._buffers)
+
+    async def start(self):
+        self._op_generators = self._op_generators or discover_operations()
+        self._buffers = {op: deque() for op in self._op_generators}
+        if self.adaptive is True:
+            from arithmetic.pipeline.adaptive import AdaptiveSampler  # Deferred: adaptive imports this module
+            self.adaptive = AdaptiveSampler(self._op_generators, seed=self._rng.getrandbits(32))
+        self._changed = asyncio.Condition()
+        self._wakeup = asyncio.Event()
+        self._pool = ProcessPoolExecutor(self.workers)
+        self._refill_task = asyncio.create_task(self._refill_loop())
+
+    def _neediest(self):
+        """Operation furthest below its buffer target, counting batches in flight; None if all are full."""
+        best, best_level = None, self.buffer_size
+        for op, buf in self._buffers.items():
+            level = len(buf) + self._inflight[op] * self.refill_batch
+            if level < best_level:
+                best, best_level = op, level
+        return best
+
+    async def _refill_loop(self):
+        loop = asyncio.get_running_loop()
+        pending = {}
+        while True:
+            while len(pending) < 2 * self.workers:
+                op = self._neediest()
+                if op is None:
+                    break
+                self._seed += 1
+                gen_index = self._rng.choice(self._op_generators[op])
+                future = loop.run_in_executor(self._pool, generate_batch, gen_index, self.refill_batch, self._seed)
+                pending[future] = op
+                self._inflight[op] += 1
+            if not pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            async with self._changed:
+                for future in done:
+                    self._inflight[pending.pop(future)] -= 1
+                    try:
+                        examples = future.result()
+                    except Exception as e:  # A crashed worker; the op is simply requested again
+                        print(f"ERROR: generation task failed: {e}")
+                        continue
+                    for example in examples:
+                        buf = self._buffers.setdefault(example["operation"], deque())
+                        if len(buf) < 2 * self.buffer_size:
+                            buf.append(example)
+                self._changed.notify_all()
+
+    async def take(self, size, ops=None, weights=None, payload="full", adaptive=False) -> list:
+        """
+        A batch of size examples mixing ops by weights (default: uniform over
+        ops; ops default to every operation, or to the weighted ones).
+        adaptive=True takes the weights from the server's AdaptiveSampler,
+        and each example from its operation's buffer in the difficulty
+        bucket the sampler chooses (the oldest one if none is near the front).
+        """
+        if not 0 < size <= MAX_BATCH_SIZE:
+            raise ValueError(f"size must be between 1 and {MAX_BATCH_SIZE}")
+        if payload not in PAYLOADS:
+            raise ValueError(f"payload must be one of: {', '.join(PAYLOADS)}")
+        if adaptive:
+            if not self.adaptive:
+                raise ValueError("this server was started without an adaptive sampler")
+            if weights:
+                raise ValueError("adaptive sampling and explicit weights are exclusive")
+            weights = self.adaptive.weights([op for op in (ops or self._buffers) if op in self._buffers] or None)
+        weights = weights or {}
+        ops = list(ops or [op for op, w in weights.items() if w > 0] or self._buffers)
+        unknown = [op for op in list(ops) + list(weights) if op not in self._buffers]
+        if unknown:
+            raise ValueError(f"unknown operation(s): {', '.join(unknown)}")
+        mix = [weights.get(op, 1.0 if not weights else 0.0) for op in ops]
+        if sum(mix) <= 0:
+            raise ValueError("weights must give at least one selected operation a positive weight")
+
+        batch = []
+        async with self._changed:
+            for op, count in Counter(self._rng.choices(ops, mix, k=size)).items():
+                buf = self._buffers[op]
+                while count:
+                    if not buf:
+                        self._wakeup.set()
+                        await self._changed.wait_for(lambda: buf)
+                    if adaptive:
+                        batch.append(self._pop_bucket(buf, self.adaptive.choose_bucket(op)))
+                        count -= 1
+                        continue
+                    n = min(count, len(buf))
+                    batch.extend(buf.popleft() for _ in range(n))
+                    count -= n
+        self._wakeup.set()
+        self._rng.shuffle(batch)
+        self.served.update(example["operation"] for example in batch)
+        if self.adaptive:
+            self._track(batch)
+        if payload == "answer":
+            batch = [{key: example[key] for key in ANSWER_FIELDS + ("difficulty",) if key in example}
+                     for example in batch]
+        return batch
+
+    @staticmethod
+    def _pop_bucket(buf, bucket):
+        """Removes the first of the BUCKET_SCAN oldest examples in bucket, or the oldest one."""
+        if bucket is not None:
+            from arithmetic.pipeline.adaptive import difficulty_bucket
+            for i, example in enumerate(islice(buf, BUCKET_SCAN)):
+                if difficulty_bucket(example) == bucket:
+                    del buf[i]
+                    return example
+        return buf.popleft()
+
+    def _track(self, batch):
+        """Tags examples with their difficulty bucket and remembers their arm for feedback."""
+        from arithmetic.pipeline.adaptive import difficulty_bucket
+        for example in batch:
+            example["difficulty"] = difficulty_bucket(example)
+            self._arms[example["problem_id"]] = (example["operation"], example["difficulty"])
+        while len(self._arms) > MAX_TRACKED:
+            self._arms.popitem(last=False)
+
+    def feedback(self, events) -> dict:
+        """
+        Feeds trainer rewards to the adaptive sampler. Each event has a reward
+        (a number from 0 to 1) and either the problem_id (str or int) of a
+        served example or its operation (and difficulty bucket). Events for
+        unknown problems or operations count as unknown. Raises ValueError,
+        before applying any event, if one is malformed.
+        Returns {'accepted', 'unknown'}.
+        """
+        if not self.adaptive:
+            raise ValueError("this server was started without an adaptive sampler")
+        arms = []
+        for event in events:
+            if not isinstance(event, dict) or "reward" not in event:
+                raise ValueError("each feedback event needs a reward")
+            reward = event["reward"]
+            if isinstance(reward, bool) or not isinstance(reward, (int, float)) or not 0 <= reward <= 1:
+                raise ValueError(f"reward must be a number from 0 to 1, not {reward!r}")
+            if "problem_id" in event and not isinstance(event["problem_id"], (str, int)):
+                raise ValueError("problem_id must be a string or an integer")
+            difficulty = event.get("difficulty")
+            if difficulty is not None and (isinstance(difficulty, bool) or not isinstance(difficulty, int)
+                                           or not 0 <= difficulty <= 64):
+                raise ValueError("difficulty must be an integer from 0 to 64")
+            if "operation" in event and not isinstance(event["operation"], str):
+                raise ValueError("operation must be a string")
+            arms.append((event, reward))
+        accepted = unknown = 0
+        for event, reward in arms:
+            arm = self._arms.pop(event["problem_id"], None) if "problem_id" in event else None
+            if arm is None and event.get("operation") in self._buffers:
+                arm = (event["operation"], event.get("difficulty"))
+            if arm is None:
+                unknown += 1  # Never served, already rewarded, or an operation this server does not have
+                continue
+            self.adaptive.update(arm[0], reward, bucket=arm[1])
+            accepted += 1
+        return {"accepted": accepted, "unknown": unknown}
+
+    # ---------- HTTP ----------
+
+    async def _route(self, method, target, body=b""):
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == "/feedback":
+            if method != "POST":
+                return "405 Method Not Allowed", {"error": "use POST for /feedback"}
+            try:
+                events = json.loads(body or b"[]")
+                return "200 OK", self.feedback(events if isinstance(events, list) else [events])
+            except ValueError as e:
+                return "400 Bad Request", {"error": str(e)}
+        if method != "GET":
+            return "405 Method Not Allowed", {"error": "only GET is supported"}
+        if url.path == "/health":
+            health = {"buffers": {op: len(buf) for op, buf in sorted(self._buffers.items())},
+                      "served": dict(self.served)}
+            if self.adaptive:
+                health["adaptive"] = self.adaptive.stats()
+            return "200 OK", health
+        if url.path != "/batch":
+            return "404 Not Found", {"error": f"no route {url.path}"}
+        try:
+            batch = await self.take(
+                int(query.get("size", DEFAULT_BATCH_SIZE)),
+                ops=[op for op in query.get("ops", "").split(",") if op],
+                weights=parse_weights(query.get("weights", "")),
+                payload=query.get("payload", "full"),
+                adaptive=query.get("adaptive", "0") not in ("0", "false", ""),
+            )
+        except ValueError as e:
+            return "400 Bad Request", {"error": str(e)}
+        return "200 OK", {"examples": batch}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = b""
+                if int(headers.get("content-length", 0)):
+                    body = await reader.readexactly(int(headers["content-length"]))
+                status, payload = await self._route(method, target, body)
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(body)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve_tcp(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Starts listening; returns the asyncio server (its port may be 0 -> ephemeral)."""
+        server = await asyncio.start_server(self._handle, host, port)
+        self._servers.append(server)
+        return server
+
+    async def serve_unix(self, path):
+        server = await asyncio.start_unix_server(self._handle, path)
+        self._servers.append(server)
+        return server
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        if self._refill_task:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+        if self._pool:
+            self._pool.shutdown(cancel_futures=True)
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None, **options):
+    server = ProblemServer(**options)
+    await server.start()
+    listener = await (server.serve_unix(unix) if unix else server.serve_tcp(host, port))
+    where = unix or "http://{}:{}".format(*listener.sockets[0].getsockname()[:2])
+    print(f"✔  Serving {len(server.operations)} operations on {where} ({server.workers} workers)")
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve freshly generated problems over HTTP for online RL")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", default=None, help="Listen on this Unix socket path instead of TCP.")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Generator processes (default: all cores).")
+    parser.add_argument("--buffer-size", type=int, default=256, help="Prefetched examples per operation.")
+    parser.add_argument("--refill-batch", type=int, default=32, help="Examples per generation task.")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="Seed for reproducible sampling.")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Accept rewards on POST /feedback and serve adaptive=1 batches near --target success.")
+    parser.add_argument("--target", type=float, default=0.5, help="Success rate adaptive sampling aims for.")
+    args = parser.parse_args(argv)
+
+    adaptive = op_generators = None
+    if args.adaptive:
+        from arithmetic.pipeline.adaptive import AdaptiveSampler
+        op_generators = discover_operations()  # Shared with the server instead of sampling twice
+        adaptive = AdaptiveSampler(op_generators, target=args.target, seed=args.seed)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, workers=args.workers, buffer_size=args.buffer_size,
+                          refill_batch=args.refill_batch, seed=args.seed, adaptive=adaptive,
+                          op_generators=op_generators))
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,156 @@
+import os
+import json
+import hashlib
+from collections import Counter
+from arithmetic.pipeline.sinks import open_sink
+
+# -----------------------------------------------------------
+# Sharded output with a JSON manifest.
+#
+# data.jsonl is written as data-00000.jsonl, data-00001.jsonl, ... plus
+# data.manifest.json recording the seed, per-shard example and operation
+# counts, and the byte size and SHA-256 of every file written.
+# -----------------------------------------------------------
+
+_HASH_BLOCK = 1 << 20
+_UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+def parse_size(spec) -> int:
+    """Parses a byte size like '268435456', '256M' or '1G'."""
+    spec = spec.strip().upper().rstrip("B")
+    if spec and spec[-1] in _UNITS:
+        return int(float(spec[:-1]) * _UNITS[spec[-1]])
+    return int(spec)
+
+
+def shard_path(path, index):
+    """data.jsonl -> data-00003.jsonl"""
+    root, ext = os.path.splitext(path)
+    return f"{root}-{index:05d}{ext or '.jsonl'}"
+
+
+def manifest_path(path):
+    """data.jsonl -> data.manifest.json"""
+    return os.path.splitext(path)[0] + ".manifest.json"
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def shard_quotas(total, num_shards) -> list:
+    """Splits total examples into num_shards counts that differ by at most one."""
+    return [total // num_shards + (i < total % num_shards) for i in range(num_shards)]
+
+
+class ShardSink:
+    """One shard: a sink of the requested format that also tallies examples per operation."""
+
+    def __init__(self, path, format="jsonl", **sink_options):
+        self._sink = open_sink(path, format, **sink_options)
+        self.paths = self._sink.paths
+        self.count = 0
+        self.operations = Counter()
+
+    def write(self, example):
+        self._sink.write(example)
+        self.count += 1
+        self.operations[example["operation"]] += 1
+
+    def tell(self):
+        return self._sink.tell()
+
+    def close(self):
+        self._sink.close()
+
+    def entry(self) -> dict:
+        """Manifest entry for the closed shard."""
+        return {
+            "count": self.count,
+            "operations": dict(sorted(self.operations.items())),
+            "files": [{"path": os.path.basename(p), "bytes": os.path.getsize(p), "sha256": file_sha256(p)}
+                      for p in self.paths],
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ShardWriter:
+    """
+    Sink that rotates to a new shard when the current one fills up:
+    after shard_size bytes, or - with num_shards - after an equal share
+    of the total expected examples. Closing it finalizes the last shard;
+    write_manifest(path, writer.shards, seed) then records them all.
+    """
+
+    def __init__(self, path, shard_size=None, num_shards=None, total=None, format="jsonl", **sink_options):
+        if (shard_size is None) == (num_shards is None):
+            raise ValueError("Specify exactly one of shard_size or num_shards")
+        if num_shards is not None and total is None:
+            raise ValueError("num_shards needs the total number of examples")
+        self.path = path
+        self.shard_size = shard_size
+        self.quotas = shard_quotas(total, num_shards) if num_shards else None
+        self.format = format
+        self.sink_options = sink_options
+        self.shards = []  # Manifest entries of closed shards
+        self.paths = []
+        self._current = None
+
+    def _full(self):
+        if self.quotas is not None:
+            index = len(self.shards)
+            return index < len(self.quotas) - 1 and self._current.count >= self.quotas[index]
+        return self._current.tell() >= self.shard_size
+
+    def _rotate(self):
+        if self._current is not None:
+            self._current.close()
+            self.shards.append(self._current.entry())
+        self._current = ShardSink(shard_path(self.path, len(self.shards)), self.format, **self.sink_options)
+        self.paths.extend(self._current.paths)
+
+    def write(self, example):
+        if self._current is None or self._full():
+            self._rotate()
+        self._current.write(example)
+
+    def close(self):
+        if self._current is not None:
+            self._current.close()
+            self.shards.append(self._current.entry())
+            self._current = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_manifest(path, shards, seed, **extra) -> str:
+    """Writes the manifest for shards (a list of ShardSink.entry() dicts). Returns its path."""
+    operations = Counter()
+    for shard in shards:
+        operations.update(shard["operations"])
+    manifest = dict(
+        seed=seed,
+        num_shards=len(shards),
+        count=sum(shard["count"] for shard in shards),
+        operations=dict(sorted(operations.items())),
+        **extra,
+        shards=shards,
+    )
+    out = manifest_path(path)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return out
@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import multiprocessing
+from multiprocessing import shared_memory
+
+# -----------------------------------------------------------
+# Shared-memory transport from generator processes to one writer.
+#
+# Each worker owns a shared-memory ring of `slots` fixed-size slots. It
+# encodes examples as JSONL straight into its current slot and, when the
+# slot is full, posts (worker, slot, length, count) on a queue - only
+# four ints are pickled. The parent writes memoryview slices of the
+# shared buffer to the output file (no copy, no unpickling) and hands the
+# slot back through the worker's free-slot queue. A worker with no free
+# slot waits, which bounds memory and applies backpressure.
+#
+# Lines from different workers interleave in arrival order; the lines
+# of each worker stay in order.
+# -----------------------------------------------------------
+
+DEFAULT_SLOT_SIZE = 1 << 20
+DEFAULT_SLOTS = 4
+_DONE = -1
+_ERROR = -2
+
+
+class ShmSlotSink:
+    """Worker-side sink encoding examples into the slots of one shared-memory ring."""
+
+    def __init__(self, index, buf, slot_size, free_slots, ready):
+        self.index = index
+        self.paths = []
+        self._buf = buf
+        self._slot_size = slot_size
+        self._free = free_slots
+        self._ready = ready
+        self._slot = None
+        self._pos = 0
+        self._count = 0
+
+    def write(self, example):
+        self.write_line(json.dumps(example, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    def write_line(self, line):
+        n = len(line)
+        if n > self._slot_size:
+            raise ValueError(f"a {n}-byte line does not fit a {self._slot_size}-byte slot")
+        if self._slot is None:
+            self._slot = self._free.get()
+        elif self._pos + n > self._slot_size:
+            self.flush()
+            self._slot = self._free.get()
+        start = self._slot * self._slot_size + self._pos
+        self._buf[start:start + n] = line
+        self._pos += n
+        self._count += 1
+
+    def flush(self):
+        """Posts the current slot to the writer."""
+        if self._slot is not None and self._pos:
+            self._ready.put((self.index, self._slot, self._pos, self._count))
+            self._slot, self._pos, self._count = None, 0, 0
+
+    def close(self):
+        self.flush()
+
+
+def _worker(index, task, producer, shm_name, slot_size, free_slots, ready):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        sink = ShmSlotSink(index, shm.buf, slot_size, free_slots, ready)
+        producer(task, sink)
+        sink.close()
+        ready.put((index, _DONE, 0, 0))
+    except BaseException as e:
+        ready.put((index, _ERROR, 0, f"{type(e).__name__}: {e}"))
+    finally:
+        sink = None
+        shm.close()
+
+
+def run_shm_pipeline(tasks, producer, out_fp, slot_size=DEFAULT_SLOT_SIZE, slots=DEFAULT_SLOTS) -> dict:
+    """
+    Runs producer(task, sink) in one process per task; everything the producers
+    write to their sink ends up in out_fp (a binary file). producer must be a
+    module-level function. Returns {'examples', 'bytes', 'batches'}.
+    """
+    ctx = multiprocessing.get_context()
+    ready = ctx.Queue()
+    rings, free_queues, procs = [], [], []
+    stats = dict(examples=0, bytes=0, batches=0)
+    try:
+        for index, task in enumerate(tasks):
+            shm = shared_memory.SharedMemory(create=True, size=slot_size * slots)
+            rings.append(shm)
+            free = ctx.Queue()
+            for slot in range(slots):
+                free.put(slot)
+            free_queues.append(free)
+            proc = ctx.Process(target=_worker, args=(index, task, producer, shm.name, slot_size, free, ready),
+                               daemon=True)
+            proc.start()
+            procs.append(proc)
+
+        running, error = len(procs), None
+        while running:
+            try:
+                index, slot, length, count = ready.get(timeout=1.0)
+            except queue.Empty:
+                dead = [p.exitcode for p in procs if p.exitcode not in (None, 0)]
+                if dead:
+                    raise RuntimeError(f"shared-memory worker exited with code {dead[0]}")
+                continue
+            if slot == _DONE:
+                running -= 1
+                continue
+            if slot == _ERROR:
+                running -= 1
+                error = error or count
+                continue
+            start = slot * slot_size
+            view = rings[index].buf[start:start + length]
+            out_fp.write(view)
+            view.release()
+            free_queues[index].put(slot)
+            stats["examples"] += count
+            stats["bytes"] += length
+            stats["batches"] += 1
+        for proc in procs:
+            proc.join()
+        if error:
+            raise RuntimeError(f"shared-memory worker failed: {error}")
+        return stats
+    finally:
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+        for shm in rings:
+            shm.close()
+            shm.unlink()
+
+
+# ---------- Benchmark: shared memory vs. Pool.imap with pickled dicts ----------
+
+_POOL = []
+
+
+def _example_pool(size=256):
+    """A per-process pool of real examples, so the benchmark measures transport, not generation."""
+    if not _POOL:
+        import random
+        from arithmetic.dolphin_math_datagen import ALL_GENERATORS
+        rng_state = random.getstate()
+        random.seed(os.getpid())
+        _POOL.extend(random.choice(ALL_GENERATORS).generate() for _ in range(size))
+        random.setstate(rng_state)
+    return _POOL
+
+
+def _bench_producer(count, sink):
+    pool = _example_pool()
+    for i in range(count):
+        sink.write(pool[i % len(pool)])
+
+
+def _bench_example(i):
+    pool = _example_pool()
+    return pool[i % len(pool)]
+
+
+def _bench_imap(n, workers, out_fp, chunksize=256):
+    with multiprocessing.Pool(workers) as pool:
+        for example in pool.imap(_bench_example, range(n), chunksize=chunksize):
+            out_fp.write(json.dumps(example, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+def _bench_shm(n, workers, out_fp):
+    tasks = [n // workers + (i < n % workers) for i in range(workers)]
+    run_shm_pipeline(tasks, _bench_producer, out_fp)
+
+
+def benchmark(n=200_000, worker_counts=(1, 4, 16, 64), out_path=os.devnull) -> list:
+    """[(workers, imap examples/s, shared-memory examples/s)] for each worker count."""
+    results = []
+    for workers in worker_counts:
+        rates = []
+        for run in (_bench_imap, _bench_shm):
+            with open(out_path, "wb") as out_fp:
+                start = time.perf_counter()
+                run(n, workers, out_fp)
+                rates.append(n / (time.perf_counter() - start))
+        results.append((workers, *rates))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the shared-memory transport against Pool.imap")
+    parser.add_argument("-n", "--num-examples", type=int, default=200_000, help="Examples per run.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16, 64], help="Worker counts to compare.")
+    parser.add_argument("-o", "--output", default=os.devnull, help="Where benchmark output is written.")
+    args = parser.parse_args(argv)
+
+    print(f"{'workers':>8}{'imap ex/s':>14}{'shm ex/s':>14}{'speedup':>10}  ({os.cpu_count()} cores)")
+    for workers, imap_rate, shm_rate in benchmark(args.num_examples, args.workers, args.output):
+        print(f"{workers:>8}{imap_rate:>14,.0f}{shm_rate:>14,.0f}{shm_rate / imap_rate:>9.2f}x")
+        sys.stdout.flush()
+    return 0
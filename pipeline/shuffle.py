@@ -0,0 +1,105 @@
+import os
+import random
+import shutil
+import argparse
+import tempfile
+
+# -----------------------------------------------------------
+# External-memory global shuffle for JSONL files larger than RAM.
+#
+# Pass 1 scatters every line of every input into a random bucket file on
+# disk; pass 2 loads one bucket at a time, shuffles it in memory and
+# appends it to the output. Random bucket assignment followed by an
+# in-bucket shuffle yields a uniformly random permutation. Buckets that
+# still exceed the memory budget are scattered again recursively.
+# -----------------------------------------------------------
+
+DEFAULT_MEMORY_MB = 512
+_MIN_FLUSH_BYTES = 64 * 1024
+
+
+def _scatter(inputs, bucket_dir, n_buckets, rng, memory_bytes):
+    """Pass 1: appends each input line to a random bucket file. Returns the bucket paths."""
+    paths = [os.path.join(bucket_dir, f"bucket_{i:05d}") for i in range(n_buckets)]
+    buffers = [[] for _ in range(n_buckets)]
+    sizes = [0] * n_buckets
+    # Write buffers share half the budget; flush a bucket once its share fills
+    flush_bytes = max(_MIN_FLUSH_BYTES, memory_bytes // (2 * n_buckets))
+
+    def flush(b):
+        with open(paths[b], "ab") as f:
+            f.write(b"".join(buffers[b]))
+        buffers[b] = []
+        sizes[b] = 0
+
+    rand = rng.random
+    for path in inputs:
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                if not line.endswith(b"\n"):
+                    line += b"\n"  # Last line of a shard without a trailing newline
+                b = int(rand() * n_buckets)
+                buffers[b].append(line)
+                sizes[b] += len(line)
+                if sizes[b] >= flush_bytes:
+                    flush(b)
+    for b in range(n_buckets):
+        if buffers[b]:
+            flush(b)
+    return [p for p in paths if os.path.exists(p)]
+
+
+def _shuffle_into(inputs, out_fp, rng, memory_bytes, tmp_dir, depth=0):
+    """Shuffles the lines of inputs and appends them to out_fp."""
+    total = sum(os.path.getsize(p) for p in inputs)
+    # In-memory lists of bytes cost roughly twice the raw size
+    if total * 2 <= memory_bytes or depth >= 3:
+        lines = []
+        for path in inputs:
+            with open(path, "rb") as f:
+                lines.extend(line if line.endswith(b"\n") else line + b"\n" for line in f if line.strip())
+        rng.shuffle(lines)
+        out_fp.writelines(lines)
+        return
+    n_buckets = max(2, -(-total * 4 // memory_bytes))  # Target buckets at ~1/4 of the budget
+    bucket_dir = tempfile.mkdtemp(prefix="shuffle_", dir=tmp_dir)
+    try:
+        for bucket in _scatter(inputs, bucket_dir, n_buckets, rng, memory_bytes):
+            _shuffle_into([bucket], out_fp, rng, memory_bytes, bucket_dir, depth + 1)
+            os.remove(bucket)
+    finally:
+        shutil.rmtree(bucket_dir, ignore_errors=True)
+
+
+def shuffle_files(inputs, output, seed=42, memory_mb=DEFAULT_MEMORY_MB, tmp_dir=None):
+    """
+    Globally shuffles the lines of one or more JSONL files into output.
+
+    Sharded outputs of several generation runs are merged in the same pass.
+    The result is deterministic for a given seed, memory budget and input
+    order. Temporary buckets go to tmp_dir (default: next to the output).
+    """
+    rng = random.Random(seed)
+    memory_bytes = int(memory_mb * 1024 * 1024)
+    tmp_dir = tmp_dir or os.path.dirname(os.path.abspath(output))
+    tmp_output = output + ".tmp"
+    with open(tmp_output, "wb") as out_fp:
+        _shuffle_into(list(inputs), out_fp, rng, memory_bytes, tmp_dir)
+    os.replace(tmp_output, output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Globally shuffle JSONL files larger than memory")
+    parser.add_argument("inputs", nargs="+", help="JSONL files (or shards) to shuffle together")
+    parser.add_argument("-o", "--output", required=True, help="Shuffled output file")
+    parser.add_argument("-s", "--seed", type=int, default=42, help="Random seed for reproducibility.")
+    parser.add_argument("--memory-mb", type=int, default=DEFAULT_MEMORY_MB,
+                        help="Approximate memory budget for buffers and in-memory buckets.")
+    parser.add_argument("--tmp-dir", default=None, help="Directory for temporary bucket files.")
+    args = parser.parse_args(argv)
+
+    shuffle_files(args.inputs, args.output, seed=args.seed, memory_mb=args.memory_mb, tmp_dir=args.tmp_dir)
+    print(f"✔  Shuffled {len(args.inputs)} file(s) → {args.output}")
+    return 0
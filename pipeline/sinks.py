@@ -0,0 +1,232 @@
+import gzip
+import json
+import time
+import queue
+import threading
+from arithmetic.base_generator import StepStream
+from arithmetic.pipeline.pretokenize import TokenBinWriter
+from arithmetic.pipeline.columnar import ColumnarSink
+
+# -----------------------------------------------------------
+# Output sinks for build_dataset(). A sink takes example dicts via
+# write(example), reports its size with tell() and is closed at the end
+# (it is also a context manager). paths lists the files it writes.
+# Formats are registered in SINKS and opened with open_sink().
+#
+# Examples from generate_stream() carry their steps as a StepStream and
+# final_answer as a callable. JSONL sinks serialize such a 'steps' array
+# while it is being produced, STEP_BATCH steps at a time, with output
+# identical to json.dumps() of the materialized example.
+# -----------------------------------------------------------
+
+STEP_BATCH = 256
+
+
+def open_output(path):
+    """Binary output file; paths ending in .gz are gzip-compressed (at gzip's usual level 6, not Python's 9)."""
+    return gzip.open(path, "wb", compresslevel=6) if path.endswith(".gz") else open(path, "wb")
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _iter_array(items):
+    yield b"["
+    batch, first = [], True
+    for item in items:
+        batch.append(_dumps(item))
+        if len(batch) >= STEP_BATCH:
+            yield (("" if first else ", ") + ", ".join(batch)).encode("utf-8")
+            batch, first = [], False
+    if batch:
+        yield (("" if first else ", ") + ", ".join(batch)).encode("utf-8")
+    yield b"]"
+
+
+def iter_encoded(example):
+    """Yields the JSONL line of example in pieces, consuming a streamed 'steps' array as it goes."""
+    yield b"{"
+    for i, (key, value) in enumerate(example.items()):
+        yield ((", " if i else "") + _dumps(key) + ": ").encode("utf-8")
+        if isinstance(value, StepStream):
+            yield from _iter_array(value)
+        else:
+            yield _dumps(value() if callable(value) else value).encode("utf-8")
+    yield b"}\n"
+
+
+def _encode(example) -> bytes:
+    if isinstance(example.get("steps"), StepStream):
+        return b"".join(iter_encoded(example))
+    return (_dumps(example) + "\n").encode("utf-8")
+
+
+class JsonlSink:
+    """
+    Default sink: one JSON object per line. Streamed steps go straight to the
+    file; if the trace fails midway the partial line is truncated away again
+    (gzip output cannot seek back, so there the line is encoded in memory first).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.paths = [path]
+        self._fp = open_output(path)
+        self._rewindable = not path.endswith(".gz")
+
+    def write(self, example):
+        if not (self._rewindable and isinstance(example.get("steps"), StepStream)):
+            self._fp.write(_encode(example))
+            return
+        start = self._fp.tell()
+        try:
+            for piece in iter_encoded(example):
+                self._fp.write(piece)
+        except BaseException:
+            self._fp.seek(start)
+            self._fp.truncate()
+            raise
+
+    def write_line(self, line):
+        """Writes an already-encoded, newline-terminated JSONL line."""
+        self._fp.write(line)
+
+    def tell(self):
+        """Bytes written so far."""
+        return self._fp.tell()
+
+    def close(self):
+        self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PipelinedJsonlSink:
+    """
+    JSONL sink that overlaps generation with file I/O. The producer encodes
+    examples and hands chunks of about chunk_bytes to a writer thread over a
+    bounded queue; the writer thread does the writes (and gzip compression,
+    which releases the GIL). When the writer falls behind, the queue fills
+    and write() blocks until there is room again (backpressure).
+    """
+
+    def __init__(self, path, queue_size=64, chunk_bytes=1 << 20):
+        self.path = path
+        self.paths = [path]
+        self.chunk_bytes = chunk_bytes
+        self._fp = open_output(path)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._buffer = []
+        self._buffered = 0
+        self._handed_off = 0
+        self._error = None
+        # Stats
+        self._chunks = 0
+        self._occupancy_total = 0
+        self._occupancy_max = 0
+        self._stalls = 0
+        self._stall_seconds = 0.0
+        self._write_seconds = 0.0
+        self._thread = threading.Thread(target=self._run, name="jsonl-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, example):
+        self.write_line(_encode(example))
+
+    def write_line(self, line):
+        """Queues an already-encoded, newline-terminated JSONL line."""
+        self._buffer.append(line)
+        self._buffered += len(line)
+        if self._buffered >= self.chunk_bytes:
+            self._hand_off()
+
+    def _hand_off(self):
+        if self._error is not None:
+            raise self._error
+        chunk = b"".join(self._buffer)
+        self._buffer = []
+        self._handed_off += self._buffered
+        self._buffered = 0
+        occupancy = self._queue.qsize()
+        self._chunks += 1
+        self._occupancy_total += occupancy
+        self._occupancy_max = max(self._occupancy_max, occupancy)
+        try:
+            self._queue.put_nowait(chunk)
+        except queue.Full:
+            start = time.perf_counter()
+            self._queue.put(chunk)
+            self._stalls += 1
+            self._stall_seconds += time.perf_counter() - start
+
+    def _run(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            if self._error is not None:
+                continue  # Keep draining so the producer never blocks on a dead writer
+            start = time.perf_counter()
+            try:
+                self._fp.write(chunk)
+            except Exception as e:
+                self._error = e
+            self._write_seconds += time.perf_counter() - start
+
+    def tell(self):
+        """Bytes written so far, including those still queued."""
+        return self._handed_off + self._buffered
+
+    def close(self):
+        if self._buffer:
+            self._hand_off()
+        self._queue.put(None)
+        self._thread.join()
+        self._fp.close()
+        if self._error is not None:
+            raise self._error
+
+    def stats(self) -> dict:
+        """Queue occupancy and stall counters, for tuning queue_size and chunk_bytes."""
+        return dict(
+            chunks=self._chunks,
+            queue_size=self._queue.maxsize,
+            mean_occupancy=self._occupancy_total / self._chunks if self._chunks else 0.0,
+            max_occupancy=self._occupancy_max,
+            stalls=self._stalls,
+            stall_seconds=self._stall_seconds,
+            write_seconds=self._write_seconds,
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# format name -> sink class, called as cls(path, **options)
+SINKS = {
+    "jsonl": JsonlSink,
+    "bin": TokenBinWriter,
+    "parquet": ColumnarSink,
+}
+
+
+def open_sink(path, format="jsonl", pipelined=False, **options):
+    """
+    Opens a sink of the given format writing to path.
+    pipelined=True moves JSONL file I/O to a writer thread (PipelinedJsonlSink).
+    """
+    if format not in SINKS:
+        raise ValueError(f"Unknown output format '{format}'. Choose from: {', '.join(SINKS)}")
+    if pipelined:
+        if format != "jsonl":
+            raise ValueError("pipelined writing is only supported for the jsonl format")
+        return PipelinedJsonlSink(path, **options)
+    return SINKS[format](path, **options)
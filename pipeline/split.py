@@ -0,0 +1,131 @@
+import os
+import re
+import json
+import hashlib
+import argparse
+from arithmetic.pipeline.sinks import open_sink
+
+# -----------------------------------------------------------
+# Hash-stable train/validation/test splitting.
+# Each example is assigned by a 64-bit hash of (operation, problem), so
+# identical problems always land in the same split - across runs, seeds
+# and dataset growth - and can never leak between splits.
+# -----------------------------------------------------------
+
+DEFAULT_SPLITS = {"train": 0.98, "validation": 0.01, "test": 0.01}
+_OPERATION = re.compile(rb'"operation": "([^"]*)"')
+_PROBLEM = re.compile(rb'"problem": ("(?:[^"\\]|\\.)*")')
+
+
+def parse_splits(spec) -> dict:
+    """Parses 'train=0.98,validation=0.01,test=0.01' into a {name: fraction} dict."""
+    splits = {}
+    for part in spec.split(","):
+        name, _, fraction = part.partition("=")
+        splits[name.strip()] = float(fraction)
+    return splits
+
+
+def split_paths(path, splits) -> dict:
+    """{split: path}, e.g. data.jsonl -> data.train.jsonl, data.test.jsonl, ..."""
+    root, ext = os.path.splitext(path)
+    return {name: f"{root}.{name}{ext or '.jsonl'}" for name in splits}
+
+
+class SplitAssigner:
+    """Maps (operation, problem) to a split name by hashing into cumulative fractions."""
+
+    def __init__(self, splits=None, salt=""):
+        splits = splits or DEFAULT_SPLITS
+        total = sum(splits.values())
+        if total <= 0:
+            raise ValueError("split fractions must sum to a positive value")
+        self.salt = salt.encode("utf-8")
+        self._bounds = []  # (upper bound on the 64-bit hash, split name)
+        cumulative = 0.0
+        for name, fraction in splits.items():
+            cumulative += fraction / total
+            self._bounds.append((int(cumulative * 2 ** 64), name))
+        self._bounds[-1] = (2 ** 64, self._bounds[-1][1])  # Absorb float rounding
+
+    def assign(self, operation, problem) -> str:
+        key = self.salt + operation.encode("utf-8") + b"\x00" + problem.encode("utf-8")
+        h = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+        for bound, name in self._bounds:
+            if h < bound:
+                return name
+
+
+class SplitWriter:
+    """
+    Streams examples into one output sink per split (JSONL by default).
+    Usable inline from build_dataset() or over existing files via split_files().
+    """
+
+    def __init__(self, path, splits=None, salt="", format="jsonl", **sink_options):
+        splits = splits or DEFAULT_SPLITS
+        self.assigner = SplitAssigner(splits, salt)
+        self.counts = {name: 0 for name in splits}
+        self._sinks = {name: open_sink(p, format, **sink_options) for name, p in split_paths(path, splits).items()}
+        self.paths = {name: sink.paths[0] for name, sink in self._sinks.items()}  # Files actually written
+
+    def write(self, example):
+        """Writes an example dict to its split."""
+        name = self.assigner.assign(example["operation"], example["problem"])
+        self._sinks[name].write(example)
+        self.counts[name] += 1
+
+    def write_line(self, line, operation, problem):
+        """Writes an already-encoded JSONL line (bytes, newline-terminated) to its split. JSONL only."""
+        name = self.assigner.assign(operation, problem)
+        self._sinks[name].write_line(line)
+        self.counts[name] += 1
+
+    def close(self):
+        for sink in self._sinks.values():
+            sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _key_fields(line):
+    """(operation, problem) from a JSONL line, without a full parse when possible."""
+    op, problem = _OPERATION.search(line), _PROBLEM.search(line)
+    if op and problem:
+        return op.group(1).decode("utf-8"), json.loads(problem.group(1))
+    example = json.loads(line)
+    return example["operation"], example["problem"]
+
+
+def split_files(inputs, output, splits=None, salt="") -> dict:
+    """Splits existing JSONL files in a single streaming pass. Returns {split: count}."""
+    with SplitWriter(output, splits, salt) as writer:
+        for path in inputs:
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    if not line.endswith(b"\n"):
+                        line += b"\n"
+                    writer.write_line(line, *_key_fields(line))
+    return writer.counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hash-stable train/validation/test split of JSONL files")
+    parser.add_argument("inputs", nargs="+", help="JSONL files produced by build_dataset")
+    parser.add_argument("-o", "--output", required=True,
+                        help="Base output path; data.jsonl becomes data.train.jsonl, data.validation.jsonl, ...")
+    parser.add_argument("--splits", type=parse_splits, default=DEFAULT_SPLITS,
+                        help="Split fractions, e.g. train=0.98,validation=0.01,test=0.01")
+    parser.add_argument("--salt", default="", help="Salt mixed into the hash to draw a different stable split.")
+    args = parser.parse_args(argv)
+
+    counts = split_files(args.inputs, args.output, args.splits, args.salt)
+    for name, path in split_paths(args.output, args.splits).items():
+        print(f"✔  {counts[name]} lines → {path}")
+    return 0
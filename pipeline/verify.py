@@ -0,0 +1,341 @@
+import re
+import json
+import math
+import argparse
+import multiprocessing
+from collections import Counter
+from fractions import Fraction
+from arithmetic.step_interpreter import check_trace
+from arithmetic.pipeline.jsonl_io import chunk_ranges, open_mmap, iter_lines, DEFAULT_CHUNK_SIZE
+
+# -----------------------------------------------------------
+# Independent verifier for generated examples.
+# Every step is re-executed with the step interpreter, and final_answer
+# is compared with a reference answer re-derived from the problem text.
+# Runs either in background worker processes during build_dataset()
+# or as the standalone `verify` command over existing JSONL files.
+# -----------------------------------------------------------
+
+_STRICT_NUM = re.compile(r"-?\d+(?:\.\d+)?(?:/\d+)?")  # No exponent notation like '1E+1'
+_REPEATING = re.compile(r"(-?)(\d+)\.(\d*)\((\d+)\)")  # 0.1(6) = 1/6
+_TERM = re.compile(r"([+-]?)(\d*)(x\^2|x|y)?")
+
+
+def _strict_num(s):
+    m = _REPEATING.fullmatch(s)
+    if m:
+        sign, whole, pre, rep = m.groups()
+        value = int(whole) + Fraction(int(pre + rep) - int(pre or 0), 10 ** len(pre) * (10 ** len(rep) - 1))
+        return -value if sign else value
+    if not _STRICT_NUM.fullmatch(s):
+        raise ValueError(f"not a plain number: {s}")
+    return Fraction(s)
+
+
+def _terms(expr):
+    """Parses a sum of terms like '2x^2-x+3' into {symbol: coeff} ('' for constants)."""
+    expr = expr.replace(" ", "")
+    coeffs = Counter()
+    pos = 0
+    while pos < len(expr):
+        m = _TERM.match(expr, pos)
+        sign, digits, symbol = m.groups()
+        if not digits and not symbol:
+            raise ValueError(f"bad term in {expr}")
+        coeff = int(digits) if digits else 1
+        coeffs[symbol or ""] += -coeff if sign == "-" else coeff
+        pos = m.end()
+    return {k: v for k, v in coeffs.items() if v}
+
+
+# ---------- Reference solvers (problem text -> expected answer) ----------
+
+def _solve_binary(problem):
+    a, op, b = problem.split(" ")
+    a, b = Fraction(a), Fraction(b)
+    return {"+": a + b, "-": a - b, "*": a * b, "/": a / b}[op]
+
+
+def _solve_sum(problem):
+    return sum(map(int, problem.split(" + ")))
+
+
+def _solve_long_division(problem):
+    a, b = map(int, problem.split(" / "))
+    q, r = divmod(a, b)
+    return f"{q} R{r}" if r else str(q)
+
+
+def _solve_fraction(problem):
+    """'a/b op c/d op ...' left to right; 'w n/d' is a mixed number."""
+    tokens = problem.split(" ")
+    values, ops = [], []
+    for token in tokens:
+        if token in ("+", "-", "*", "/"):
+            ops.append(token)
+        elif len(values) > len(ops):  # Fraction part of a mixed number
+            values[-1] += Fraction(token)
+        else:
+            values.append(Fraction(token))
+    result = values[0]
+    for op, value in zip(ops, values[1:]):
+        result = {"+": result + value, "-": result - value, "*": result * value, "/": result / value}[op]
+    return str(result)
+
+
+def _solve_linear_eq(problem):
+    lhs, rhs = problem.split(" ", 1)[1].split(" = ")
+    lhs, rhs = _terms(lhs), _terms(rhs)
+    coeff = lhs.get("x", 0) - rhs.get("x", 0)
+    return f"x={Fraction(rhs.get('', 0) - lhs.get('', 0), coeff)}"
+
+
+def _solve_quadratic(problem):
+    t = _terms(problem[len("Solve "):].split(" = ")[0])
+    a, b, c = t.get("x^2", 0), t.get("x", 0), t.get("", 0)
+    disc = b * b - 4 * a * c
+    root = math.isqrt(disc)
+    if root * root != disc:
+        return None
+    r1, r2 = Fraction(-b + root, 2 * a), Fraction(-b - root, 2 * a)
+    return f"x={max(r1, r2)}, x={min(r1, r2)}"
+
+
+def _solve_simplify(problem):
+    m = re.fullmatch(r"(-?\d*)\(([^)]*)\)(.*)", problem[len("Simplify: "):])
+    factor = {"": 1, "-": -1}.get(m.group(1)) or int(m.group(1))
+    result = Counter({k: factor * v for k, v in _terms(m.group(2)).items()})
+    if m.group(3):
+        result.update(_terms(m.group(3)))
+    return {k: v for k, v in result.items() if v}
+
+
+def _solve_evaluate(problem):
+    m = re.fullmatch(r"Evaluate (.*) for x=(-?\d+), y=(-?\d+)", problem)
+    values = {"": 1, "x": int(m.group(2)), "y": int(m.group(3))}
+    return sum(coeff * values[sym] for sym, coeff in _terms(m.group(1)).items())
+
+
+def _solve_proportion(problem):
+    m = re.fullmatch(r"If (\d+) is to (\d+), what is (\d+) proportional to\?", problem)
+    if m:
+        a, b, c = map(int, m.groups())
+        return Fraction(b * c, a)
+    m = re.fullmatch(r"If (\d+) is to (\d+), what is proportional to (\d+)\?", problem)
+    a, b, c = map(int, m.groups())
+    return Fraction(a * c, b)
+
+
+def _solve_pythag(problem):
+    a, b = map(int, re.fullmatch(r"Find hypotenuse: legs (\d+) and (\d+)", problem).groups())
+    c = math.isqrt(a * a + b * b)
+    return c if c * c == a * a + b * b else None
+
+
+def _solve_percent_part(problem):
+    p, w = re.fullmatch(r"What is (\d+)% of (\d+)\?", problem).groups()
+    return Fraction(int(p) * int(w), 100)
+
+
+def _solve_percent_percent(problem):
+    p, w = re.fullmatch(r"(\d+) is what percent of (\d+)\?", problem).groups()
+    return Fraction(int(p) * 100, int(w))
+
+
+def _solve_percent_whole(problem):
+    p, q = re.fullmatch(r"(\d+) is (\d+)% of what number\?", problem).groups()
+    return Fraction(int(p) * 100, int(q))
+
+
+def _same_str(answer, expected):
+    return answer == expected
+
+
+def _same_num(answer, expected):
+    return _strict_num(answer) == expected
+
+
+def _same_percent(answer, expected):
+    return answer.endswith("%") and _strict_num(answer[:-1]) == expected
+
+
+def _same_terms(answer, expected):
+    return _terms(answer) == expected
+
+
+# operation -> (reference solver, answer comparison)
+_ANSWER_CHECKS = {
+    "long_division": (_solve_long_division, _same_str),
+    "decimal_mul": (_solve_binary, _same_num),
+    "decimal_add": (_solve_binary, _same_num),
+    "decimal_sub": (_solve_binary, _same_num),
+    "decimal_div": (_solve_binary, _same_num),
+    "fraction_add": (_solve_fraction, _same_str),
+    "fraction_sub": (_solve_fraction, _same_str),
+    "fraction_mul": (_solve_fraction, _same_str),
+    "fraction_div": (_solve_fraction, _same_str),
+    "fraction_add_sub": (_solve_fraction, _same_str),
+    "linear_eq_simple": (_solve_linear_eq, _same_str),
+    "linear_eq_complex": (_solve_linear_eq, _same_str),
+    "quadratic_eq": (_solve_quadratic, _same_str),
+    "simplify_expression": (_solve_simplify, _same_terms),
+    "evaluate_expression": (_solve_evaluate, _same_num),
+    "proportional_relationship": (_solve_proportion, _same_num),
+    "pythag_hyp": (_solve_pythag, _same_num),
+    "abacus_addition": (_solve_sum, _same_num),
+    "percent_find_part": (_solve_percent_part, _same_num),
+    "percent_find_percent": (_solve_percent_percent, _same_percent),
+    "percent_find_whole": (_solve_percent_whole, _same_num),
+}
+
+
+def check_answer(example):
+    """
+    Compares final_answer with an answer re-derived from the problem text.
+    Returns True/False, or None if the operation has no reference solver.
+    """
+    checks = _ANSWER_CHECKS.get(example["operation"])
+    if checks is None:
+        return None
+    solver, same = checks
+    try:
+        expected = solver(example["problem"])
+        return expected is not None and same(example["final_answer"], expected)
+    except (ValueError, TypeError, AttributeError, ZeroDivisionError, KeyError):
+        return False
+
+
+def verify_example(example, stats=None) -> dict:
+    """
+    Verifies one example and tallies it into stats.
+
+    Returns:
+        dict: {operation: Counter} with 'examples', 'step_errors',
+              'answer_mismatches' and 'unchecked_answers' counts.
+    """
+    stats = {} if stats is None else stats
+    op = example.get("operation", "<unknown>")
+    counts = stats.setdefault(op, Counter())
+    counts["examples"] += 1
+    try:
+        trace = check_trace(example["steps"], example["final_answer"])
+        steps_ok = trace["first_error"] is None and trace["complete"]
+    except (KeyError, TypeError, AttributeError):
+        steps_ok = False
+    if not steps_ok:
+        counts["step_errors"] += 1
+    answer_ok = check_answer(example) if "final_answer" in example else False
+    if answer_ok is None:
+        counts["unchecked_answers"] += 1
+    elif not answer_ok:
+        counts["answer_mismatches"] += 1
+    return stats
+
+
+def verify_examples(examples) -> dict:
+    """Verifies a batch of example dicts. Returns per-operation counts."""
+    stats = {}
+    for example in examples:
+        verify_example(example, stats)
+    return stats
+
+
+def merge_stats(total, stats):
+    """Adds per-operation counts from stats into total (in place) and returns total."""
+    for op, counts in stats.items():
+        total.setdefault(op, Counter()).update(counts)
+    return total
+
+
+def _verify_chunk(task):
+    """Worker: verifies every line starting in one byte range of a JSONL file."""
+    path, start, end = task
+    stats = {}
+    mm = open_mmap(path)
+    if mm is None:
+        return stats
+    with mm:
+        for _, line in iter_lines(mm, start, end):
+            try:
+                example = json.loads(line)
+            except ValueError:
+                stats.setdefault("<invalid_json>", Counter())["examples"] += 1
+                continue
+            verify_example(example, stats)
+    return stats
+
+
+def verify_files(paths, processes=None, chunk_size=DEFAULT_CHUNK_SIZE) -> dict:
+    """Verifies JSONL files in memory-mapped chunks across processes (default: all cores)."""
+    tasks = [task for path in paths for task in chunk_ranges(path, chunk_size)]
+    total = {}
+    if processes == 1 or len(tasks) <= 1:
+        for task in tasks:
+            merge_stats(total, _verify_chunk(task))
+        return total
+    with multiprocessing.Pool(processes) as pool:
+        for stats in pool.imap_unordered(_verify_chunk, tasks):
+            merge_stats(total, stats)
+    return total
+
+
+class BackgroundVerifier:
+    """
+    Verifies examples in worker processes while generation continues.
+    Examples are buffered and shipped to the pool in batches; call close()
+    to wait for outstanding batches and collect the merged counts.
+    """
+
+    def __init__(self, processes=None, batch_size=1000):
+        self.batch_size = batch_size
+        self._pool = multiprocessing.Pool(processes)
+        self._buffer = []
+        self._pending = []
+
+    def add(self, example):
+        self._buffer.append(example)
+        if len(self._buffer) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._pending.append(self._pool.apply_async(verify_examples, (self._buffer,)))
+            self._buffer = []
+
+    def close(self) -> dict:
+        self._flush()
+        self._pool.close()
+        total = {}
+        for result in self._pending:
+            merge_stats(total, result.get())
+        self._pool.join()
+        return total
+
+
+def format_report(stats) -> str:
+    """Formats per-operation mismatch rates as a table."""
+    lines = [f"{'operation':<28}{'examples':>10}{'step_err%':>11}{'answer_err%':>13}"]
+    for op in sorted(stats):
+        c = stats[op]
+        n = c["examples"] or 1
+        lines.append(f"{op:<28}{c['examples']:>10}{100 * c['step_errors'] / n:>11.2f}"
+                     f"{100 * c['answer_mismatches'] / n:>13.2f}")
+    return "\n".join(lines)
+
+
+def has_mismatches(stats) -> bool:
+    return any(c["step_errors"] or c["answer_mismatches"] for c in stats.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify steps and answers of generated JSONL files")
+    parser.add_argument("paths", nargs="+", help="JSONL files produced by build_dataset")
+    parser.add_argument("-j", "--processes", type=int, default=None,
+                        help="Worker processes (default: all cores).")
+    parser.add_argument("--chunk-mb", type=int, default=DEFAULT_CHUNK_SIZE // (1024 * 1024),
+                        help="Size of the memory-mapped chunk handed to each worker task.")
+    args = parser.parse_args(argv)
+
+    stats = verify_files(args.paths, processes=args.processes, chunk_size=args.chunk_mb * 1024 * 1024)
+    print(format_report(stats))
+    return 1 if has_mismatches(stats) else 0
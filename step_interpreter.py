@@ -0,0 +1,584 @@
+import re
+from fractions import Fraction
+from math import gcd, log10
+from arithmetic.helpers import DELIM
+from arithmetic.generators.sieve import is_prime, MR_LIMIT
+
+# -----------------------------------------------------------
+# Step interpreter: re-executes pipe-delimited step traces
+# (see the op-code legend in dolphin_math_datagen.py) and reports
+# which steps are arithmetically valid. Used for partial-credit RL
+# rewards on model-emitted traces.
+#
+# Every checker runs in O(1) amortized time on a small per-trace state,
+# so checking a trace is linear in its length.
+# -----------------------------------------------------------
+
+_ADD_DETAILS = re.compile(r"(\d+)\+(\d+)\+(\d+)$")
+_ADD_RESULT = re.compile(r"->(\d+) \(carry (\d+)\)$")
+_SUB_DETAILS = re.compile(r"(\d+)-(\d+) \(borrow_in (\d+)\)$")
+_SUB_RESULT = re.compile(r"->(\d+) \(borrow_out (\d+)\)$")
+_LINEAR_TERM = re.compile(r"[+-]?[^+-]+")
+_DECIMAL = re.compile(r"([+-]?)(\d*)(?:\.(\d*))?$", re.ASCII)
+
+
+def _num(s):
+    """Parses an integer, decimal or 'n/d' string. Raises ValueError if not numeric."""
+    try:
+        return int(s)
+    except ValueError:
+        return Fraction(s)
+
+
+def _pct(s):
+    """Parses a percent string like '25%' into its numeric value (25)."""
+    if not s.endswith("%"):
+        raise ValueError(f"not a percent: {s}")
+    return _num(s[:-1])
+
+
+def _ratio(s):
+    """Parses 'a/b' where a and b may be decimals (e.g. '7.5/1.5')."""
+    a, sep, b = s.partition("/")
+    if not sep:
+        raise ValueError(f"not a ratio: {s}")
+    return _num(a), _num(b)
+
+
+def _solution(s):
+    """Parses 'x=value' (or a bare value) into a number."""
+    return _num(s[2:] if s.startswith("x=") else s)
+
+
+def _decimal_digits(s):
+    """
+    Parses a decimal string into (negative, digits, exponent) with no leading
+    or trailing zeros in digits, so equal values give equal tuples and a shift
+    by a power of ten only changes the exponent. Zero is (False, '', 0).
+    """
+    m = _DECIMAL.match(s)
+    if m is None or not (m[2] or m[3]):
+        raise ValueError(f"not a decimal: {s}")
+    frac = m[3] or ""
+    digits = (m[2] + frac).lstrip("0")
+    stripped = digits.rstrip("0")
+    if not stripped:
+        return False, "", 0
+    return m[1] == "-", stripped, len(digits) - len(stripped) - len(frac)
+
+
+def _shifted(s, k):
+    """_decimal_digits(s) times 10 ** k, without building the power."""
+    negative, digits, exp = _decimal_digits(s)
+    return (negative, digits, exp + k) if digits else (False, "", 0)
+
+
+def _linear(expr):
+    """Parses a linear expression like '6x-4' into (x_coeff, const)."""
+    expr = expr.replace(" ", "")
+    terms = _LINEAR_TERM.findall(expr)
+    if not terms or "".join(terms) != expr:
+        raise ValueError(f"not a linear expression: {expr}")
+    coeff, const = 0, 0
+    for term in terms:
+        if term.endswith("x"):
+            c = term[:-1]
+            coeff += 1 if c in ("", "+") else -1 if c == "-" else _num(c)
+        else:
+            const += _num(term)
+    return coeff, const
+
+
+class _TraceState:
+    """Running state carried between steps of a single trace."""
+    __slots__ = ("prev", "chain", "rem", "cur",
+                 "cols1", "cols2", "col", "carry", "borrow",
+                 "mul_top", "mul_digits", "mul_partials", "ab_rods", "ab_col", "ab_carry", "euc", "subst")
+
+    def __init__(self):
+        self.prev = None          # op-code of the previous step
+        self.chain = None         # pending D -> M -> S chain
+        self.rem = None           # running long-division remainder
+        self.cur = None           # number produced by the last B step
+        self.cols1 = self.cols2 = None  # aligned digits from DEC_ALIGN
+        self.col = -1
+        self.carry = 0
+        self.borrow = 0
+        self.mul_top = None
+        self.mul_digits = None
+        self.mul_partials = []
+        self.ab_rods = None       # abacus rod digits, least significant first
+        self.ab_col = -1
+        self.ab_carry = 0
+        self.euc = None           # (divisor, remainder) of the last EUC step
+        self.subst = None         # expression produced by the last SUBST step
+
+
+# ---------- Arithmetic ----------
+
+def _check_d(a, st):
+    n, d, q = _num(a[0]), _num(a[1]), _solution(a[2])
+    if st.prev == "B" and n != st.cur:
+        return False
+    # Exact quotient (equations, proportions) or a long-division quotient digit
+    ok = q == Fraction(n) / d or (n >= 0 and d > 0 and q == n // d)
+    st.chain = ("D", n, d, q)
+    if q == 0:
+        st.rem = n
+    return ok
+
+
+def _check_m(a, st):
+    chain, st.chain = st.chain, None
+    if len(a) == 2:  # cross-multiplication: M|ax|b*c=p
+        lhs, _, rhs = a[1].partition("=")
+        x, _, y = lhs.partition("*")
+        return _num(x) * _num(y) == _num(rhs)
+    x, y, p = _num(a[0]), _num(a[1]), _num(a[2])
+    if chain is not None and chain[0] == "D":
+        if (x, y) != (chain[3], chain[2]):
+            return False
+        st.chain = ("M", chain[1], p)
+    return x * y == p
+
+
+def _check_s(a, st):
+    x, y, r = _num(a[0]), _num(a[1]), _num(a[2])
+    chain = st.chain
+    if chain is not None and chain[0] == "M" and (x, y) != (chain[1], chain[2]):
+        return False
+    st.rem = r
+    return x - y == r
+
+
+def _check_a(a, st):
+    return _num(a[0]) + _num(a[1]) == _num(a[2])
+
+
+def _check_b(a, st):
+    r, digit, n = int(a[0]), int(a[1]), int(a[2])
+    ok = 0 <= digit <= 9 and n == r * 10 + digit
+    if st.rem is not None and r != st.rem:
+        ok = False
+    st.rem = st.cur = n
+    return ok
+
+
+def _check_r(a, st):
+    r = int(a[0])
+    return r >= 0 and (st.rem is None or r == st.rem)
+
+
+def _check_l(a, st):
+    d1, d2, lcd = int(a[0]), int(a[1]), int(a[2])
+    return d1 > 0 and d2 > 0 and lcd == d1 * d2 // gcd(d1, d2)
+
+
+def _check_c(a, st):
+    lcd = int(a[1])
+    num, sep, den = a[2].partition("/")
+    return sep == "/" and int(den) == lcd and Fraction(a[0]) == Fraction(int(num), lcd)
+
+
+def _check_i(a, st):
+    return Fraction(a[0]) * Fraction(a[1]) == 1
+
+
+def _check_mix(a, st):
+    whole, sep, frac = a[0].partition(" ")
+    num, _, den = frac.partition("/")
+    ok = sep == " " and int(whole) > 0 and 0 < int(num) < int(den)
+    return ok and "/" in a[1] and int(whole) + Fraction(frac) == Fraction(a[1])
+
+
+def _check_f(a, st):
+    num, sep, den = a[1].partition("/")
+    if sep and (int(den) <= 1 or gcd(int(num), int(den)) != 1):
+        return False  # result must be in lowest terms
+    return Fraction(a[0]) == Fraction(a[1])
+
+
+def _check_euc(a, st):
+    n, d, q, r = int(a[0]), int(a[1]), int(a[2]), int(a[3])
+    # Each Euclid step divides the previous divisor by the previous remainder
+    if st.prev == "EUC" and (n, d) != st.euc:
+        return False
+    st.euc = (d, r)
+    return d > 0 and 0 <= r < d and n == q * d + r
+
+
+def _check_g(a, st):
+    x, y, g = int(a[0]), int(a[1]), int(a[2])
+    if st.prev == "EUC" and st.euc != (g, 0):
+        return False  # the GCD is the last divisor, once the remainder is 0
+    return g == gcd(x, y)
+
+
+def _check_pf(a, st):
+    n, product, last = int(a[0]), 1, 1
+    if a[1] == "1":
+        return n == 1
+    for factor in a[1].split("*"):
+        base, sep, exp = factor.partition("^")
+        p, e = int(base), int(exp) if sep else 1
+        if p <= last or e < 1 or (sep and e == 1):
+            return False  # distinct primes in ascending order, ^1 left out
+        # Bounded before any power or primality test: p ** e must divide n
+        if p > n or e > n.bit_length() or p >= MR_LIMIT:
+            return False
+        product *= p ** e
+        if product > n or not is_prime(p):
+            return False
+        last = p
+    return product == n
+
+
+# ---------- Decimal Add/Sub ----------
+
+def _check_dec_align(a, st):
+    s1, s2 = a[0], a[1]
+    ok = len(s1) == len(s2) and s1.find(".") == s2.find(".")
+    st.cols1, st.cols2 = s1.replace(".", ""), s2.replace(".", "")
+    st.col = len(st.cols1) - 1
+    st.carry = st.borrow = 0
+    return ok and st.cols1.isdigit() and st.cols2.isdigit()
+
+
+def _column_digits(st, d1, d2):
+    """Checks d1/d2 against the next aligned column (right to left) and advances."""
+    ok = True
+    if st.cols1 is not None:
+        ok = st.col >= 0 and d1 == int(st.cols1[st.col]) and d2 == int(st.cols2[st.col])
+        st.col -= 1
+    return ok
+
+
+def _check_dec_add_col(a, st):
+    d1, d2, c = map(int, _ADD_DETAILS.match(a[1]).groups())
+    r, k = map(int, _ADD_RESULT.match(a[2]).groups())
+    ok = _column_digits(st, d1, d2) and c == st.carry
+    st.carry = k
+    return ok and r <= 9 and d1 + d2 + c == r + 10 * k
+
+
+def _check_dec_sub_col(a, st):
+    d1, d2, b = map(int, _SUB_DETAILS.match(a[1]).groups())
+    r, k = map(int, _SUB_RESULT.match(a[2]).groups())
+    ok = _column_digits(st, d1, d2) and b == st.borrow
+    st.borrow = k
+    return ok and r <= 9 and k == (d1 - b < d2) and d1 - b - d2 + 10 * k == r
+
+
+def _check_dec_carry_final(a, st):
+    return int(a[0]) == st.carry > 0
+
+
+# ---------- Decimal Multiplication ----------
+
+def _check_mul_setup(a, st):
+    st.mul_top = int(a[0])
+    st.mul_digits = [int(ch) for ch in reversed(a[1])]
+    st.mul_partials = []
+    return a[0].isdigit() and a[1].isdigit()
+
+
+def _check_mul_partial(a, st):
+    digit, top, shifted = int(a[0]), int(a[1]), int(a[2])
+    shift = len(st.mul_partials)
+    st.mul_partials.append(shifted)
+    if st.mul_digits is not None:
+        if shift >= len(st.mul_digits) or digit != st.mul_digits[shift] or top != st.mul_top:
+            return False
+        return shifted == digit * top * 10 ** shift
+    # No MUL_SETUP seen: accept any power-of-ten shift of the partial product
+    prod = digit * top
+    if prod == 0:
+        return shifted == 0
+    q, r = divmod(shifted, prod)
+    return r == 0 and str(q).rstrip("0") == "1"
+
+
+def _check_add_partials(a, st):
+    terms = [int(t) for t in a[0].split("+")]
+    if st.mul_partials and terms != st.mul_partials:
+        return False
+    return sum(terms) == int(a[1])
+
+
+def _check_count_dp(a, st):
+    return int(a[0]) + int(a[1]) == int(a[2])
+
+
+def _check_place_dp(a, st):
+    dp, product = int(a[1]), _decimal_digits(a[0])
+    # Unless the product is 0, a point placed beyond every written digit cannot match
+    if dp < 0 or (dp > len(a[0]) + len(a[2]) and product[1]) or "." in a[0]:
+        return False
+    return _decimal_digits(a[2]) == _shifted(a[0], -dp)
+
+
+# ---------- Decimal Division ----------
+
+def _check_dec_shift(a, st):
+    (x, _, y), (x2, _, y2), k = a[0].partition("/"), a[1].partition("/"), int(a[2])
+    divisor = _decimal_digits(y2)
+    if k < 0 or (k > len(a[0]) + len(a[1]) and _decimal_digits(x)[1]):
+        return False
+    return (_decimal_digits(x2) == _shifted(x, k) and divisor == _shifted(y, k)
+            and divisor[2] >= 0 and bool(divisor[1]))
+
+
+def _check_div_setup(a, st):
+    st.rem = st.cur = None
+    return a[0].isdigit() and int(a[1]) > 0
+
+
+def _check_place_dp_q(a, st):
+    return a[0].isdigit() and int(a[1]) >= 0
+
+
+def _check_repeat(a, st):
+    r = int(a[0])
+    return a[1].isdigit() and r > 0 and (st.rem is None or r == st.rem)
+
+
+# ---------- Percentages ----------
+
+def _check_percent_to_dec(a, st):
+    return Fraction(_pct(a[0])) / 100 == _num(a[1])
+
+
+def _check_percent_calc_part(a, st):
+    return _num(a[0]) * _num(a[1]) == _num(a[2])
+
+
+def _check_dec_to_percent(a, st):
+    return _num(a[0]) * 100 == _pct(a[1])
+
+
+# ---------- Algebra / Geometry ----------
+
+def _check_disc(a, st):
+    return _num(a[0]) - _num(a[1]) == _num(a[2])
+
+
+def _check_root(a, st):
+    r = _num(a[1])
+    return r >= 0 and r * r == _num(a[0])
+
+
+def _check_q(sign):
+    def check(a, st):
+        neg_b, sqrt_disc, two_a = _num(a[0]), _num(a[1]), _num(a[2])
+        return Fraction(neg_b + sign * sqrt_disc) / two_a == _num(a[3])
+    return check
+
+
+def _check_e(a, st):
+    base, exponent = Fraction(_num(a[0])), int(a[1])
+    size = max(abs(base.numerator), base.denominator)
+    # Refuse powers with far more digits than the stated result before computing them
+    if exponent < 0 or (size > 1 and exponent * log10(size) > len(a[2]) + 1):
+        return False
+    return base ** exponent == _num(a[2])
+
+
+def _check_dist(a, st):
+    factor = _num(a[0])
+    coeff, const = _linear(a[1])
+    return _linear(a[2]) == (factor * coeff, factor * const)
+
+
+def _check_comb_x(a, st):
+    (c1, k1), (c2, k2) = _linear(a[0]), _linear(a[1])
+    return _linear(a[2]) == (c1 + c2, k1 + k2)
+
+
+def _check_comb_const(a, st):
+    return _num(a[0]) + _num(a[1]) == _num(a[2])
+
+
+def _check_div_coeff(a, st):
+    return Fraction(_num(a[0])) / _num(a[1]) == _solution(a[2])
+
+
+def _check_subst(a, st):
+    var, value, expr = a[0], a[1], a[2]
+    _num(value)
+    ok = var.isalpha() and f"({value})" in expr and var not in expr
+    # Later substitutions rewrite the previous one's expression
+    if st.subst is not None and expr != st.subst.replace(var, f"({value})"):
+        ok = False
+    st.subst = expr
+    return ok
+
+
+# ---------- Abacus ----------
+
+def _check_ab_set(a, st):
+    if not a[0].isdigit():
+        return False
+    st.ab_rods = bytearray(ord(d) - 48 for d in reversed(a[0]))
+    st.ab_col = -1
+    st.ab_carry = 0
+    return True
+
+
+def _check_ab_add_dgt(a, st):
+    col = a[0]
+    if not col.startswith("col_"):
+        return False
+    k = int(col[4:])
+    d1, d2, c = map(int, _ADD_DETAILS.match(a[1]).groups())
+    total = int(a[2])
+    ok = c == st.ab_carry and total == d1 + d2 + c and d2 < 10
+    rods = st.ab_rods
+    if rods is not None:
+        # Each column must read the rod the previous addends left behind
+        if k >= len(rods):
+            rods.extend(bytes(k + 1 - len(rods)))
+        ok = ok and d1 == rods[k]
+        rods[k] = total % 10
+    st.ab_col = k
+    st.ab_carry = total // 10
+    return ok
+
+
+def _check_ab_carry(a, st):
+    return int(a[1]) == st.ab_carry > 0
+
+
+def _check_ab_carry_final(a, st):
+    ok = int(a[0]) == st.ab_carry > 0
+    if ok and st.ab_rods is not None:
+        if st.ab_col + 1 >= len(st.ab_rods):
+            st.ab_rods.extend(bytes(st.ab_col + 2 - len(st.ab_rods)))
+        st.ab_rods[st.ab_col + 1] = st.ab_carry
+    st.ab_carry = 0  # The next addend starts without a carry
+    return ok
+
+
+def _well_formed(a, st):
+    """Descriptive steps (rewrites, setup text) carry no checkable arithmetic."""
+    return True
+
+
+# op-code -> (allowed arg counts, checker)
+_OPS = {
+    "D": ((3,), _check_d),
+    "M": ((2, 3), _check_m),
+    "S": ((3,), _check_s),
+    "A": ((3,), _check_a),
+    "B": ((3,), _check_b),
+    "R": ((1,), _check_r),
+    "C": ((3,), _check_c),
+    "L": ((3,), _check_l),
+    "I": ((2,), _check_i),
+    "F": ((2,), _check_f),
+    "MIX": ((2,), _check_mix),
+    "EUC": ((4,), _check_euc),
+    "PF": ((2,), _check_pf),
+    "PDEC": ((1, 2, 3), _well_formed),
+    "DEC_ALIGN": ((2,), _check_dec_align),
+    "DEC_ADD_COL": ((3,), _check_dec_add_col),
+    "DEC_SUB_COL": ((3,), _check_dec_sub_col),
+    "DEC_CARRY_FINAL": ((1,), _check_dec_carry_final),
+    "MUL_SETUP": ((2,), _check_mul_setup),
+    "MUL_PARTIAL": ((3,), _check_mul_partial),
+    "ADD_PARTIALS": ((2,), _check_add_partials),
+    "COUNT_DP": ((3,), _check_count_dp),
+    "PLACE_DP": ((3,), _check_place_dp),
+    "DEC_SHIFT": ((3,), _check_dec_shift),
+    "DIV_SETUP": ((2,), _check_div_setup),
+    "PLACE_DP_Q": ((2,), _check_place_dp_q),
+    "REPEAT": ((2,), _check_repeat),
+    "PERCENT_TO_DEC": ((2,), _check_percent_to_dec),
+    "SETUP_PERCENT_EQ": ((1,), _well_formed),
+    "REARRANGE_EQ": ((1,), _well_formed),
+    "PERCENT_CALC_PART": ((3,), _check_percent_calc_part),
+    "DEC_TO_PERCENT": ((2,), _check_dec_to_percent),
+    "G": ((3,), _check_g),
+    "DISC": ((3,), _check_disc),
+    "ROOT": ((2,), _check_root),
+    "Q1": ((4,), _check_q(1)),
+    "Q2": ((4,), _check_q(-1)),
+    "DIST": ((3,), _check_dist),
+    "REWRITE": ((1,), _well_formed),
+    "COMB_X": ((3,), _check_comb_x),
+    "COMB_CONST": ((3,), _check_comb_const),
+    "SUBST": ((3,), _check_subst),
+    "MOVE_TERM": ((3,), _well_formed),
+    "DIV_COEFF": ((3,), _check_div_coeff),
+    "E": ((3,), _check_e),
+    "PROP_SETUP": ((1,), _well_formed),
+    "AB_SET": ((1,), _check_ab_set),
+    "AB_INFO": ((1,), _well_formed),
+    "AB_ADD_DGT": ((3,), _check_ab_add_dgt),
+    "AB_CARRY": ((3,), _check_ab_carry),
+    "AB_CARRY_FINAL": ((1,), _check_ab_carry_final),
+}
+
+# Every op-code of the legend, Z included
+OP_CODES = tuple(_OPS) + ("Z",)
+
+# Ops that continue a D -> M -> S chain; any other op breaks it
+_CHAIN_OPS = ("D", "M")
+
+
+def check_trace(steps, final_answer=None) -> dict:
+    """
+    Checks every step of a trace for arithmetic validity.
+
+    Args:
+        steps: list of step strings, or a single newline-separated string
+               as emitted by a model.
+        final_answer: optional reference answer; when given, the Z step
+               must match it exactly.
+
+    Returns:
+        dict: A dictionary containing:
+            - 'valid': list[bool], one entry per step
+            - 'first_error': int index of the first invalid step, or None
+            - 'complete': bool, True if the trace ends with a Z step
+            - 'score': float, fraction of valid steps (partial credit)
+    """
+    if isinstance(steps, str):
+        steps = steps.splitlines()
+    st = _TraceState()
+    valid = []
+    op = None
+    for raw in steps:
+        op, *args = raw.strip().split(DELIM)
+        if op == "Z":
+            ok = len(args) == 1 and (final_answer is None or args[0].strip() == str(final_answer).strip())
+        else:
+            spec = _OPS.get(op)
+            if spec is None or len(args) not in spec[0]:
+                ok = False
+            else:
+                try:
+                    ok = bool(spec[1](args, st))
+                except (ValueError, TypeError, ZeroDivisionError, AttributeError, IndexError):
+                    ok = False  # Malformed arguments
+        if op not in _CHAIN_OPS:
+            st.chain = None
+        st.prev = op
+        valid.append(ok)
+
+    first_error = next((i for i, ok in enumerate(valid) if not ok), None)
+    return dict(
+        valid=valid,
+        first_error=first_error,
+        complete=op == "Z",
+        score=sum(valid) / len(valid) if valid else 0.0,
+    )
+
+
+def check_traces(traces, final_answers=None) -> list:
+    """
+    Batch version of check_trace(); final_answers, if given, pairs with traces.
+    Raises ValueError if the two differ in length.
+    """
+    if final_answers is None:
+        return [check_trace(t) for t in traces]
+    return [check_trace(t, ans) for t, ans in zip(traces, final_answers, strict=True)]
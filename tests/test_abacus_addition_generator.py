@@ -10,8 +10,11 @@ grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
 if grandparent_dir not in sys.path:
     sys.path.insert(0, grandparent_dir)
 
-from arithmetic.generators.abacus_addition_generator import AbacusAdditionGenerator
+from arithmetic.generators.abacus_addition_generator import (
+    AbacusAdditionGenerator, abacus_steps, abacus_batch_steps, np)
 from arithmetic.helpers import DELIM
+from arithmetic.step_interpreter import check_trace
+from arithmetic.pipeline.verify import check_answer
 
 class TestAbacusAdditionGenerator(unittest.TestCase):
 
@@ -73,6 +76,64 @@ class TestAbacusAdditionGenerator(unittest.TestCase):
             self.assertTrue(has_set_step, "Missing AB_SET step")
             self.assertTrue(has_add_dgt_step, "Missing AB_ADD_DGT step")
 
+    def test_multi_operand_trace(self):
+        """Each addend is added onto the rods the previous ones left."""
+        steps = list(abacus_steps(["95", "7", "8"]))
+        self.assertEqual(steps, [
+            "AB_SET|95",
+            "AB_INFO|Adding 7 column by column",
+            "AB_ADD_DGT|col_0|5+7+0|12", "AB_CARRY|col_0|1|col_1",
+            "AB_ADD_DGT|col_1|9+0+1|10", "AB_CARRY|col_1|1|col_2",
+            "AB_CARRY_FINAL|1",
+            "AB_INFO|Adding 8 column by column",
+            "AB_ADD_DGT|col_0|2+8+0|10", "AB_CARRY|col_0|1|col_1",
+            "AB_ADD_DGT|col_1|0+0+1|1",
+            "AB_ADD_DGT|col_2|1+0+0|1",
+            "Z|110",
+        ])
+        self.assertIsNone(check_trace(steps, "110")["first_error"])
+        # Reading the first addend's digit instead of the current rod is an error
+        steps[8] = "AB_ADD_DGT|col_0|5+8+0|13"
+        self.assertEqual(check_trace(steps)["first_error"], 8)
+
+    def test_many_long_addends(self):
+        random.seed(7)
+        generator = AbacusAdditionGenerator(operands=6, digits=(1, 40))
+        for _ in range(20):
+            result = generator.generate()
+            addends = result["problem"].split(" + ")
+            self.assertEqual(len(addends), 6)
+            self.assertEqual(int(result["final_answer"]), sum(map(int, addends)))
+            self.assertTrue(all(check_trace(result["steps"], result["final_answer"])["valid"]))
+            self.assertTrue(check_answer(result))
+        with self.assertRaises(ValueError):
+            AbacusAdditionGenerator(operands=1)
+
+    def test_batch_matches_scalar(self):
+        problems = [["9" * 30, "1"], ["12", "34", "56"], ["99"] * 11, [str(n) for n in range(10, 60)]]
+        self.assertEqual(abacus_batch_steps(problems), [list(abacus_steps(p)) for p in problems])
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_numpy_batch_parity(self):
+        generator = AbacusAdditionGenerator(operands=4, digits=(1, 15))
+        random.seed(3)
+        batch = generator.generate_batch(200)
+        random.seed(3)
+        single = [generator.generate() for _ in range(200)]
+        for a, b in zip(batch, single):
+            self.assertEqual((a["problem"], a["steps"], a["final_answer"]),
+                             (b["problem"], b["steps"], b["final_answer"]))
+
+    def test_carry_profile(self):
+        random.seed(14)
+        for carries in (0, 2, 4):
+            generator = AbacusAdditionGenerator(carries=carries)
+            for _ in range(30):
+                steps = generator.generate()["steps"]
+                self.assertEqual(sum(s.startswith(f"AB_CARRY{DELIM}") for s in steps), carries)
+        with self.assertRaises(ValueError):
+            AbacusAdditionGenerator(operands=3, carries=1)
+
 
 if __name__ == '__main__':
     unittest.main()
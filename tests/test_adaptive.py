@@ -0,0 +1,108 @@
+import unittest
+import sys
+import os
+import json
+import asyncio
+from collections import Counter
+from itertools import islice
+
+# Add parent directory to path to allow importing 'arithmetic' modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
+if grandparent_dir not in sys.path:
+    sys.path.insert(0, grandparent_dir)
+
+from arithmetic.pipeline.adaptive import AdaptiveSampler, adaptive_examples, difficulty_bucket
+from arithmetic.pipeline.server import ProblemServer
+from arithmetic.pipeline.loadtest import _read_response
+
+class TestAdaptiveSampler(unittest.TestCase):
+
+    def test_mixture_moves_to_half_solved(self):
+        """Operations solved about half the time dominate always/never-solved ones."""
+        sampler = AdaptiveSampler(["easy", "hard", "medium"], seed=0)
+        for i in range(300):
+            sampler.update("easy", 1)
+            sampler.update("hard", 0)
+            sampler.update("medium", i % 2, bucket=2)
+        counts = Counter(sampler.choose_operations(3000))
+        self.assertGreater(counts["medium"], 5 * counts["easy"])
+        self.assertGreater(counts["medium"], 5 * counts["hard"])
+        self.assertGreater(counts["easy"] + counts["hard"], 0)  # Exploration floor
+        stats = sampler.stats()
+        self.assertEqual(stats["easy"]["success_rate"], 1.0)
+        self.assertEqual(stats["medium"]["buckets"][2][1], 300)
+
+    def test_bucket_choice(self):
+        sampler = AdaptiveSampler(["op"], seed=1)
+        self.assertIsNone(sampler.choose_bucket("op"))
+        for i in range(200):
+            sampler.update("op", 1, bucket=1)
+            sampler.update("op", i % 2, bucket=4)
+        picks = Counter(sampler.choose_bucket("op") for _ in range(200))
+        self.assertGreater(picks[4], picks[1])
+        with self.assertRaises(ValueError):
+            AdaptiveSampler(["op"], target=1.0)
+
+    def test_adaptive_stream(self):
+        sampler = AdaptiveSampler(["fraction_add", "decimal_mul"], seed=2)
+        for example in islice(adaptive_examples(sampler), 20):
+            self.assertIn(example["operation"], ("fraction_add", "decimal_mul"))
+            self.assertEqual(example["difficulty"], difficulty_bucket(example))
+
+class TestServerFeedback(unittest.TestCase):
+
+    def test_feedback_route(self):
+        asyncio.run(self._scenario())
+
+    async def _scenario(self):
+        server = ProblemServer(workers=1, buffer_size=16, refill_batch=8, seed=0, adaptive=True)
+        await server.start()
+        try:
+            port = (await server.serve_tcp(port=0)).sockets[0].getsockname()[1]
+            batch = await server.take(8, ops=["fraction_add", "pythag_hyp"], adaptive=True, payload="answer")
+            self.assertTrue(all("difficulty" in e for e in batch))
+
+            events = json.dumps([{"problem_id": e["problem_id"], "reward": 1} for e in batch]
+                                + [{"problem_id": "unseen", "reward": 0}]).encode()
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST /feedback HTTP/1.1\r\nConnection: close\r\n"
+                         + f"Content-Length: {len(events)}\r\n\r\n".encode() + events)
+            status, body = await _read_response(reader)
+            writer.close()
+            self.assertEqual(status, 200)
+            self.assertEqual(json.loads(body), {"accepted": 8, "unknown": 1})
+            self.assertEqual(sum(s["events"] for s in server.adaptive.stats().values()), 8)
+
+            # Malformed events are a 400, applied nowhere; unknown operations create no arms
+            for bad in ([{"reward": None, "operation": "fraction_add"}], [{"reward": [1], "operation": "fraction_add"}],
+                        [{"reward": 2, "operation": "fraction_add"}], [{"problem_id": [1], "reward": 1}],
+                        [{"operation": ["x"], "reward": 1}], [{"operation": "fraction_add", "difficulty": "3", "reward": 1}]):
+                body = json.dumps(bad).encode()
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"POST /feedback HTTP/1.1\r\nConnection: close\r\n"
+                             + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+                status, _ = await _read_response(reader)
+                writer.close()
+                self.assertEqual(status, 400, bad)
+            self.assertEqual(server.feedback([{"operation": "bogus", "reward": 1}]), {"accepted": 0, "unknown": 1})
+            self.assertNotIn("bogus", server.adaptive.stats())
+            self.assertEqual(sum(s["events"] for s in server.adaptive.stats().values()), 8)
+
+            # Feedback on difficulty buckets steers which buffered problems are served:
+            # the rarer short traces (same denominators) are half solved, the rest always
+            for i in range(300):
+                server.feedback([{"operation": "fraction_add", "difficulty": 2, "reward": i % 2},
+                                 {"operation": "fraction_add", "difficulty": 3, "reward": 1}])
+            buf = server._buffers["fraction_add"]
+            async with server._changed:
+                await server._changed.wait_for(lambda: len(buf) >= 16)
+            available = sum(difficulty_bucket(e) == 2 for e in buf)
+            batch = await server.take(4, ops=["fraction_add"], adaptive=True)
+            self.assertEqual(sum(e["difficulty"] == 2 for e in batch), min(available, 4))
+        finally:
+            await server.close()
+
+if __name__ == '__main__':
+    unittest.main()
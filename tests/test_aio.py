@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+import asyncio
+
+# Add parent directory to path to allow importing 'arithmetic' modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
+if grandparent_dir not in sys.path:
+    sys.path.insert(0, grandparent_dir)
+
+from arithmetic.pipeline.aio import aiter_examples, aiter_batches
+
+async def _collect(**kwargs):
+    return [example async for example in aiter_examples(**kwargs)]
+
+class TestAio(unittest.TestCase):
+
+    def test_counts_and_reproducibility(self):
+        """n examples arrive; a seeded stream is identical across executors."""
+        threaded = asyncio.run(_collect(n=70, batch_size=16, seed=5))
+        self.assertEqual(len(threaded), 70)
+        processed = asyncio.run(_collect(n=70, batch_size=16, seed=5, executor="process", prefetch=2))
+        self.assertEqual([e["problem"] for e in processed], [e["problem"] for e in threaded])
+
+    def test_event_loop_stays_responsive(self):
+        """Other coroutines keep running while batches are generated."""
+        async def scenario():
+            ticks = 0
+            done = asyncio.Event()
+
+            async def ticker():
+                nonlocal ticks
+                while not done.is_set():
+                    ticks += 1
+                    await asyncio.sleep(0)
+
+            task = asyncio.create_task(ticker())
+            async for _ in aiter_batches(n=400, batch_size=100, prefetch=2):
+                pass
+            done.set()
+            await task
+            return ticks
+        self.assertGreater(asyncio.run(scenario()), 10)
+
+    def test_cancellation(self):
+        """Breaking out early or cancelling the consuming task leaves nothing behind."""
+        async def consume(stream):
+            async for _ in stream:
+                pass
+
+        async def scenario():
+            stream = aiter_examples(batch_size=8, prefetch=3)
+            async for _ in stream:
+                break
+            await stream.aclose()
+            task = asyncio.create_task(consume(aiter_examples(batch_size=8, prefetch=3)))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        asyncio.run(scenario())
+        with self.assertRaises(ValueError):
+            asyncio.run(_collect(n=1, executor="gpu"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+from array import array
+from unittest import mock
+
+# Add parent directory to path to allow importing 'arithmetic' modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
+if grandparent_dir not in sys.path:
+    sys.path.insert(0, grandparent_dir)
+
+from arithmetic.dolphin_math_datagen import ALL_GENERATORS, build_dataset, write_jsonl
+from arithmetic.pipeline import columnar
+from arithmetic.pipeline.columnar import ColumnarSink, ColumnarReader, convert_files, RL_COLUMNS
+
+class TestColumnar(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(8)
+        self.examples = [random.choice(ALL_GENERATORS).generate() for _ in range(250)]
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "data.parquet")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip(self):
+        """All columns read back exactly, across several row groups."""
+        with ColumnarSink(self.path, row_group_size=64) as sink:
+            for example in self.examples:
+                sink.write(example)
+        with ColumnarReader(self.path) as data:
+            self.assertEqual(data.num_rows, len(self.examples))
+            self.assertEqual(data.num_row_groups, 4)
+            rows = list(data.iter_rows())
+        for row, example in zip(rows, self.examples):
+            self.assertEqual(row["steps"], example["steps"])
+            self.assertEqual(row["step_ops"], [s.split("|")[0] for s in example["steps"]])
+            for key in ("problem_id", "operation", "problem", "final_answer"):
+                self.assertEqual(row[key], example[key])
+
+    def test_projection(self):
+        """read(RL_COLUMNS) returns only problem and final_answer."""
+        jsonl = os.path.join(self.tmp.name, "data.jsonl")
+        with open(jsonl, "w", encoding="utf-8") as fp:
+            for example in self.examples:
+                write_jsonl(fp, example)
+        convert_files([jsonl], self.path, row_group_size=100)
+        with ColumnarReader(self.path) as data:
+            columns = data.read(RL_COLUMNS)
+            with self.assertRaises(ValueError):
+                data.read(["nope"])
+        self.assertEqual(set(columns), set(RL_COLUMNS))
+        self.assertEqual(columns["final_answer"], [e["final_answer"] for e in self.examples])
+
+    def test_build_dataset_sink(self):
+        """build_dataset writes the columnar format through --format parquet."""
+        build_dataset(n=30, path=self.path, seed=2, format="parquet")
+        with ColumnarReader(self.path) as data:
+            self.assertEqual(data.num_rows, 30)
+
+    @unittest.skipIf(columnar.pq is not None, "pyarrow writes Parquet instead")
+    def test_offset_versions(self):
+        """String offsets are uint64 (no 4 GiB limit per row group); version 1 files with uint32 offsets still read."""
+        self.assertEqual(columnar._encode_strings(["ab", "c"])[:24], array("Q", [0, 2, 3]).tobytes())
+
+        def encode_v1(values):
+            blobs = [v.encode("utf-8") for v in values]
+            offsets = array("I", [0])
+            for blob in blobs:
+                offsets.append(offsets[-1] + len(blob))
+            return offsets.tobytes() + b"".join(blobs)
+
+        with mock.patch.object(columnar, "VERSION", 1), mock.patch.object(columnar, "_encode_strings", encode_v1):
+            with ColumnarSink(self.path, row_group_size=64) as sink:
+                for example in self.examples:
+                    sink.write(example)
+        with ColumnarReader(self.path) as data:
+            columns = data.read(("problem", "steps"))
+        self.assertEqual(columns["problem"], [e["problem"] for e in self.examples])
+        self.assertEqual(columns["steps"], [e["steps"] for e in self.examples])
+
+if __name__ == '__main__':
+    unittest.main()
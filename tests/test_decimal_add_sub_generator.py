@@ -10,7 +10,7 @@ grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
 if grandparent_dir not in sys.path:
     sys.path.insert(0, grandparent_dir)
 
-from arithmetic.generators.decimal_add_sub_generator import DecimalAddSubGenerator
+from arithmetic.generators.decimal_add_sub_generator import DecimalAddSubGenerator, np
 from arithmetic.helpers import DELIM
 
 class TestDecimalAddSubGenerator(unittest.TestCase):
@@ -98,6 +98,52 @@ class TestDecimalAddSubGenerator(unittest.TestCase):
 
         self.assertTrue(found_borrow_case, "No subtraction example requiring borrowing was generated in tests.")
 
+    def test_carry_profile(self):
+        """Every draw carries in exactly the requested number of columns."""
+        random.seed(11)
+        for carries in range(5):
+            generator = DecimalAddSubGenerator('+', carries=carries)
+            for _ in range(50):
+                steps = generator.generate()["steps"]
+                self.assertEqual(sum("(carry 1)" in s for s in steps), carries)
+        with self.assertRaises(ValueError):
+            DecimalAddSubGenerator('+', carries=5)  # More than 4 columns
+        with self.assertRaises(ValueError):
+            DecimalAddSubGenerator('+', borrows=1)
+
+    def test_borrow_chain_profile(self):
+        random.seed(12)
+        generator = DecimalAddSubGenerator('-', borrow_chain=2)
+        for _ in range(50):
+            result = generator.generate()
+            cols = [s for s in result["steps"] if s.startswith(f"DEC_SUB_COL{DELIM}")]
+            borrows = [s.endswith("(borrow_out 1)") for s in cols]
+            self.assertEqual(sum(borrows), 2)
+            first = borrows.index(True)
+            self.assertTrue(borrows[first + 1])
+            # The chain continues across a zero of the minuend
+            self.assertIn(f"{DELIM}0-", cols[first + 1])
+            a, b = result["problem"].split(" - ")
+            self.assertGreater(float(a), float(b))
+        for kwargs in ({"borrows": 0, "borrow_chain": 1}, {"borrows": 1, "borrow_chain": 2},
+                       {"borrow_chain": 0}, {"borrow_chain": -1}, {"borrows": -1}):
+            with self.assertRaises(ValueError):
+                DecimalAddSubGenerator('-', **kwargs)
+        DecimalAddSubGenerator('-', borrows=2, borrow_chain=1).generate()
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_batch_matches_generate(self):
+        """The vectorized batch gives exactly the traces of generate()."""
+        for generator in (DecimalAddSubGenerator('+'), DecimalAddSubGenerator('-'),
+                          DecimalAddSubGenerator('-', borrow_chain=2)):
+            random.seed(21)
+            batch = generator.generate_batch(300)
+            random.seed(21)
+            single = [generator.generate() for _ in range(300)]
+            for a, b in zip(batch, single):
+                self.assertEqual((a["problem"], a["steps"], a["final_answer"]),
+                                 (b["problem"], b["steps"], b["final_answer"]))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -10,7 +10,9 @@ grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
 if grandparent_dir not in sys.path:
     sys.path.insert(0, grandparent_dir)
 
-from arithmetic.generators.decimal_div_generator import DecimalDivGenerator
+from arithmetic.generators.decimal_div_generator import DecimalDivGenerator, decimal_division_steps, repeating_decimal
+from arithmetic.step_interpreter import check_trace
+from fractions import Fraction
 from arithmetic.helpers import DELIM
 
 class TestDecimalDivGenerator(unittest.TestCase):
@@ -100,5 +102,31 @@ class TestDecimalDivGenerator(unittest.TestCase):
             self.assertTrue(result["steps"][0].startswith(f"DEC_SHIFT{DELIM}"), "First step should be DEC_SHIFT")
 
 
+    def test_repeating_decimal(self):
+        self.assertEqual(repeating_decimal(Fraction(1, 6)), "0.1(6)")
+        self.assertEqual(repeating_decimal(Fraction(22, 7)), "3.(142857)")
+        self.assertEqual(repeating_decimal(Fraction(50)), "50")
+        self.assertEqual(repeating_decimal(Fraction(1, 8)), "0.125")
+
+    def test_repeating_trace_stops_after_one_period(self):
+        """The trace ends as soon as a remainder recurs, with the period named once."""
+        steps = list(decimal_division_steps("1", "6"))
+        self.assertEqual(steps[-2:], ["REPEAT|4|6", "PLACE_DP_Q|16|1"])
+        self.assertEqual(sum(s.startswith("D|") for s in steps), 2)
+        generator = DecimalDivGenerator(repeating=True)
+        repeating = 0
+        for _ in range(200):
+            result = generator.generate()
+            self.assertEqual(check_trace(result["steps"], result["final_answer"])["score"], 1.0)
+            a, b = result["problem"].split(" / ")
+            if "(" in result["final_answer"]:
+                repeating += 1
+                period = result["final_answer"].split("(")[1][:-1]
+                self.assertIn(f"REPEAT{DELIM}", result["steps"][-3])
+                self.assertTrue(result["steps"][-3].endswith(DELIM + period))
+            else:
+                self.assertEqual(Fraction(result["final_answer"]), Fraction(a) / Fraction(b))
+        self.assertGreater(repeating, 100)
+
 if __name__ == '__main__':
     unittest.main()
@@ -10,7 +10,10 @@ grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
 if grandparent_dir not in sys.path:
     sys.path.insert(0, grandparent_dir)
 
-from arithmetic.generators.decimal_mult_generator import DecimalMultGenerator
+from arithmetic.generators.decimal_mult_generator import (
+    DecimalMultGenerator, decimal_mult_steps, decimal_mult_batch_steps, place_decimal_point, np)
+from arithmetic.step_interpreter import check_trace
+from fractions import Fraction
 from arithmetic.helpers import DELIM
 
 class TestDecimalMultGenerator(unittest.TestCase):
@@ -81,5 +84,36 @@ class TestDecimalMultGenerator(unittest.TestCase):
             except ValueError:
                 self.fail(f"Final answer '{result['final_answer']}' is not a valid number string.")
 
+    def test_known_trace(self):
+        """A zero digit keeps its shifted MUL_PARTIAL but sums as 0."""
+        self.assertEqual(list(decimal_mult_steps("1.05", "2.03")), [
+            "MUL_SETUP|105|203", "MUL_PARTIAL|3|105|315", "MUL_PARTIAL|0|105|00",
+            "MUL_PARTIAL|2|105|21000", "ADD_PARTIALS|315+0+21000|21315",
+            "COUNT_DP|2|2|4", "PLACE_DP|21315|4|2.1315", "Z|2.1315"])
+        self.assertEqual(place_decimal_point("1500", 2), "15")
+        self.assertEqual(place_decimal_point("5", 3), "0.005")
+
+    def test_large_operands(self):
+        """Hundreds-of-digit factors give exact answers and valid traces."""
+        generator = DecimalMultGenerator(digits=(100, 300), decimals=(0, 20))
+        for _ in range(3):
+            result = generator.generate()
+            a, b = result["problem"].split(" * ")
+            self.assertEqual(Fraction(a) * Fraction(b), Fraction(result["final_answer"]))
+            self.assertEqual(check_trace(result["steps"], result["final_answer"])["score"], 1.0)
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_batch_matches_generate(self):
+        for generator in (DecimalMultGenerator(), DecimalMultGenerator(digits=(1, 40), decimals=(0, 4))):
+            random.seed(22)
+            batch = generator.generate_batch(200)
+            random.seed(22)
+            single = [generator.generate() for _ in range(200)]
+            for a, b in zip(batch, single):
+                self.assertEqual((a["problem"], a["steps"], a["final_answer"]),
+                                 (b["problem"], b["steps"], b["final_answer"]))
+        pairs = [("0.5", "0.2"), ("100", "0"), ("9" * 30, "9" * 12)]
+        self.assertEqual(decimal_mult_batch_steps(pairs), [list(decimal_mult_steps(a, b)) for a, b in pairs])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,11 @@
 import unittest
 import sys
 import os
+import itertools
 import random
+import tempfile
+import zlib
+from array import array
 from fractions import Fraction # Needed for checking final answer type
 
 # Add parent directory to path to allow importing 'arithmetic' modules
@@ -11,7 +15,12 @@ grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
 if grandparent_dir not in sys.path:
     sys.path.insert(0, grandparent_dir)
 
-from arithmetic.generators.fraction_op_generator import FractionOpGenerator
+from arithmetic.generators.fraction_op_generator import (
+    FractionOpGenerator, fraction_batch_steps, fraction_chain_steps, factorize, np)
+from arithmetic.generators.sieve import (
+    shared_sieve, sieve_path, is_prime, SpfSieve, DEFAULT_LIMIT, HEADER, MAGIC)
+from arithmetic.step_interpreter import check_trace
+from arithmetic.pipeline.verify import check_answer
 from arithmetic.helpers import DELIM
 
 class TestFractionOpGenerator(unittest.TestCase):
@@ -81,6 +90,122 @@ class TestFractionOpGenerator(unittest.TestCase):
                 self.assertEqual(len(i_parts), 3, "I step should have 3 parts")
                 self.assertIn('/', i_parts[2], "Inverted fraction in I step should contain '/'")
 
+    def test_chain_trace(self):
+        """The running denominator only grows by the primes a new denominator adds."""
+        steps = list(fraction_chain_steps([(0, 1, 2), (1, 1, 3), (0, 3, 4)], ["+", "-"]))
+        self.assertEqual(steps, [
+            "MIX|1 1/3|4/3",
+            "L|2|3|6", "C|1/2|6|3/6", "C|4/3|6|8/6", "A|3|8|11",
+            "L|6|4|12", "C|11/6|12|22/12", "C|3/4|12|9/12", "S|22|9|13",
+            "Z|13/12",
+        ])
+        self.assertIsNone(check_trace(steps, "13/12")["first_error"])
+        self.assertEqual(factorize(360), ((2, 3), (3, 2), (5, 1)))
+
+    def test_generate_chains(self):
+        random.seed(41)
+        generator = FractionOpGenerator('+-', terms=(3, 8), mixed=True, max_den=60)
+        for _ in range(50):
+            result = generator.generate()
+            self.assertEqual(result["operation"], "fraction_add_sub")
+            self.assertTrue(all(check_trace(result["steps"], result["final_answer"])["valid"]))
+            self.assertTrue(check_answer(result))
+        for kwargs in ({"terms": 1}, {"terms": (5, 3)}, {"max_den": 1}):
+            with self.assertRaises(ValueError):
+                FractionOpGenerator('+', **kwargs)
+        with self.assertRaises(ValueError):
+            FractionOpGenerator('*', terms=3)
+
+    def test_mixed_products(self):
+        random.seed(42)
+        for op_symbol in "*/":
+            generator = FractionOpGenerator(op_symbol, mixed=True, max_den=30)
+            for _ in range(30):
+                result = generator.generate()
+                self.assertTrue(all(check_trace(result["steps"], result["final_answer"])["valid"]))
+                self.assertTrue(check_answer(result))
+
+    def test_detailed_traces(self):
+        terms, ops = [(0, 7, 8), (0, 1, 6)], ["+"]
+        self.assertEqual(list(fraction_chain_steps(terms, ops, detail="euclid")), [
+            "EUC|8|6|1|2", "EUC|6|2|3|0", "G|8|6|2", "L|8|6|24",
+            "C|7/8|24|21/24", "C|1/6|24|4/24", "A|21|4|25", "Z|25/24",
+        ])
+        self.assertEqual(list(fraction_chain_steps([(0, 1, 6), (0, 1, 12), (0, 1, 4)], ["+", "+"], detail="factor")), [
+            "PF|6|2*3", "PF|12|2^2*3", "L|6|12|12", "C|1/6|12|2/12", "A|2|1|3",
+            "PF|12|2^2*3", "PF|4|2^2", "L|12|4|12", "C|1/4|12|3/12", "A|3|3|6",
+            "PF|6|2*3", "PF|12|2^2*3", "G|6|12|6", "F|6/12|1/2", "Z|1/2",
+        ])
+        random.seed(43)
+        for op_symbol in ["+-", "*", "/"]:
+            for detail in ["euclid", "factor"]:
+                generator = FractionOpGenerator(op_symbol, mixed=True, max_den=30, detail=detail)
+                for _ in range(30):
+                    result = generator.generate()
+                    self.assertTrue(all(check_trace(result["steps"], result["final_answer"])["valid"]))
+                    self.assertTrue(check_answer(result))
+        with self.assertRaises(ValueError):
+            FractionOpGenerator('+', detail='prime')
+
+    def test_sieve(self):
+        """The memory-mapped sieve factorizes like trial division, and its file is reused."""
+        sieve = shared_sieve(1000)
+        for n in range(1, 3000):
+            product = 1
+            for p, e in sieve.factorize(n):
+                self.assertTrue(all(p % f for f in range(2, p)))
+                product *= p ** e
+            self.assertEqual(product, n)
+        self.assertEqual(sieve.spf(91), 7)
+        # Miller-Rabin beyond the sieve agrees with it at the boundary and rejects strong pseudoprimes
+        around = range(DEFAULT_LIMIT - 100, DEFAULT_LIMIT + 100)
+        self.assertEqual([n for n in around if is_prime(n)],
+                         [n for n in around if all(n % f for f in range(2, 1025))])
+        self.assertFalse(is_prime(3825123056546413051))
+        self.assertIs(shared_sieve(1000), shared_sieve(2000)) # One power-of-two file covers both
+        self.assertEqual(factorize(DEFAULT_LIMIT - 1), ((3, 1), (5, 2), (11, 1), (31, 1), (41, 1)))
+        with tempfile.TemporaryDirectory() as directory:
+            sieve = shared_sieve(100, directory)
+            self.assertTrue(os.path.exists(sieve_path(sieve.limit, directory)))
+            reopened = SpfSieve(sieve.path) # What another process would map
+            self.assertEqual(reopened.factorize(65535), sieve.factorize(65535))
+            reopened.close()
+
+    def test_bad_sieve_file(self):
+        """A planted or damaged sieve file is rejected and rebuilt, never trusted."""
+        self.assertEqual(os.stat(os.path.dirname(sieve_path(1))).st_mode & 0o077, 0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = sieve_path(1 << 16, directory)
+            table = array("I", [0, 0] + [1] * ((1 << 16) - 1)) # Would make factorize() loop forever
+            with open(path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, 1 << 16, zlib.crc32(table)))
+                table.tofile(f)
+            with self.assertRaises(ValueError):
+                SpfSieve(path)
+            with open(path, "r+b") as f: # Right shape, wrong checksum
+                f.seek(HEADER.size)
+                f.write(bytes(8))
+            with self.assertRaises(ValueError):
+                SpfSieve(path)
+            sieve = shared_sieve(1 << 16, directory)
+            self.assertEqual(sieve.factorize(65535), ((3, 1), (5, 1), (17, 1), (257, 1)))
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_batch_parity(self):
+        """The array engine matches generate() on every operand combination."""
+        combos = list(itertools.product(range(1, 10), range(2, 10), range(1, 10), range(2, 10)))
+        for op_symbol in "+-*/":
+            generator = FractionOpGenerator(op_symbol)
+            traces = fraction_batch_steps(combos, op_symbol)
+            for operands, trace in zip(combos[::7], traces[::7]):
+                generator.operands = lambda operands=operands: operands
+                self.assertEqual(generator.generate()["steps"], trace, operands)
+            del generator.operands
+            random.seed(31)
+            batch = generator.generate_batch(100)
+            random.seed(31)
+            single = [generator.generate() for _ in range(100)]
+            self.assertEqual([(e["problem"], e["steps"]) for e in batch], [(e["problem"], e["steps"]) for e in single])
 
 if __name__ == '__main__':
     unittest.main()
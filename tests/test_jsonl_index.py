@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+import json
+import random
+import tempfile
+
+# Add parent directory to path to allow importing 'arithmetic' modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
+if grandparent_dir not in sys.path:
+    sys.path.insert(0, grandparent_dir)
+
+from arithmetic.dolphin_math_datagen import ALL_GENERATORS, write_jsonl
+from arithmetic.pipeline.jsonl_index import build_index, IndexedJsonl, index_path_for
+
+class TestJsonlIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Write a small dataset to a temporary file."""
+        random.seed(7)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "data.jsonl")
+        self.examples = [random.choice(ALL_GENERATORS).generate() for _ in range(300)]
+        with open(self.path, "w", encoding="utf-8") as fp:
+            for example in self.examples:
+                write_jsonl(fp, example)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lookup_by_ordinal_and_id(self):
+        """Examples come back by ordinal and by problem_id."""
+        build_index(self.path)
+        self.assertTrue(os.path.exists(index_path_for(self.path)))
+        with IndexedJsonl(self.path) as data:
+            self.assertEqual(len(data), len(self.examples))
+            for i in (0, 1, 150, len(self.examples) - 1):
+                self.assertEqual(data[i], self.examples[i])
+                self.assertEqual(data.find(self.examples[i]["problem_id"]), self.examples[i])
+            self.assertEqual(data[-1], self.examples[-1])
+            self.assertIsNone(data.find("not-a-problem-id"))
+
+    def test_operation_index(self):
+        """Ordinals are grouped by operation."""
+        with IndexedJsonl(self.path) as data: # Builds the index on first use
+            counts = data.operations()
+            self.assertEqual(sum(counts.values()), len(self.examples))
+            for op in counts:
+                ordinals = list(data.ordinals(op))
+                self.assertEqual(len(ordinals), counts[op])
+                self.assertTrue(all(self.examples[i]["operation"] == op for i in ordinals))
+            self.assertEqual(len(data.ordinals("no_such_op")), 0)
+
+    def test_stale_index_rejected(self):
+        """An index built for a different file size is refused."""
+        build_index(self.path)
+        with open(self.path, "a", encoding="utf-8") as fp:
+            write_jsonl(fp, self.examples[0])
+        with self.assertRaises(ValueError):
+            IndexedJsonl(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
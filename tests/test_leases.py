@@ -0,0 +1,121 @@
+import unittest
+import sys
+import os
+import json
+import time
+import tempfile
+import multiprocessing
+from unittest import mock
+
+# Add parent directory to path to allow importing 'arithmetic' modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
+if grandparent_dir not in sys.path:
+    sys.path.insert(0, grandparent_dir)
+
+from arithmetic.pipeline import leases
+from arithmetic.pipeline.leases import init_job, run_worker, merge_job, job_status, Lease
+
+def _work(job_dir, owner):
+    run_worker(job_dir, owner=owner)
+
+def _short_producer(task, sink):
+    """Drops the last example of range 2, like a worker whose generator stopped early."""
+    index, count, seed = task
+    leases._default_producer((index, count - (index == 2), seed), sink)
+
+class TestLeases(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.job = os.path.join(self.tmp.name, "job")
+        init_job(self.job, n=250, seed=7, range_size=40)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_concurrent_workers_cover_all_ranges(self):
+        """Several processes share the job; merge finds every range exactly once."""
+        procs = [multiprocessing.Process(target=_work, args=(self.job, f"w{i}")) for i in range(3)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        out = os.path.join(self.tmp.name, "all.jsonl")
+        with open(merge_job(self.job, out), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["count"], 250)
+        self.assertEqual([s["range"] for s in manifest["shards"]], list(range(7)))
+        with open(out, encoding="utf-8") as f:
+            self.assertEqual(sum(1 for _ in f), 250)
+
+    def test_merge_rejects_incomplete_job(self):
+        run_worker(self.job, owner="a", max_ranges=2)
+        self.assertEqual(len(job_status(self.job)["done"]), 2)
+        with self.assertRaises(ValueError):
+            merge_job(self.job)
+
+    def test_expired_lease_is_reclaimed(self):
+        """A dead worker's lease blocks its range only until it expires."""
+        lease_path = os.path.join(self.job, "leases", "range-000003.lease")
+        self.assertIsNotNone(Lease.acquire(lease_path, "dead", ttl=60))
+        self.assertIsNone(Lease.acquire(lease_path, "other", ttl=60))
+        run_worker(self.job, owner="b", ttl=60)
+        self.assertEqual(job_status(self.job)["leased"], [3])
+        stale = time.time() - 120
+        os.utime(lease_path, (stale, stale))
+        self.assertEqual(run_worker(self.job, owner="c", ttl=60), [3])
+        merge_job(self.job)
+
+    def test_takeover_stops_generation(self):
+        """A worker whose lease is taken over mid-range stops at its next renew check."""
+        written = {}
+        stolen = os.path.join(self.job, "leases", "range-000004.lease")
+
+        def stolen_producer(task, sink):
+            index = task[0]
+            written[index] = 0
+
+            class Counting:
+                def write(self, example):
+                    sink.write(example)
+                    written[index] += 1
+                    if index == 4 and written[index] == 10:  # Another worker reclaims range 4
+                        with open(stolen, "w") as f:
+                            json.dump({"owner": "thief"}, f)
+            leases._default_producer(task, Counting())
+
+        with mock.patch.object(leases, "_RENEW_CHECK_EVERY", 8):
+            done = run_worker(self.job, owner="a", ttl=0, producer=stolen_producer)
+        self.assertEqual(sorted(done), [0, 1, 2, 3, 5, 6])
+        self.assertEqual(written[4], 16)  # The check before the 17th write raised; nothing after it was written
+        self.assertEqual(job_status(self.job)["leased"], [4])
+
+    def test_concurrent_reclaimers(self):
+        """A reclaimer that lost the race puts the winner's fresh lease back instead of taking it."""
+        lease_path = os.path.join(self.job, "leases", "range-000001.lease")
+        Lease.acquire(lease_path, "dead", ttl=60)
+        stale = time.time() - 120
+        os.utime(lease_path, (stale, stale))
+        rename = os.rename
+
+        def reclaimed_first(src, dst):
+            # Worker "a" completes its whole reclaim after "b" examined the stale lease
+            os.remove(src)
+            self.assertIsNotNone(Lease.acquire(lease_path, "a", ttl=60))
+            rename(src, dst)
+
+        with mock.patch.object(leases.os, "rename", reclaimed_first):
+            self.assertIsNone(Lease.acquire(lease_path, "b", ttl=60))
+        self.assertEqual(Lease(lease_path, "a", 60).holder(), "a")
+        self.assertEqual(os.listdir(os.path.dirname(lease_path)), ["range-000001.lease"])
+
+    def test_merge_rejects_short_range(self):
+        """A shard with fewer examples than its range is reported as damaged."""
+        run_worker(self.job, owner="a", producer=_short_producer)
+        with self.assertRaisesRegex(ValueError, r"1 damaged \[2\]"):
+            merge_job(self.job)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,8 +10,9 @@ grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
 if grandparent_dir not in sys.path:
     sys.path.insert(0, grandparent_dir)
 
-from arithmetic.generators.long_division_generator import LongDivisionGenerator
+from arithmetic.generators.long_division_generator import LongDivisionGenerator, long_division_steps
 from arithmetic.helpers import DELIM
+from arithmetic.step_interpreter import check_trace
 
 class TestLongDivisionGenerator(unittest.TestCase):
 
@@ -74,5 +75,44 @@ class TestLongDivisionGenerator(unittest.TestCase):
                 except ValueError:
                     self.fail(f"B step arguments are not integers: {b_step}")
 
+    def test_known_trace(self):
+        """Zero quotient digits, a trailing remainder and the trivial case."""
+        self.assertEqual(list(long_division_steps(1834, 9)), [
+            "D|18|9|2", "M|2|9|18", "S|18|18|0", "B|0|3|3", "B|3|4|34",
+            "D|34|9|3", "M|3|9|27", "S|34|27|7", "Z|203 R7"])
+        self.assertEqual(list(long_division_steps(7, 12)), ["R|7", "Z|0 R7"])
+
+    def test_large_operands(self):
+        """Hundreds-of-digit dividends and multi-digit divisors give valid, exact traces."""
+        generator = LongDivisionGenerator(dividend_digits=(50, 500), divisor_digits=(1, 6))
+        for _ in range(5):
+            result = generator.generate()
+            dividend, divisor = map(int, result["problem"].split(" / "))
+            self.assertGreaterEqual(len(str(dividend)), 50)
+            quotient, _, remainder = result["final_answer"].partition(" R")
+            self.assertEqual(divmod(dividend, divisor), (int(quotient), int(remainder or 0)))
+            self.assertEqual(check_trace(result["steps"], result["final_answer"])["score"], 1.0)
+
+    def test_beyond_int_str_limit(self):
+        """Digit-string dividends are never converted with str(int), so any length works."""
+        dividend = "9" * 6000
+        steps = long_division_steps(dividend, 7)
+        self.assertEqual(next(steps), "D|9|7|1")
+        *_, last = steps
+        self.assertTrue(last.startswith("Z|1428571"))
+    def test_quotient_profile(self):
+        """Zero quotient digits and exactness are built in, not filtered for."""
+        random.seed(13)
+        for zeros in range(3):
+            for exact in (True, False):
+                generator = LongDivisionGenerator(zero_digits=zeros, exact=exact)
+                for _ in range(30):
+                    result = generator.generate()
+                    quotient, _, remainder = result["final_answer"].partition(" R")
+                    self.assertEqual(quotient.count("0"), zeros)
+                    self.assertEqual(remainder == "", exact)
+                    self.assertIsNone(check_trace(result["steps"], result["final_answer"])["first_error"])
+
+
 if __name__ == '__main__':
     unittest.main()
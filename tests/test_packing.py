@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+
+# Add parent directory to path to allow importing 'arithmetic' modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
+if grandparent_dir not in sys.path:
+    sys.path.insert(0, grandparent_dir)
+
+from arithmetic.dolphin_math_datagen import ALL_GENERATORS, write_jsonl
+from arithmetic.pipeline.packing import pack_lengths, pack_files
+from arithmetic.pipeline.pretokenize import OpCodeTokenizer, TokenBinWriter, TokenDataset, BOS, EOS, PAD
+
+class TestPacking(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(5)
+        self.examples = [random.choice(ALL_GENERATORS).generate() for _ in range(300)]
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _split_docs(self, blocks):
+        """Recovers the sequences packed into blocks from their <bos>/<eos> markers."""
+        docs = []
+        for block in blocks:
+            block = [t for t in block if t != PAD]
+            start = 0
+            for i, t in enumerate(block):
+                if t == EOS:
+                    docs.append(tuple(block[start:i + 1]))
+                    start = i + 1
+        return docs
+
+    def test_pack_lengths(self):
+        """Every index is placed exactly once and no block overflows."""
+        rng = random.Random(1)
+        lengths = [rng.randint(1, 100) for _ in range(5000)]
+        bins = list(pack_lengths(lengths, 256, max_open=64, buffer_size=500))
+        self.assertEqual(sorted(i for b in bins for i in b), list(range(len(lengths))))
+        for b in bins:
+            self.assertLessEqual(sum(lengths[i] for i in b), 256)
+        self.assertGreater(sum(lengths) / (256 * len(bins)), 0.95)
+        with self.assertRaises(ValueError):
+            list(pack_lengths([300], 256))
+
+    def test_pack_files(self):
+        """Packed blocks are full-length and contain every original sequence once."""
+        tok = OpCodeTokenizer()
+        # Sequences that fit a block, so none is split and _split_docs() can recover them all
+        self.examples = [e for e in self.examples if len(tok.encode_example(e)) <= 1024]
+        jsonl = os.path.join(self.tmp.name, "a.jsonl")
+        with open(jsonl, "w", encoding="utf-8") as fp:
+            for example in self.examples[:len(self.examples) // 2]:
+                write_jsonl(fp, example)
+        with TokenBinWriter(os.path.join(self.tmp.name, "b.bin")) as writer:
+            for example in self.examples[len(self.examples) // 2:]:
+                writer.write(example)
+
+        out = os.path.join(self.tmp.name, "packed.bin")
+        stats = pack_files([jsonl, os.path.join(self.tmp.name, "b.bin")], out, block_size=1024)
+        self.assertEqual(stats["sequences"], len(self.examples))
+        self.assertEqual(stats["split_sequences"], 0)
+        self.assertGreater(stats["efficiency"], stats["padded_efficiency"])
+        with TokenDataset(out) as data:
+            self.assertEqual(len(data), stats["blocks"])
+            self.assertEqual(set(data.lengths()), {1024})
+            blocks = [data[i].tolist() for i in range(len(data))]
+        expected = sorted(tuple(tok.encode_example(e)) for e in self.examples)
+        self.assertEqual(sorted(self._split_docs(blocks)), expected)
+        self.assertTrue(all(doc[0] == BOS for doc in expected))
+
+        # JSONL encoded with another vocabulary cannot be mixed into the .bin input's blocks
+        class OtherVocab(OpCodeTokenizer):
+            vocab_hash = "0123456789abcdef"
+        with self.assertRaises(ValueError):
+            pack_files([jsonl, os.path.join(self.tmp.name, "b.bin")], out, block_size=1024, tokenizer=OtherVocab())
+
+if __name__ == '__main__':
+    unittest.main()
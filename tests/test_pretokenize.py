@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import json
+import random
+import tempfile
+
+# Add parent directory to path to allow importing 'arithmetic' modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
+if grandparent_dir not in sys.path:
+    sys.path.insert(0, grandparent_dir)
+
+from arithmetic.dolphin_math_datagen import ALL_GENERATORS, build_dataset
+from arithmetic.pipeline.pretokenize import (
+    OpCodeTokenizer, TokenBinWriter, TokenDataset, OPCODE_VOCAB, example_text, BOS, EOS,
+)
+from arithmetic.step_interpreter import OP_CODES
+
+class CharTokenizer:
+    """Minimal pluggable tokenizer: one id per character."""
+    vocab_size = 1 << 20
+
+    def encode(self, text):
+        return [ord(ch) for ch in text]
+
+class TestPretokenize(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(3)
+        self.examples = [gen.generate() for gen in ALL_GENERATORS for _ in range(5)]
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_opcode_vocabulary(self):
+        """Op-codes are single tokens and encoding round-trips."""
+        tok = OpCodeTokenizer()
+        self.assertEqual(len(set(tok.op_ids.values())), len(OPCODE_VOCAB))
+        self.assertLessEqual(set(OP_CODES), set(OPCODE_VOCAB)) # New op-codes must be appended to the vocabulary
+        # Ids are frozen: existing .bin files keep decoding correctly
+        self.assertEqual((tok.op_ids["D"], tok.op_ids["Z"], tok.op_ids["PF"], tok.byte_offset), (5, 52, 56, 57))
+        self.assertLess(tok.vocab_size, 1 << 16)
+        self.assertEqual(tok.encode_step("DEC_ADD_COL|int_1|1+2+0|->3 (carry 0)")[0], tok.op_ids["DEC_ADD_COL"])
+        for example in self.examples:
+            ids = tok.encode_example(example)
+            self.assertEqual((ids[0], ids[-1]), (BOS, EOS))
+            self.assertEqual(tok.decode(ids), example_text(example) + "\n")
+
+    def test_bin_roundtrip(self):
+        """Token arrays read back from the memory-mapped files match the encoder."""
+        path = os.path.join(self.tmp.name, "data.jsonl")
+        tok = OpCodeTokenizer()
+        with TokenBinWriter(path) as writer:
+            for example in self.examples:
+                writer.write(example)
+        with TokenDataset(path) as data:
+            self.assertEqual(data.meta["dtype"], "uint16")
+            self.assertEqual(len(data), len(self.examples))
+            for i, example in enumerate(self.examples):
+                self.assertEqual(list(data[i]), tok.encode_example(example))
+            self.assertEqual(sum(data.lengths()), data.meta["num_tokens"])
+
+    def test_vocabulary_mismatch(self):
+        """Data tokenized with another op-code vocabulary is refused instead of misread."""
+        path = os.path.join(self.tmp.name, "data.jsonl")
+        with TokenBinWriter(path) as writer:
+            writer.write(self.examples[0])
+        meta_path = os.path.join(self.tmp.name, "data.meta.json")
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        self.assertEqual(meta["vocab_hash"], OpCodeTokenizer.vocab_hash)
+        for stale in ("0123456789abcdef", None):
+            meta["vocab_hash"] = stale
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            with self.assertRaises(ValueError):
+                TokenDataset(path)
+
+    def test_pluggable_tokenizer_and_build_dataset(self):
+        """build_dataset can emit .bin output with a custom tokenizer."""
+        path = os.path.join(self.tmp.name, "gen.bin")
+        build_dataset(n=20, path=path, seed=1, format="bin", tokenizer=CharTokenizer())
+        with TokenDataset(path) as data:
+            self.assertEqual(data.meta["dtype"], "uint32")
+            self.assertEqual(len(data), 20)
+            text = "".join(map(chr, data[0]))
+            self.assertIn("Z|", text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+import json
+import asyncio
+
+# Add parent directory to path to allow importing 'arithmetic' modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
+if grandparent_dir not in sys.path:
+    sys.path.insert(0, grandparent_dir)
+
+from arithmetic.pipeline.server import ProblemServer, ANSWER_FIELDS
+from arithmetic.pipeline.loadtest import load_test, _read_response
+
+async def _get(port, target):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {target} HTTP/1.1\r\nConnection: close\r\n\r\n".encode())
+    status, body = await _read_response(reader)
+    writer.close()
+    return status, json.loads(body)
+
+class TestServer(unittest.TestCase):
+
+    def test_server(self):
+        asyncio.run(self._scenario())
+
+    async def _scenario(self):
+        server = ProblemServer(workers=1, buffer_size=16, refill_batch=8, seed=0)
+        await server.start()
+        try:
+            port = (await server.serve_tcp(port=0)).sockets[0].getsockname()[1]
+
+            # Operation filter and answer-only payload
+            status, body = await _get(port, "/batch?size=10&ops=fraction_add,pythag_hyp&payload=answer")
+            self.assertEqual(status, 200)
+            self.assertEqual(len(body["examples"]), 10)
+            for example in body["examples"]:
+                self.assertIn(example["operation"], ("fraction_add", "pythag_hyp"))
+                self.assertEqual(tuple(example), ANSWER_FIELDS)
+
+            # Mixture weights; a batch larger than the buffer waits for refills
+            batch = await server.take(40, weights={"decimal_mul": 1, "quadratic_eq": 0})
+            self.assertEqual({e["operation"] for e in batch}, {"decimal_mul"})
+            self.assertIn("steps", batch[0])
+
+            status, body = await _get(port, "/batch?ops=no_such_op")
+            self.assertEqual(status, 400)
+            status, body = await _get(port, "/health")
+            self.assertEqual(status, 200)
+            self.assertEqual(set(body["buffers"]), set(server.operations))
+
+            stats = await load_test(f"http://127.0.0.1:{port}/batch?size=8", concurrency=2, duration=0.5)
+            self.assertGreater(stats["batches"], 0)
+            self.assertEqual(stats["errors"], 0)
+            self.assertGreaterEqual(stats["p99_ms"], stats["p50_ms"])
+        finally:
+            await server.close()
+
+if __name__ == '__main__':
+    unittest.main()
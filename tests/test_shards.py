@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import json
+import random
+import tempfile
+
+# Add parent directory to path to allow importing 'arithmetic' modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
+if grandparent_dir not in sys.path:
+    sys.path.insert(0, grandparent_dir)
+
+from arithmetic.dolphin_math_datagen import ALL_GENERATORS, build_dataset
+from arithmetic.pipeline.shards import ShardWriter, write_manifest, manifest_path, file_sha256, parse_size
+
+class TestShards(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(21)
+        self.examples = [random.choice(ALL_GENERATORS).generate() for _ in range(200)]
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "data.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _manifest(self):
+        with open(manifest_path(self.path), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _problems(self, manifest):
+        problems = []
+        for shard in manifest["shards"]:
+            for entry in shard["files"]:
+                path = os.path.join(self.tmp.name, entry["path"])
+                self.assertEqual(os.path.getsize(path), entry["bytes"])
+                self.assertEqual(file_sha256(path), entry["sha256"])
+                with open(path, encoding="utf-8") as f:
+                    problems.extend(json.loads(line)["problem"] for line in f)
+        return problems
+
+    def test_parse_size(self):
+        self.assertEqual(parse_size("1024"), 1024)
+        self.assertEqual(parse_size("256M"), 256 << 20)
+        self.assertEqual(parse_size("1.5kb"), 1536)
+
+    def test_size_rotation(self):
+        """Shards rotate once they reach shard_size; the manifest accounts for every example."""
+        with ShardWriter(self.path, shard_size=8192) as writer:
+            for example in self.examples:
+                writer.write(example)
+        write_manifest(self.path, writer.shards, seed=21)
+        manifest = self._manifest()
+        self.assertGreater(manifest["num_shards"], 2)
+        self.assertEqual(manifest["count"], len(self.examples))
+        for shard in manifest["shards"][:-1]:
+            self.assertGreaterEqual(shard["files"][0]["bytes"], 8192)
+        self.assertEqual(self._problems(manifest), [e["problem"] for e in self.examples])
+        self.assertEqual(sum(manifest["operations"].values()), len(self.examples))
+
+    def test_parallel_shards(self):
+        """Parallel shards get equal counts and are reproducible for a seed."""
+        build_dataset(n=90, path=self.path, seed=4, num_shards=3, workers=2)
+        first = self._manifest()
+        self.assertEqual([s["count"] for s in first["shards"]], [30, 30, 30])
+        problems = self._problems(first)
+        build_dataset(n=90, path=self.path, seed=4, num_shards=3, workers=2)
+        self.assertEqual(self._problems(self._manifest()), problems)
+
+if __name__ == '__main__':
+    unittest.main()
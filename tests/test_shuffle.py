@@ -0,0 +1,57 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add parent directory to path to allow importing 'arithmetic' modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
+if grandparent_dir not in sys.path:
+    sys.path.insert(0, grandparent_dir)
+
+from arithmetic.pipeline.shuffle import shuffle_files
+
+class TestShuffle(unittest.TestCase):
+
+    def setUp(self):
+        """Write three shards of numbered lines."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.shards = []
+        self.lines = []
+        for s in range(3):
+            path = os.path.join(self.tmp.name, f"shard_{s}.jsonl")
+            shard_lines = [f'{{"id": {s * 1000 + i}, "pad": "{"x" * (i % 50)}"}}' for i in range(700)]
+            with open(path, "w", encoding="utf-8") as fp:
+                fp.write("\n".join(shard_lines)) # No trailing newline on purpose
+            self.shards.append(path)
+            self.lines.extend(shard_lines)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _shuffle(self, name, **kwargs):
+        out = os.path.join(self.tmp.name, name)
+        shuffle_files(self.shards, out, **kwargs)
+        with open(out, encoding="utf-8") as fp:
+            return fp.read().splitlines()
+
+    def test_shuffle_is_permutation(self):
+        """All shard lines appear exactly once, in a new order."""
+        for memory_mb in (64, 0.02): # In memory, and external with recursive buckets
+            result = self._shuffle("out.jsonl", seed=1, memory_mb=memory_mb)
+            self.assertEqual(sorted(result), sorted(self.lines))
+            self.assertNotEqual(result, self.lines)
+        self.assertEqual(os.listdir(self.tmp.name).count("out.jsonl.tmp"), 0)
+        self.assertFalse([p for p in os.listdir(self.tmp.name) if p.startswith("shuffle_")])
+
+    def test_deterministic_under_seed(self):
+        """Same seed gives the same order; another seed does not."""
+        a = self._shuffle("a.jsonl", seed=5, memory_mb=0.02)
+        b = self._shuffle("b.jsonl", seed=5, memory_mb=0.02)
+        c = self._shuffle("c.jsonl", seed=6, memory_mb=0.02)
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+import gzip
+import time
+import random
+import tempfile
+
+# Add parent directory to path to allow importing 'arithmetic' modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
+if grandparent_dir not in sys.path:
+    sys.path.insert(0, grandparent_dir)
+
+from arithmetic.dolphin_math_datagen import ALL_GENERATORS
+from arithmetic.pipeline.sinks import open_sink, PipelinedJsonlSink
+from arithmetic.base_generator import StepStream
+from arithmetic.generators.long_division_generator import LongDivisionGenerator, long_division_steps
+
+class SlowFile:
+    """File stand-in whose writes take a while, to make the writer thread fall behind."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, chunk):
+        time.sleep(0.01)
+        self.chunks.append(chunk)
+
+    def close(self):
+        pass
+
+class FailingFile(SlowFile):
+
+    def write(self, chunk):
+        raise OSError("disk full")
+
+class TestSinks(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(13)
+        self.examples = [random.choice(ALL_GENERATORS).generate() for _ in range(300)]
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, path, **options):
+        with open_sink(path, **options) as sink:
+            for example in self.examples:
+                sink.write(example)
+        return sink
+
+    def test_pipelined_matches_plain(self):
+        """The writer thread produces byte-identical output, compressed or not."""
+        for name in ("data.jsonl", "data.jsonl.gz"):
+            plain = os.path.join(self.tmp.name, "plain_" + name)
+            piped = os.path.join(self.tmp.name, "piped_" + name)
+            self._write(plain)
+            sink = self._write(piped, pipelined=True, chunk_bytes=4096)
+            read = gzip.open if name.endswith(".gz") else open
+            with read(plain, "rb") as a, read(piped, "rb") as b:
+                self.assertEqual(a.read(), b.read())
+            self.assertGreater(sink.stats()["chunks"], 1)
+
+    def test_backpressure(self):
+        """A slow writer fills the bounded queue and write() blocks instead of buffering without limit."""
+        sink = PipelinedJsonlSink(os.path.join(self.tmp.name, "slow.jsonl"), queue_size=2, chunk_bytes=1)
+        sink._fp.close()
+        sink._fp = SlowFile()
+        for example in self.examples[:30]:
+            sink.write(example)
+        sink.close()
+        stats = sink.stats()
+        self.assertEqual(len(sink._fp.chunks), 30)
+        self.assertGreater(stats["stalls"], 0)
+        self.assertLessEqual(stats["max_occupancy"], 2)
+
+    def test_writer_error_is_raised(self):
+        sink = PipelinedJsonlSink(os.path.join(self.tmp.name, "fail.jsonl"), chunk_bytes=1)
+        sink._fp.close()
+        sink._fp = FailingFile()
+        with self.assertRaises(OSError):
+            for example in self.examples:
+                sink.write(example)
+            sink.close()
+        with self.assertRaises(ValueError):
+            open_sink(os.path.join(self.tmp.name, "x.bin"), "bin", pipelined=True)
+
+    def test_streamed_steps(self):
+        """Streamed traces serialize exactly like their lists; a failing trace leaves no partial line."""
+        generator = LongDivisionGenerator(dividend_digits=(600, 800), divisor_digits=(2, 4))
+        random.seed(5)
+        self.examples = [generator.generate() for _ in range(3)]
+
+        def streamed():
+            random.seed(5)
+            for original in self.examples:
+                yield dict(generator.generate_stream(), problem_id=original["problem_id"])
+
+        def broken():
+            steps = StepStream(long_division_steps(123456, 7))
+            next(steps)
+            def fail():
+                raise RuntimeError("generator failed")
+            return dict(problem_id="x", operation="long_division", problem="123456 / 7",
+                        steps=steps, final_answer=fail)
+
+        for name in ("data.jsonl", "data.jsonl.gz"):
+            streamed_path = os.path.join(self.tmp.name, "streamed_" + name)
+            with open_sink(streamed_path) as sink:
+                for i, example in enumerate(streamed()):
+                    sink.write(example)
+                    if i == 0:
+                        with self.assertRaises(RuntimeError):
+                            sink.write(broken())
+            plain_path = os.path.join(self.tmp.name, "plain_" + name)
+            self._write(plain_path)
+            read = gzip.open if name.endswith(".gz") else open
+            with read(streamed_path, "rb") as a, read(plain_path, "rb") as b:
+                self.assertEqual(a.read(), b.read())
+
+if __name__ == '__main__':
+    unittest.main()
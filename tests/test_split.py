@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+import json
+import random
+import tempfile
+
+# Add parent directory to path to allow importing 'arithmetic' modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
+if grandparent_dir not in sys.path:
+    sys.path.insert(0, grandparent_dir)
+
+from arithmetic.dolphin_math_datagen import ALL_GENERATORS, write_jsonl
+from arithmetic.pipeline.split import SplitAssigner, SplitWriter, split_files, parse_splits
+
+SPLITS = {"train": 0.6, "validation": 0.2, "test": 0.2}
+
+class TestSplit(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(11)
+        self.examples = [random.choice(ALL_GENERATORS).generate() for _ in range(400)]
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self, path):
+        with open(path, encoding="utf-8") as fp:
+            return [json.loads(line) for line in fp]
+
+    def test_assignment_is_stable(self):
+        """The split depends only on (operation, problem) and the salt."""
+        assigner = SplitAssigner(SPLITS)
+        for example in self.examples:
+            name = assigner.assign(example["operation"], example["problem"])
+            self.assertIn(name, SPLITS)
+            self.assertEqual(name, SplitAssigner(SPLITS).assign(example["operation"], example["problem"]))
+        names = {assigner.assign("long_division", f"{i} / 7") for i in range(200)}
+        self.assertEqual(names, set(SPLITS))
+        self.assertEqual(parse_splits("train=0.6,validation=0.2,test=0.2"), SPLITS)
+
+    def test_inline_and_file_splits_agree(self):
+        """Splitting inline and splitting the written file give the same result, with no leaks."""
+        inline_path = os.path.join(self.tmp.name, "inline.jsonl")
+        with SplitWriter(inline_path, SPLITS) as writer:
+            for example in self.examples + self.examples[:50]: # Duplicated problems
+                writer.write(example)
+        full_path = os.path.join(self.tmp.name, "full.jsonl")
+        with open(full_path, "w", encoding="utf-8") as fp:
+            for example in self.examples + self.examples[:50]:
+                write_jsonl(fp, example)
+        counts = split_files([full_path], os.path.join(self.tmp.name, "offline.jsonl"), SPLITS)
+        self.assertEqual(counts, writer.counts)
+        self.assertEqual(sum(counts.values()), len(self.examples) + 50)
+
+        seen = {}
+        for name in SPLITS:
+            inline = self._read(os.path.join(self.tmp.name, f"inline.{name}.jsonl"))
+            offline = self._read(os.path.join(self.tmp.name, f"offline.{name}.jsonl"))
+            self.assertEqual(inline, offline)
+            for example in inline:
+                key = (example["operation"], example["problem"])
+                self.assertEqual(seen.setdefault(key, name), name, f"{key} leaked across splits")
+
+if __name__ == '__main__':
+    unittest.main()
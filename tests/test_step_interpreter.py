@@ -0,0 +1,126 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path to allow importing 'arithmetic' modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
+if grandparent_dir not in sys.path:
+    sys.path.insert(0, grandparent_dir)
+
+from arithmetic.step_interpreter import check_trace, check_traces
+from arithmetic.generators.long_division_generator import LongDivisionGenerator
+from arithmetic.generators.decimal_mult_generator import DecimalMultGenerator
+from arithmetic.generators.decimal_add_sub_generator import DecimalAddSubGenerator
+from arithmetic.generators.decimal_div_generator import DecimalDivGenerator
+from arithmetic.generators.fraction_op_generator import FractionOpGenerator
+from arithmetic.generators.quadratic_generator import QuadraticGenerator
+from arithmetic.generators.pythag_hyp_generator import PythagHypGenerator
+from arithmetic.generators.abacus_addition_generator import AbacusAdditionGenerator
+from arithmetic.generators.percent_problem_generator import PercentProblemGenerator
+from arithmetic.generators.simplify_expression_generator import SimplifyExpressionGenerator
+from arithmetic.generators.evaluate_expression_generator import EvaluateExpressionGenerator
+
+# 1834 / 5 = 366 R4
+LONG_DIV_TRACE = [
+    "D|18|5|3", "M|3|5|15", "S|18|15|3",
+    "B|3|3|33", "D|33|5|6", "M|6|5|30", "S|33|30|3",
+    "B|3|4|34", "D|34|5|6", "M|6|5|30", "S|34|30|4",
+    "Z|366 R4",
+]
+
+class TestStepInterpreter(unittest.TestCase):
+
+    def test_valid_trace(self):
+        """A correct long-division trace checks clean."""
+        result = check_trace(LONG_DIV_TRACE, "366 R4")
+        self.assertEqual(result["valid"], [True] * len(LONG_DIV_TRACE))
+        self.assertIsNone(result["first_error"])
+        self.assertTrue(result["complete"])
+        self.assertEqual(result["score"], 1.0)
+
+    def test_first_error_index(self):
+        """Arithmetic slips and broken D -> M -> S chains are located."""
+        bad = list(LONG_DIV_TRACE)
+        bad[5] = "M|6|5|35" # Wrong product
+        result = check_trace(bad)
+        self.assertEqual(result["first_error"], 5)
+        self.assertFalse(result["valid"][5])
+        self.assertLess(result["score"], 1.0)
+
+        bad = list(LONG_DIV_TRACE)
+        bad[3] = "B|4|3|43" # Self-consistent, but remainder was 3
+        self.assertEqual(check_trace(bad)["first_error"], 3)
+
+        bad = list(LONG_DIV_TRACE)
+        bad[2] = "S|18|10|8" # Subtracts a product that was never computed
+        self.assertEqual(check_trace(bad)["first_error"], 2)
+
+    def test_malformed_and_final_answer(self):
+        """Unknown op-codes, wrong arity and answer mismatches are invalid."""
+        result = check_trace("E|3|2|9\nFOO|1\nA|1|2\nZ|9", final_answer="10")
+        self.assertEqual(result["valid"], [True, False, False, False])
+        self.assertEqual(result["first_error"], 1)
+        self.assertFalse(check_trace(["A|1|2|3"])["complete"])
+
+    def test_column_and_partial_steps(self):
+        """Column steps are checked against the aligned operands."""
+        trace = ["DEC_ALIGN|1.5|2.7", "DEC_ADD_COL|frac_0|5+7+0|->2 (carry 1)",
+                 "DEC_ADD_COL|int_1|1+2+1|->4 (carry 0)", "Z|4.2"]
+        self.assertIsNone(check_trace(trace)["first_error"])
+        trace[2] = "DEC_ADD_COL|int_1|1+2+0|->3 (carry 0)" # Dropped the carry
+        self.assertEqual(check_trace(trace)["first_error"], 2)
+
+        trace = ["MUL_SETUP|12|34", "MUL_PARTIAL|4|12|48", "MUL_PARTIAL|3|12|36",
+                 "ADD_PARTIALS|48+360|408"]
+        self.assertEqual(check_trace(trace)["valid"], [True, True, False, False])
+
+    def test_substitution_and_batch_lengths(self):
+        """SUBST must replace the variable in the previous expression; batches pair traces 1:1."""
+        trace = ["SUBST|x|-5|-2(-5)+2y+4", "M|-2|-5|10", "SUBST|y|-3|-2(-5)+2(-3)+4", "Z|8"]
+        self.assertIsNone(check_trace(trace)["first_error"])
+        trace[2] = "SUBST|y|-3|-2(-5)+2(3)+4" # Dropped the sign of the value
+        self.assertEqual(check_trace(trace)["first_error"], 2)
+        self.assertEqual(check_trace(["SUBST|x|2|3x+1"])["valid"], [False]) # x left in place
+        with self.assertRaises(ValueError):
+            check_traces([["A|1|2|3"], ["Z|3"]], ["3"])
+
+    def test_huge_powers_rejected(self):
+        """Exponents and shifts far beyond the written digits fail without being computed."""
+        trace = ["E|10|1000000000|1", "PLACE_DP|1|100000000|0.1", "DEC_SHIFT|1/1|1/1|100000000",
+                 "E|1/2|3|1/8", "PLACE_DP|4417182|3|4417.182", "DEC_SHIFT|48.47/5.24|4847/524|2",
+                 "PLACE_DP|0|3|0"]
+        self.assertEqual(check_trace(trace)["valid"], [False, False, False, True, True, True, True])
+
+    def test_gcd_steps(self):
+        """Euclid steps must chain into the GCD; factorizations need ascending primes."""
+        trace = ["EUC|8|6|1|2", "EUC|6|2|3|0", "G|8|6|2", "L|8|6|24"]
+        self.assertIsNone(check_trace(trace)["first_error"])
+        trace[1] = "EUC|8|2|4|0" # Does not continue from 6 = ? * 2 + r
+        self.assertEqual(check_trace(trace)["valid"], [True, False, False, True])
+        self.assertEqual(check_trace(["EUC|8|6|0|8"])["valid"], [False]) # Remainder >= divisor
+        trace = ["PF|360|2^3*3^2*5", "PF|1|1", "PF|12|3*2^2", "PF|9|9", "PF|6|2^1*3", "G|12|18|3"]
+        self.assertEqual(check_trace(trace)["valid"], [True, True, False, False, False, False])
+        # Large primes are tested without trial division; oversized exponents are never raised to
+        trace = ["PF|999999999999999989|999999999999999989", "PF|3215031751|3215031751", "PF|4|2^100000000000000"]
+        self.assertEqual(check_trace(trace)["valid"], [True, False, False])
+
+    def test_generated_traces(self):
+        """Traces produced by the generators check clean."""
+        generators = [
+            LongDivisionGenerator(), DecimalMultGenerator(), DecimalAddSubGenerator('+'),
+            DecimalAddSubGenerator('-'), DecimalDivGenerator(), SimplifyExpressionGenerator(),
+            FractionOpGenerator('+'), FractionOpGenerator('-'), FractionOpGenerator('*'),
+            FractionOpGenerator('/'), FractionOpGenerator('+-', terms=3, detail='euclid'),
+            FractionOpGenerator('/', detail='factor'), QuadraticGenerator(), PythagHypGenerator(),
+            AbacusAdditionGenerator(), PercentProblemGenerator(), EvaluateExpressionGenerator(),
+        ]
+        examples = [g.generate() for g in generators for _ in range(20)]
+        results = check_traces([e["steps"] for e in examples], [e["final_answer"] for e in examples])
+        self.assertEqual(len(results), len(examples))
+        for example, result in zip(examples, results):
+            self.assertIsNone(result["first_error"], f"{example['problem']}: {example['steps']}")
+
+if __name__ == '__main__':
+    unittest.main()
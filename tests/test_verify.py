@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+import json
+import random
+import tempfile
+
+# Add parent directory to path to allow importing 'arithmetic' modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+grandparent_dir = os.path.dirname(parent_dir) # Go up two levels
+if grandparent_dir not in sys.path:
+    sys.path.insert(0, grandparent_dir)
+
+from arithmetic.dolphin_math_datagen import ALL_GENERATORS
+from arithmetic.pipeline.verify import (
+    verify_examples, verify_files, check_answer, has_mismatches, BackgroundVerifier,
+)
+
+class TestVerify(unittest.TestCase):
+
+    def setUp(self):
+        """Generate a small mixed dataset."""
+        random.seed(123)
+        self.examples = [gen.generate() for gen in ALL_GENERATORS for _ in range(15)]
+
+    def test_generated_examples_verify_clean(self):
+        """Every generator's steps and answers agree with the reference."""
+        stats = verify_examples(self.examples)
+        self.assertEqual(sum(c["examples"] for c in stats.values()), len(self.examples))
+        for op, counts in stats.items():
+            self.assertEqual(counts["step_errors"], 0, op)
+            self.assertEqual(counts["answer_mismatches"], 0, op)
+            self.assertEqual(counts["unchecked_answers"], 0, op)
+
+    def test_mismatches_are_reported(self):
+        """Wrong answers and wrong steps are counted per operation."""
+        example = dict(operation="long_division", problem="1834 / 5", final_answer="366 R3",
+                       steps=["D|18|5|3", "M|3|5|15", "S|18|15|3", "Z|366 R3"])
+        self.assertFalse(check_answer(example))
+        stats = verify_examples([example])
+        self.assertEqual(stats["long_division"]["answer_mismatches"], 1)
+        self.assertEqual(stats["long_division"]["step_errors"], 0)
+        # Exponent notation is not an acceptable answer format
+        self.assertFalse(check_answer(dict(operation="decimal_mul", problem="2.5 * 4.0", final_answer="1E+1")))
+        self.assertTrue(has_mismatches(stats))
+
+    def test_verify_files_chunks(self):
+        """Chunked mmap reading sees every line exactly once."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.jsonl")
+            with open(path, "w", encoding="utf-8") as fp:
+                for example in self.examples:
+                    fp.write(json.dumps(example, ensure_ascii=False) + "\n")
+            for processes, chunk_size in [(1, 1 << 20), (1, 997), (2, 4096)]:
+                stats = verify_files([path], processes=processes, chunk_size=chunk_size)
+                self.assertEqual(sum(c["examples"] for c in stats.values()), len(self.examples))
+                self.assertFalse(has_mismatches(stats))
+
+    def test_background_verifier(self):
+        """Batches verified in worker processes are merged on close()."""
+        verifier = BackgroundVerifier(processes=2, batch_size=50)
+        for example in self.examples:
+            verifier.add(example)
+        stats = verifier.close()
+        self.assertEqual(sum(c["examples"] for c in stats.values()), len(self.examples))
+        self.assertFalse(has_mismatches(stats))
+
+if __name__ == '__main__':
+    unittest.main()